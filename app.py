@@ -1,31 +1,39 @@
 import os
 import json
-import textwrap
 import glob
 import time
 import uuid
+import asyncio
+import hashlib
+import contextlib
+import threading
 from typing import List, Dict, Optional, Any
-import numpy as np
 import logging
 
-# Import LangChain components
-from langchain_community.vectorstores import Chroma
-from langchain.chains import ConversationalRetrievalChain
-from langchain.memory import ConversationBufferMemory
-from langchain_community.embeddings import HuggingFaceHubEmbeddings
-from langchain.embeddings import HuggingFaceEmbeddings
-
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.schema import Document
-from langchain.prompts import PromptTemplate
-from langchain_google_genai import GoogleGenerativeAI
-from fastapi import FastAPI, HTTPException
+# LangChain, Chroma, the PDF loader and the Gemini client are heavy to import;
+# they are imported where first used so the app starts quickly
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-import numpy as np
-import requests
+from rerank import get_reranker, tokenize, RERANK_CANDIDATES
+from retrieval import fetch_candidates, select_context, RETRIEVAL_MAX_K
+from router import route_query
+from conversation_memory import RollingSummaryMemory, SUMMARY_MAX_CHARS
+from listings import ListingIndex, InvalidCursor
+from schemes import SchemeIndex, extract_scheme_fields, format_schemes
+from warm_answers import WarmAnswerStore, SUGGESTED_QUESTIONS_FILE, WARM_ANSWERS_ENABLED
+from dedup import dedupe_documents, dedupe_embeddings, DEDUP_ENABLED
+from watcher import CorpusWatcher, WATCH_ENABLED
+import index_store
+from usage import UsageTracker, build_usage
+from readiness import Readiness, WARMUP_ENABLED, WARMUP_LLM
+from profiling import SamplingProfiler, MemoryTracker, PROFILING_ENABLED, PROFILING_TOKEN, PROFILE_INTERVAL_MS
+from compress import compress_context, COMPRESSION_ENABLED
+from safety import SafetyScreener, safe_response, SAFETY_ENABLED
+from pdf_cache import ExtractionCache
+from fallback import extractive_answer
+from tenants import TenantIndexCache, UnknownTenant, DEFAULT_TENANT, list_tenants, resolve_tenant, tenant_data_dir, tenant_index_root
 
 # Setup logging
 logging.basicConfig(
@@ -53,7 +61,17 @@ app.add_middleware(
 class ChatRequest(BaseModel):
     query: str
     chat_history: List[Dict[str, Any]] = []
-    context_type: Optional[str] = "all"
+    # "auto" lets the router pick the context type; "all" and the others are kept as sent
+    context_type: Optional[str] = "auto"
+    conversation_id: Optional[str] = None
+    # The listing record the question is about; its record is used as the context directly
+    job_id: Optional[str] = None
+    event_id: Optional[str] = None
+    program_id: Optional[str] = None
+    # The partner organization whose corpus answers the question; None for the main corpus
+    tenant_id: Optional[str] = None
+    # Latency budget for this request; defaults to REQUEST_DEADLINE_MS
+    deadline_ms: Optional[float] = None
 
 class FeedbackRequest(BaseModel):
     conversation_id: str
@@ -61,75 +79,209 @@ class FeedbackRequest(BaseModel):
     feedback_type: str  # "helpful", "not_helpful", "reported"
     details: Optional[str] = None
 
+class BatchQuery(BaseModel):
+    id: Optional[str] = None
+    query: str
+    context_type: Optional[str] = "auto"
+
+class BatchRequest(BaseModel):
+    queries: List[BatchQuery]
+    k: int = RETRIEVAL_MAX_K
+    max_concurrency: int = 4
+    tenant_id: Optional[str] = None
+
 HUGGINGFACE_HUB_API_TOKEN = os.getenv("HUGGINGFACE_HUB_API_TOKEN", "")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "your api")
+# Point the LLM and embedding calls at other servers, e.g. the stand-ins in stub_llm.py
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+EMBEDDINGS_URL = os.getenv("EMBEDDINGS_URL")
 
-# Initialize LLM
-llm = GoogleGenerativeAI(model="gemini-2.0-flash", api_key=GEMINI_API_KEY)
+# Batch processing limits
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "5000"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+MAX_BATCH_CONCURRENCY = int(os.getenv("MAX_BATCH_CONCURRENCY", "16"))
 
-# Initialize memory
-memory = ConversationBufferMemory(
-    memory_key="chat_history",
-    return_messages=True
-)
+# A chat request answers within this many milliseconds; when the LLM cannot, an extractive answer is returned
+REQUEST_DEADLINE_MS = float(os.getenv("REQUEST_DEADLINE_MS", "8000"))
+# Part of the deadline kept back from the LLM for building the fallback and the response
+DEGRADED_RESERVE_MS = float(os.getenv("DEGRADED_RESERVE_MS", "250"))
+
+_llm = None
+_llm_lock = threading.Lock()
+
+def get_llm():
+    """Get the shared Gemini client, creating it on first use"""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                from langchain_google_genai import GoogleGenerativeAI
+                if GEMINI_API_ENDPOINT:
+                    _llm = GoogleGenerativeAI(
+                        model="gemini-2.0-flash",
+                        api_key=GEMINI_API_KEY,
+                        client_options={"api_endpoint": GEMINI_API_ENDPOINT},
+                        transport="rest"
+                    )
+                else:
+                    _llm = GoogleGenerativeAI(model="gemini-2.0-flash", api_key=GEMINI_API_KEY)
+    return _llm
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and Asha, 
+    an AI career mentor for Indian women. Merge the new messages into the existing summary. 
+    Keep facts about the user (goals, location, skills, situation) and what Asha has already 
+    recommended. Write plain sentences, at most {max_chars} characters.
+    """
+
+def summarize_turns(summary, messages):
+    """Fold new messages into the running conversation summary using the LLM"""
+    transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+    prompt = [
+        {"role": "system", "content": SUMMARY_PROMPT.format(max_chars=SUMMARY_MAX_CHARS)},
+        {"role": "user", "content": f"Existing summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"}
+    ]
+    started = time.perf_counter()
+    response = get_llm().invoke(prompt)
+    usage_tracker.record(build_usage(prompt, None, response, {"llm": (time.perf_counter() - started) * 1000}), None, "summary")
+    return response
+
+# Running token and cost totals by context type and route
+usage_tracker = UsageTracker()
+
+# Screens queries and answers for bias and safety alongside the rest of the request
+safety_screener = SafetyScreener() if SAFETY_ENABLED else None
+
+# Initialize memory: recent turns verbatim, older turns folded into a rolling summary
+memory = RollingSummaryMemory(summarize_fn=summarize_turns)
+
+# Data files that make up the corpus
+PDF_FILE = "scheme.pdf"
+# Every PDF in this directory (and its subdirectories) is part of the corpus too
+PDF_DIR = os.getenv("PDF_DIR", "pdfs")
+JSON_FILES = ["governmentschemes.json", "job_listings.json", "community_events.json", "mentorship_programs.json"]
+TXT_FILES = [
+    "dairybusiness.txt",
+    "tutoringbusiness.txt",
+    "tailoringbusiness.txt",
+    "careers_for_women.txt",
+    "women_empowerment.txt"
+]
+
+def data_path(data_dir, name):
+    """Path of a data file in a tenant's data directory (just the name for the main corpus)"""
+    return name if data_dir == "." else os.path.join(data_dir, name)
+
+def pdf_files(data_dir="."):
+    """The PDFs in the corpus: PDF_FILE and every PDF under PDF_DIR (every PDF under a tenant's directory)"""
+    if data_dir != ".":
+        return sorted(glob.glob(os.path.join(data_dir, "**", "*.pdf"), recursive=True))
+    pdfs = [PDF_FILE] if os.path.exists(PDF_FILE) else []
+    pdfs.extend(sorted(glob.glob(os.path.join(PDF_DIR, "**", "*.pdf"), recursive=True)))
+    return pdfs
+
+def corpus_files(data_dir="."):
+    """List the existing data files that load_documents() reads"""
+    txt_names = TXT_FILES + [f for f in sorted(glob.glob("*.txt", root_dir=data_dir)) if f not in TXT_FILES and f != "requirements.txt"]
+    paths = [data_path(data_dir, name) for name in JSON_FILES + txt_names]
+    return pdf_files(data_dir) + [path for path in paths if os.path.exists(path)]
+
+def corpus_file_stats(data_dir="."):
+    """Modification time and size of each data file, keyed by path"""
+    stats = {}
+    for path in corpus_files(data_dir):
+        stat = os.stat(path)
+        stats[path] = f"{stat.st_mtime_ns}:{stat.st_size}"
+    return stats
+
+def corpus_fingerprint(data_dir="."):
+    """Cheap fingerprint of the corpus that changes whenever a data file is added, removed or modified"""
+    parts = [f"{path}:{stat}" for path, stat in corpus_file_stats(data_dir).items()]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+def changed_since_build(version, root=index_store.INDEX_ROOT, data_dir="."):
+    """Data files added, removed or modified since an index version was built.
+
+    Returns None when the version's manifest predates per-file stats and its corpus fingerprint no longer matches.
+    """
+    manifest = index_store.read_manifest(version, root)
+    if manifest.get("corpus_fingerprint") == corpus_fingerprint(data_dir):
+        return set()
+    built = manifest.get("file_stats")
+    if built is None:
+        return None
+    current = corpus_file_stats(data_dir)
+    return {path for path in set(built) | set(current) if built.get(path) != current.get(path)}
+
+# Extracted PDF text, keyed by file and page hash
+extraction_cache = ExtractionCache()
+
+def scheme_metadata(record):
+    """Structured scheme fields flattened into vector store metadata"""
+    fields = extract_scheme_fields(record)
+    return {
+        "ministry": fields["ministry"] or "",
+        "target_groups": ",".join(fields["target_groups"]),
+        "sectors": ",".join(fields["sectors"]),
+        "benefit_types": ",".join(fields["benefit_types"]),
+    }
+
+def load_documents(files=None, data_dir="."):
+    """Loads PDFs, JSON, and text documents into a list of LangChain Document objects.
+
+    If files is given, only those data files are loaded. data_dir selects a
+    tenant's corpus instead of the main one.
+    """
+    from langchain_core.documents import Document
+    from langchain_community.document_loaders import TextLoader
 
-def load_documents():
-    """Loads PDFs, JSON, and text documents into a list of LangChain Document objects."""
     documents = []
+    wanted = set(files) if files is not None else None
 
-    # Load PDF
-    pdf_file = "scheme.pdf"
-    if os.path.exists(pdf_file):
-        try:
-            pdf_loader = PyPDFLoader(pdf_file)
-            documents.extend(pdf_loader.load())
-            logger.info(f"Loaded {len(documents)} pages from {pdf_file}")
-        except Exception as e:
-            logger.error(f"Error loading PDF {pdf_file}: {e}")
-
-    # Load JSON Files
-    json_files = ["governmentschemes.json", "job_listings.json", "community_events.json", "mentorship_programs.json"]
-    
-    for json_file in json_files:
-        if os.path.exists(json_file):
+    for path in corpus_files(data_dir):
+        if wanted is not None and path not in wanted:
+            continue
+
+        # Load PDFs, extracting only pages that are not in the extraction cache
+        if path.endswith(".pdf"):
             try:
-                with open(json_file, "r", encoding="utf-8") as f:
+                pages = extraction_cache.load(path)
+                documents.extend(pages)
+                logger.info(f"Loaded {len(pages)} pages from {path}")
+            except Exception as e:
+                logger.error(f"Error loading PDF {path}: {e}")
+
+        # Load JSON Files
+        elif path.endswith(".json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
                     json_data = json.load(f)
 
                 if isinstance(json_data, list):
                     for item in json_data:
-                        documents.append(Document(page_content=json.dumps(item), metadata={"source": json_file}))
+                        metadata = {"source": path}
+                        if os.path.basename(path) == RECORD_FILES["schemes"] and isinstance(item, dict):
+                            metadata.update(scheme_metadata(item))
+                        documents.append(Document(page_content=json.dumps(item), metadata=metadata))
                 elif isinstance(json_data, dict):
-                    documents.append(Document(page_content=json.dumps(json_data), metadata={"source": json_file}))
+                    documents.append(Document(page_content=json.dumps(json_data), metadata={"source": path}))
 
-                logger.info(f"Loaded data from {json_file}")
+                logger.info(f"Loaded data from {path}")
 
             except Exception as e:
-                logger.error(f"Error loading JSON {json_file}: {e}")
-
-    # Load Text Files
-    txt_files = [
-        "dairybusiness.txt",
-        "tutoringbusiness.txt",
-        "tailoringbusiness.txt",
-        "careers_for_women.txt",
-        "women_empowerment.txt"
-    ]
+                logger.error(f"Error loading JSON {path}: {e}")
 
-    # Include all `.txt` files in the current directory
-    txt_files.extend([f for f in glob.glob("*.txt") if f not in txt_files])
-
-    for txt_file in txt_files:
-        if os.path.exists(txt_file):
+        # Load Text Files
+        else:
             try:
-                loader = TextLoader(txt_file, encoding="utf-8")
+                loader = TextLoader(path, encoding="utf-8")
                 documents.extend(loader.load())
-                logger.info(f"Loaded text file: {txt_file}")
+                logger.info(f"Loaded text file: {path}")
             except Exception as e:
-                logger.error(f"Error loading text file {txt_file}: {e}")
+                logger.error(f"Error loading text file {path}: {e}")
 
     # Create missing files with sample data
-    create_sample_files()
+    if wanted is None and data_dir == ".":
+        create_sample_files()
     
     return documents
 
@@ -289,58 +441,245 @@ def create_sample_files():
             f.write(empowerment_content)
         logger.info(f"Created sample file: {empowerment_file}")
 
-def get_vector_db(documents=None):
-    # Initialize embedding model
-   
-    
-    embeddings = HuggingFaceHubEmbeddings(
-    huggingfacehub_api_token="your_huggingface_api_token_here",  # Remove the actual token here
-    repo_id="sentence-transformers/all-MiniLM-L6-v2",
-    task="feature-extraction"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "100"))
+_embeddings = None
+_vector_db = None
+
+def get_embeddings():
+    """Get the shared embedding model, creating it on first use"""
+    global _embeddings
+    if _embeddings is None:
+        from langchain_community.embeddings import HuggingFaceHubEmbeddings
+        _embeddings = HuggingFaceHubEmbeddings(
+            huggingfacehub_api_token="your_huggingface_api_token_here",  # Remove the actual token here
+            model=EMBEDDINGS_URL or EMBEDDING_MODEL,
+            task="feature-extraction"
+        )
+    return _embeddings
+
+_reindex_lock = threading.RLock()
+
+def get_shared_vector_db():
+    """Get the vector database shared across requests, loading the corpus only once"""
+    global _vector_db
+    if _vector_db is None:
+        with _reindex_lock:
+            if _vector_db is None:
+                try:
+                    _vector_db = get_vector_db()
+                except ValueError:
+                    _vector_db = get_vector_db(load_documents())
+                # The file watcher only sees edits made while the server runs; a rolled-back index is left as it is
+                changed = None if index_store.is_pinned() else changed_since_build(index_store.current_version())
+                if changed:
+                    logger.info(f"Data files changed since the index was built: {', '.join(sorted(changed))}")
+                    reindex_sources(changed)
+    return _vector_db
+
+def open_index(version, root=index_store.INDEX_ROOT):
+    """LangChain vector store over one index version"""
+    from langchain_community.vectorstores import Chroma
+    return Chroma(
+        client=index_store.open_client(version, root),
+        collection_name=index_store.INDEX_COLLECTION,
+        persist_directory=index_store.version_path(version, root),
+        embedding_function=get_embeddings()
     )
 
-    
-    persist_directory = "chroma_db"
-    
-    # Check if the vector database already exists
-    if os.path.exists(persist_directory) and os.path.isdir(persist_directory) and len(os.listdir(persist_directory)) > 0:
-        try:
-            logger.info("Loading existing vector database...")
-            db = Chroma(
-                persist_directory=persist_directory,
-                embedding_function=embeddings
-            )
-            logger.info(f"Vector database loaded successfully with {db._collection.count()} documents")
-            
-            return db
-        except Exception as e:
-            logger.error(f"Error loading existing database: {e}")
-            logger.info("Will create a new vector database")
-    
-    # If no existing database or documents provided, raise an error
+def chunk_sources(metadata):
+    """All data files a stored chunk stands for"""
+    return set(filter(None, metadata.get("sources", metadata.get("source", "")).split(",")))
+
+def split_into_chunks(documents, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
+    """Split documents into the chunks that are embedded and indexed"""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return text_splitter.split_documents(documents)
+
+def prepare_chunks(documents, kept_chunks=None, kept_vectors=None):
+    """Split, deduplicate and embed documents.
+
+    kept_chunks are already-indexed chunks with known vectors (kept_vectors);
+    they are carried over without being embedded again.
+    Returns (chunks, vectors).
+    """
+    kept_chunks = kept_chunks or []
+    kept_vectors = kept_vectors or []
+    split_documents = split_into_chunks(documents)
+    logger.info(f"Split into {len(split_documents)} chunks")
+
+    if not DEDUP_ENABLED:
+        vectors = get_embeddings().embed_documents([chunk.page_content for chunk in split_documents])
+        return kept_chunks + split_documents, kept_vectors + vectors
+
+    # Collapse near-duplicate chunks before they are embedded and stored
+    total = len(kept_chunks) + len(split_documents)
+    chunks, text_stats = dedupe_documents(kept_chunks + split_documents)
+    known = {id(chunk): vector for chunk, vector in zip(kept_chunks, kept_vectors)}
+    new_chunks = [chunk for chunk in chunks if id(chunk) not in known]
+    new_vectors = iter(get_embeddings().embed_documents([chunk.page_content for chunk in new_chunks]))
+    vectors = [known[id(chunk)] if id(chunk) in known else next(new_vectors) for chunk in chunks]
+    chunks, vectors, vector_stats = dedupe_embeddings(chunks, vectors)
+    logger.info(
+        f"Dedup: {total} -> {text_stats['chunks_after']} chunks by text, "
+        f"-> {vector_stats['chunks_after']} by embedding "
+        f"({100 * (1 - len(chunks) / total) if total else 0:.1f}% smaller index, "
+        f"{vector_stats['vector_bytes_saved']} vector bytes saved)"
+    )
+    return chunks, vectors
+
+def build_index(chunks, vectors, root=index_store.INDEX_ROOT, data_dir="."):
+    """Write chunks and their precomputed vectors to a new index version and promote it"""
+    version = index_store.new_version(root)
+    db = open_index(version, root)
+    ids = [str(uuid.uuid4()) for _ in chunks]
+    for start in range(0, len(chunks), EMBED_BATCH_SIZE * 16):
+        batch = chunks[start:start + EMBED_BATCH_SIZE * 16]
+        db._collection.add(
+            ids=ids[start:start + len(batch)],
+            embeddings=[[float(x) for x in vector] for vector in vectors[start:start + len(batch)]],
+            documents=[chunk.page_content for chunk in batch],
+            metadatas=[chunk.metadata for chunk in batch],
+        )
+    db.persist()
+    index_store.write_manifest(
+        version,
+        ids,
+        [chunk.page_content for chunk in chunks],
+        root=root,
+        corpus_fingerprint=corpus_fingerprint(data_dir),
+        file_stats=corpus_file_stats(data_dir),
+        embedding_model=EMBEDDINGS_URL or EMBEDDING_MODEL,
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        dedup=DEDUP_ENABLED,
+    )
+    index_store.promote(version, root)
+    return db
+
+def get_vector_db(documents=None):
+    """Open the validated live index, or build a new version from documents"""
+    version = index_store.select_live_version()
+    if version is not None and not index_store.is_pinned() and changed_since_build(version) is None:
+        # Built before per-file stats were recorded, so the changed files are unknown
+        logger.info(f"Data files changed since index {version} was built; rebuilding it")
+        documents = documents or load_documents()
+    elif version is not None:
+        db = open_index(version)
+        logger.info(f"Vector database {version} loaded successfully with {db._collection.count()} documents")
+        return db
+
+    # If no valid index or documents provided, raise an error
     if not documents:
-        raise ValueError("No existing database found and no documents provided to create one")
-    
-    # Create a new vector database
+        raise ValueError("No valid index found and no documents provided to create one")
+
+    # Create a new index version
     try:
         logger.info("Creating new vector database...")
-        # Split text into chunks - increased chunk size for more context
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-        split_documents = text_splitter.split_documents(documents)
-        logger.info(f"Split into {len(split_documents)} chunks")
-        
-        db = Chroma.from_documents(
-            split_documents, 
-            embeddings, 
-            persist_directory=persist_directory
-        )
-        db.persist()
+        chunks, vectors = prepare_chunks(documents)
+        db = build_index(chunks, vectors)
+        index_store.prune()
         logger.info("New vector database created successfully")
-        
         return db
     except Exception as e:
         raise RuntimeError(f"Error creating Chroma DB: {e}")
 
+def load_tenant_index(tenant_id):
+    """Open a tenant's live index, building a new version first if its data files changed.
+
+    Returns (db, version).
+    """
+    root = tenant_index_root(tenant_id)
+    data_dir = tenant_data_dir(tenant_id)
+    version = index_store.select_live_version(root)
+    if version is not None:
+        manifest = index_store.read_manifest(version, root)
+        if manifest.get("corpus_fingerprint") == corpus_fingerprint(data_dir):
+            return open_index(version, root), version
+        logger.info(f"Data files of tenant {tenant_id} changed since index {version} was built")
+
+    documents = load_documents(data_dir=data_dir)
+    if not documents:
+        raise ValueError(f"Tenant {tenant_id} has no documents in {data_dir}")
+    logger.info(f"Creating new vector database for tenant {tenant_id}...")
+    chunks, vectors = prepare_chunks(documents)
+    db = build_index(chunks, vectors, root, data_dir)
+    index_store.prune(root=root)
+    return db, index_store.current_version(root)
+
+def close_index(db):
+    """Release an evicted tenant's index"""
+    index_store.close_client(db._client)
+
+# Open tenant indexes, least recently used evicted first when over TENANT_MEMORY_CAP_MB
+tenant_indexes = TenantIndexCache(load_tenant_index, close_index)
+
+def use_index(tenant=DEFAULT_TENANT):
+    """Context manager holding a tenant's vector database for the duration of a request"""
+    if tenant == DEFAULT_TENANT:
+        return contextlib.nullcontext(get_shared_vector_db())
+    return tenant_indexes.use(tenant)
+
+def reindex_sources(changed_files):
+    """Re-index the chunks of changed data files into a new index version and swap it in.
+
+    Chunks from unchanged files are carried over with their stored vectors;
+    only the changed files are loaded and embedded again. Requests already
+    holding the old index finish on it, new requests get the new one.
+    """
+    from langchain_core.documents import Document
+
+    global _vector_db
+    with _reindex_lock:
+        started = time.time()
+        old_db = get_shared_vector_db()
+        stored = old_db._collection.get(include=["documents", "metadatas", "embeddings"])
+
+        # A merged chunk also stands for its duplicates in other files, so those files are re-read too
+        affected = set(changed_files)
+        while True:
+            expanded = set(affected)
+            for metadata in stored["metadatas"]:
+                sources = chunk_sources(metadata or {})
+                if sources & affected:
+                    expanded |= sources
+            if expanded == affected:
+                break
+            affected = expanded
+
+        kept_chunks, kept_vectors = [], []
+        for text, metadata, vector in zip(stored["documents"], stored["metadatas"], stored["embeddings"]):
+            if not chunk_sources(metadata or {}) & affected:
+                kept_chunks.append(Document(page_content=text, metadata=dict(metadata or {})))
+                kept_vectors.append([float(x) for x in vector])
+
+        documents = load_documents(files=affected)
+        chunks, vectors = prepare_chunks(documents, kept_chunks, kept_vectors)
+        old_version = index_store.current_version()
+        new_db = build_index(chunks, vectors)
+        _vector_db = new_db
+        logger.info(
+            f"Re-indexed {', '.join(sorted(affected))} in {time.time() - started:.1f}s: "
+            f"{len(kept_chunks)} chunks kept, {len(chunks)} live in {index_store.current_version()}"
+        )
+        # Requests that started before the swap may still be reading the previous version
+        index_store.prune(protect=[old_version])
+
+    # The warm-answers thread regenerates them; refreshing here would hold up the watcher thread
+    if WARM_ANSWERS_ENABLED:
+        warm_answers.invalidate()
+
+def rollback_index(version=None):
+    """Promote an earlier index version and swap it in"""
+    global _vector_db
+    with _reindex_lock:
+        version = index_store.rollback(version)
+        _vector_db = open_index(version)
+    logger.info(f"Rolled back to index {version}")
+    return version
+
 def get_system_prompt(context_type="all"):
     """Get system prompt based on context type"""
     base_prompt = """You are Asha, an AI-powered mentor designed to assist Indian women in career development, 
@@ -379,13 +718,105 @@ def get_system_prompt(context_type="all"):
     
     return base_prompt
 
-def query_llm(user_query, context=None, chat_history=None, context_type="all"):
-    """Use the LLM with improved context-aware prompt."""
-    
+SMALLTALK_PROMPT = """You are Asha, a friendly AI mentor for Indian women's careers. 
+    Reply warmly in one or two short sentences. If it fits, offer help with jobs, events, 
+    mentorship programs or government schemes.
+    """
+
+LOOKUP_PROMPT = """You are Asha, an AI mentor for Indian women's careers. 
+    Answer the question concisely using only the records provided. 
+    Include names, dates, locations and links where relevant. If no record matches, say so briefly.
+    """
+
+# JSON record files behind each structured context type
+RECORD_FILES = {
+    "jobs": "job_listings.json",
+    "events": "community_events.json",
+    "mentorship": "mentorship_programs.json",
+    "schemes": "governmentschemes.json",
+}
+
+_records_cache = {}
+_listing_indexes = {}
+
+def file_version(path):
+    """Version string that changes whenever a file is modified"""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def load_records(context_type, data_dir="."):
+    """Load the JSON records for a context type, re-reading the file only when it changes"""
+    if context_type not in RECORD_FILES:
+        return []
+    json_file = data_path(data_dir, RECORD_FILES[context_type])
+    if not os.path.exists(json_file):
+        return []
+    version = file_version(json_file)
+    cached = _records_cache.get(json_file)
+    if cached and cached[0] == version:
+        return cached[1]
+    with open(json_file, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    if isinstance(records, dict):
+        records = [records]
+    _records_cache[json_file] = (version, records)
+    return records
+
+def get_listing_index(context_type, data_dir="."):
+    """Get the search and pagination index for a listing, rebuilding it only when its file changes"""
+    json_file = data_path(data_dir, RECORD_FILES[context_type])
+    version = file_version(json_file) if os.path.exists(json_file) else "missing"
+    index = _listing_indexes.get((data_dir, context_type))
+    if index is None or index.version != version:
+        index = ListingIndex(context_type, load_records(context_type, data_dir), version)
+        _listing_indexes[(data_dir, context_type)] = index
+    return index
+
+def lookup_records(context_type, user_query, limit=3, data_dir="."):
+    """Find the records of a context type that share the most terms with the query"""
+    query_terms = set(tokenize(user_query))
+    scored = []
+    for record in load_records(context_type, data_dir):
+        overlap = len(query_terms & set(tokenize(json.dumps(record))))
+        if overlap:
+            scored.append((overlap, record))
+    scored.sort(key=lambda pair: -pair[0])
+    return [record for _, record in scored[:limit]]
+
+_scheme_indexes = {}
+
+def get_scheme_index(data_dir="."):
+    """Get the structured scheme index, rebuilding it only when the schemes file changes"""
+    json_file = data_path(data_dir, RECORD_FILES["schemes"])
+    version = file_version(json_file) if os.path.exists(json_file) else "missing"
+    index = _scheme_indexes.get(data_dir)
+    if index is None or index.version != version:
+        index = SchemeIndex(load_records("schemes", data_dir), version)
+        _scheme_indexes[data_dir] = index
+        logger.info(f"Indexed {len(index.schemes)} government schemes")
+    return index
+
+def build_messages(user_query, context=None, chat_history=None, context_type="all", intent="question", summary=None):
+    """Build the message list sent to the LLM."""
+    if intent == "smalltalk":
+        messages = [{"role": "system", "content": SMALLTALK_PROMPT}]
+        messages.extend((chat_history or [])[-2:])
+        messages.append({"role": "user", "content": user_query})
+        return messages
+
+    if intent == "lookup":
+        return [
+            {"role": "system", "content": LOOKUP_PROMPT},
+            {"role": "user", "content": f"Records:\n{context or 'No matching records.'}\n\nQuestion: {user_query}"}
+        ]
+
     system_message = get_system_prompt(context_type)
     
     messages = [{"role": "system", "content": system_message}]
     
+    if summary:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+    
     # Add chat history for better continuity
     if chat_history:
         for message in chat_history[-5:]:  # Include last 5 messages for context
@@ -396,14 +827,217 @@ def query_llm(user_query, context=None, chat_history=None, context_type="all"):
         messages.append({"role": "user", "content": f"Context information (use this to formulate your answer):\n{context}\n\nUser question: {user_query}\n\nProvide a comprehensive, detailed response with all available information on the topic."})
     else:
         messages.append({"role": "user", "content": user_query})
+
+    return messages
+
+async def query_llm(user_query, context=None, chat_history=None, context_type="all", intent="question", summary=None,
+                    usage=None, deadline=None):
+    """Use the LLM with improved context-aware prompt.
+
+    If a usage dict is passed it is filled with the call's token breakdown, timing and cost.
+    Raises asyncio.TimeoutError when no answer arrives by deadline (a time.perf_counter()
+    value), and the LLM's error when the call fails.
+    """
+    
+    messages = build_messages(user_query, context, chat_history, context_type, intent, summary)
+    started = time.perf_counter()
+    completion = ""
     
     try:
-        # Request a longer, more detailed response
-        response = llm.invoke(messages)
-        return response
+        # Request a longer, more detailed response. On a timeout the call is cancelled but not waited
+        # for: the client can take a while to wind down, and the request must not wait with it.
+        llm = get_llm()
+        timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        call = asyncio.ensure_future(llm.ainvoke(messages))
+        done, _ = await asyncio.wait({call}, timeout=timeout)
+        if not done:
+            call.cancel()
+            call.add_done_callback(lambda task: task.cancelled() or task.exception())
+            raise asyncio.TimeoutError
+        completion = call.result()
+        return completion
+    finally:
+        if usage is not None:
+            usage.update(build_usage(messages, context, completion, {"llm": (time.perf_counter() - started) * 1000}))
+
+def retrieve_context(user_query, max_k=RETRIEVAL_MAX_K, tenant=DEFAULT_TENANT):
+    """Retrieve relevant, non-redundant context chunks for a query within the token budget."""
+    query_vector = get_embeddings().embed_query(user_query)
+    with use_index(tenant) as db:
+        candidates = fetch_candidates(db, [query_vector], RERANK_CANDIDATES)[0]
+    context_docs, stats = select_context(user_query, query_vector, candidates, get_reranker(), max_k=max_k)
+    logger.info(
+        f"Selected {stats['selected']} of {stats['candidates']} candidates "
+        f"({stats['above_threshold']} above similarity threshold, ~{stats['context_tokens']} context tokens)"
+    )
+    return context_docs
+
+def get_context(user_query, context_type, intent, tenant=DEFAULT_TENANT, sources=None):
+    """Build the context string for a routed query, or None when there is none.
+
+    If a sources list is passed, the records or chunk texts the context is built from are added to it.
+    """
+    if intent == "smalltalk":
+        return None
+
+    sources = sources if sources is not None else []
+    data_dir = tenant_data_dir(tenant)
+    schemes = []
+    if context_type == "schemes":
+        schemes, strong = get_scheme_index(data_dir).match(user_query)
+        if schemes and strong:
+            logger.info(f"Matched {len(schemes)} schemes from the structured index.")
+            sources.extend(schemes)
+            return format_schemes(schemes)
+        # Matches on broad facets alone ("women") miss schemes the question names; retrieve as well
+
+    if intent == "lookup":
+        records = lookup_records(context_type, user_query, data_dir=data_dir)
+        logger.info(f"Looked up {len(records)} {context_type} records.")
+        if records:
+            sources.extend(records)
+            return "\n".join(json.dumps(record, ensure_ascii=False) for record in records)
+        # Nothing matched directly; fall through to full retrieval
+
+    try:
+        context_docs = retrieve_context(user_query, tenant=tenant)
+        logger.info(f"Retrieved {len(context_docs)} documents.")
     except Exception as e:
-        logger.error(f"Error calling LLM API: {e}")
-        return f"Error: {str(e)}"
+        logger.error(f"Error retrieving documents: {e}")
+        context_docs = []
+
+    if schemes:
+        logger.info(f"Merging {len(schemes)} facet-matched schemes with the retrieved documents.")
+        sources.extend(schemes)
+    if not context_docs:
+        if schemes:
+            return format_schemes(schemes)
+        logger.warning("No relevant documents found. Proceeding with general response.")
+        return None
+    sources.extend(doc.page_content for doc in context_docs)
+    context = context_text(user_query, context_docs)
+    return f"{context}\n{format_schemes(schemes)}" if schemes else context
+
+def context_text(user_query, context_docs):
+    """Join the selected chunks into the prompt context, compressed to the sentences relevant to the query"""
+    texts = [doc.page_content for doc in context_docs]
+    if not COMPRESSION_ENABLED:
+        return "\n".join(texts)
+    context, stats = compress_context(user_query, texts, embeddings=get_embeddings())
+    logger.info(
+        f"Compressed context from ~{stats['original_tokens']} to ~{stats['compressed_tokens']} tokens "
+        f"in {stats['compress_ms']} ms"
+    )
+    return context
+
+# ChatRequest entity fields and the listing each one refers to
+ENTITY_FIELDS = {"job_id": "jobs", "event_id": "events", "program_id": "mentorship"}
+
+def pinned_records(request, tenant=DEFAULT_TENANT):
+    """The listing records a chat request names by id, as (context_type, record) pairs.
+
+    Raises KeyError naming the first id that does not exist.
+    """
+    data_dir = tenant_data_dir(tenant)
+    pinned = []
+    for field, context_type in ENTITY_FIELDS.items():
+        record_id = getattr(request, field)
+        if record_id is None:
+            continue
+        record = get_listing_index(context_type, data_dir).get(record_id)
+        if record is None:
+            raise KeyError(f"Unknown {field}: {record_id}")
+        pinned.append((context_type, record))
+    return pinned
+
+def degraded_answer(user_query, sources, context_type, intent, tenant=DEFAULT_TENANT):
+    """Answer without the LLM from the request's context sources, or from the listing records when there are none"""
+    if not sources and intent != "smalltalk":
+        data_dir = tenant_data_dir(tenant)
+        sources = []
+        for record_type in RECORD_FILES if context_type not in RECORD_FILES else [context_type]:
+            if record_type == "schemes":
+                sources.extend(get_scheme_index(data_dir).search(user_query))
+            else:
+                sources.extend(lookup_records(record_type, user_query, data_dir=data_dir))
+    return extractive_answer(user_query, sources, intent)
+
+def answer_query(user_query, context_type="auto"):
+    """Answer a standalone query without chat history, raising on LLM errors.
+
+    Returns the response with the context type and intent it was routed to.
+    """
+    route = route_query(user_query, context_type)
+    context = get_context(user_query, route["context_type"], route["intent"])
+    messages = build_messages(user_query, context, None, route["context_type"], route["intent"])
+    started = time.perf_counter()
+    response = get_llm().invoke(messages)
+    usage = build_usage(messages, context, response, {"llm": (time.perf_counter() - started) * 1000})
+    usage_tracker.record(usage, route["context_type"], "warm_refresh")
+    return response, route["context_type"], route["intent"]
+
+def warm_answers_fingerprint():
+    """Fingerprint of everything the warm answers depend on"""
+    questions_mtime = os.path.getmtime(SUGGESTED_QUESTIONS_FILE) if os.path.exists(SUGGESTED_QUESTIONS_FILE) else 0
+    return f"{corpus_fingerprint()}:{index_store.current_version()}:{questions_mtime}"
+
+def warm_answer(question, context_type="auto"):
+    """answer_query for the warm-answer store; an answer flagged by safety screening is not stored"""
+    response, resolved_context_type, intent = answer_query(question, context_type)
+    verdict = safety_screener.check(response) if safety_screener else None
+    if verdict and verdict["flagged"]:
+        raise ValueError(f"answer flagged by safety screening ({verdict['category']}, {verdict['score']})")
+    return response, resolved_context_type, intent
+
+# Pre-generated answers for the suggested questions, refreshed when the corpus changes
+warm_answers = WarmAnswerStore(warm_answer, warm_answers_fingerprint)
+
+# Re-indexes changed data files in the background and swaps the live index
+corpus_watcher = None
+
+def warm_records():
+    """Build the listing and scheme indexes"""
+    for context_type in ("jobs", "events", "mentorship"):
+        get_listing_index(context_type)
+    get_scheme_index()
+
+WARMUP_STEPS = [
+    ("index", get_shared_vector_db, True),
+    ("embeddings", lambda: get_embeddings().embed_query("warm-up"), True),
+    ("reranker", lambda: get_reranker().score("warm-up", ["warm-up"]), True),
+    ("retrieval", lambda: retrieve_context("Which government schemes support women entrepreneurs?"), True),
+    ("records", warm_records, True),
+]
+if WARMUP_LLM:
+    # Optional: a failing LLM ping is reported but does not keep the instance out of rotation
+    WARMUP_STEPS.append(("llm", lambda: get_llm().invoke("Reply with OK."), False))
+
+# Startup warm-up; /ready reports ready once it has finished
+readiness = Readiness(WARMUP_STEPS)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    """Make sure the listing files exist, then start the warm-up, pre-generating warm answers and watching the data files"""
+    global corpus_watcher
+    create_sample_files()
+    if WARMUP_ENABLED:
+        readiness.start()
+    else:
+        readiness.skip()
+    if WARM_ANSWERS_ENABLED:
+        warm_answers.start()
+    if WATCH_ENABLED:
+        corpus_watcher = CorpusWatcher(corpus_files, reindex_sources, directories=[".", PDF_DIR])
+        corpus_watcher.start()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    readiness.stop()
+    warm_answers.stop()
+    if safety_screener is not None:
+        safety_screener.stop()
+    if corpus_watcher is not None:
+        corpus_watcher.stop()
 
 def generate_id():
     """Generate a unique ID for conversations and messages"""
@@ -417,48 +1051,378 @@ async def chat_endpoint(request: ChatRequest):
         context_type = request.context_type
         
         logger.info(f"Received query: {user_query}")
-        logger.info(f"Context type: {context_type}")
+        started = time.perf_counter()
+        deadline = started + (request.deadline_ms or REQUEST_DEADLINE_MS) / 1000
+        # Retrieval and the LLM share the deadline, less the time reserved for a degraded answer
+        work_deadline = deadline - DEGRADED_RESERVE_MS / 1000
+        timings = {}
+        degraded_reason = None
         
-        documents = load_documents()
-        logger.info(f"Loaded {len(documents)} documents")
+        conversation_id = request.conversation_id or f"conv_{generate_id()}"
         
-        db = get_vector_db(documents)
-        retriever = db.as_retriever(search_kwargs={"k": 2})
-        logger.info("Vector database loaded successfully")
-
         try:
-            context_docs = retriever.get_relevant_documents(user_query)
-            context_docs = np.array(context_docs).squeeze().tolist()
-            logger.info(f"Retrieved {len(context_docs)} documents.")
-        except Exception as e:
-            logger.error(f"Error retrieving documents: {e}")
-            context_docs = []
-
-        if not context_docs:
-            logger.warning("No relevant documents found. Proceeding with general response.")
-            context = None
+            tenant = resolve_tenant(request.tenant_id)
+        except UnknownTenant as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
+        
+        # Screen the query while it is routed and its context retrieved
+        query_check = safety_screener.submit(user_query) if safety_screener else None
+        
+        stage_started = time.perf_counter()
+        try:
+            pinned = pinned_records(request, tenant)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
+        lookup_ms = (time.perf_counter() - stage_started) * 1000
+        
+        # Pre-generated answers come from the main corpus
+        warm = None if pinned or tenant != DEFAULT_TENANT else warm_answers.get(user_query, context_type)
+        # Warm answers were screened when stored; the query still is, and a flagged one gets the neutral reply below
+        query_verdict = await safety_screener.result(query_check) if warm and query_check else None
+        if warm and not (query_verdict and query_verdict["flagged"]):
+            logger.info("Serving pre-generated answer")
+            usage = build_usage(timings={"total": (time.perf_counter() - started) * 1000})
+            usage_tracker.record(usage, warm["context_type"], "cached", tenant)
+            return {
+                "response": warm["response"],
+                "conversation_id": conversation_id,
+                "message_id": f"msg_{generate_id()}",
+                "is_biased": False,
+                "context_type": warm["context_type"],
+                "intent": warm["intent"],
+                "cached": True,
+                "degraded": False,
+                "safety": {"query": query_verdict, "answer": None},
+                "usage": usage
+            }
+        
+        if pinned:
+            # The user asked about specific records: use them as the context and skip routing and search
+            context_types = {pinned_type for pinned_type, _ in pinned}
+            context_type = context_types.pop() if len(context_types) == 1 else "all"
+            intent = "entity"
+            sources = [record for _, record in pinned]
+            context = "\n".join(json.dumps(record, ensure_ascii=False) for record in sources)
+            timings["retrieval"] = lookup_ms
+            logger.info(f"Context type: {context_type}, pinned {len(pinned)} records")
         else:
-            context = "\n".join([doc.page_content for doc in context_docs])
+            stage_started = time.perf_counter()
+            route = route_query(user_query, context_type)
+            context_type = route["context_type"]
+            intent = route["intent"]
+            timings["route"] = (time.perf_counter() - stage_started) * 1000
+            logger.info(f"Context type: {context_type}, intent: {intent} ({route['method']})")
+            
+            # Retrieval runs off the event loop; if it misses the deadline, answer from what it found so far
+            stage_started = time.perf_counter()
+            sources = []
+            try:
+                context = await asyncio.wait_for(
+                    asyncio.to_thread(get_context, user_query, context_type, intent, tenant, sources),
+                    timeout=max(0.0, work_deadline - time.perf_counter()),
+                )
+            except asyncio.TimeoutError:
+                context = None
+                sources = list(sources)
+                degraded_reason = "deadline"
+                logger.warning(f"Retrieval missed the {(deadline - started) * 1000:.0f} ms deadline; answering from the records")
+            timings["retrieval"] = (time.perf_counter() - stage_started) * 1000
         
-        chat_history.append({"role": "user", "content": user_query})
+        # The client may already include the current query at the end of its history
+        if chat_history and chat_history[-1].get("content") == user_query:
+            chat_history = chat_history[:-1]
+        
+        # A biased or unsafe query gets a neutral reply instead of an LLM call
+        if query_verdict is None and query_check:
+            query_verdict = await safety_screener.result(query_check)
+        if query_verdict and query_verdict["flagged"]:
+            logger.info(f"Query flagged by safety screening ({query_verdict['category']}, {query_verdict['score']})")
+            timings["total"] = (time.perf_counter() - started) * 1000
+            usage = build_usage(timings=timings)
+            usage_tracker.record(usage, context_type, "blocked", tenant)
+            return {
+                "response": safe_response(query_verdict["category"]),
+                "conversation_id": conversation_id,
+                "message_id": f"msg_{generate_id()}",
+                "is_biased": True,
+                "context_type": context_type,
+                "intent": intent,
+                "cached": False,
+                "degraded": False,
+                "safety": {"query": query_verdict, "answer": None},
+                "usage": usage
+            }
         
-        response = query_llm(user_query, context, chat_history, context_type)
+        # Only conversations the client identifies are summarized; an id made up for this response is never seen again
+        stage_started = time.perf_counter()
+        summary, recent_history = memory.get_context(request.conversation_id, chat_history)
+        timings["memory"] = (time.perf_counter() - stage_started) * 1000
+        
+        # The LLM gets what is left of the deadline; if it misses that or fails, answer from the sources instead
+        usage = build_usage(timings={})
+        if degraded_reason is None:
+            try:
+                response = await query_llm(user_query, context, recent_history, context_type, intent, summary,
+                                           usage=usage, deadline=work_deadline)
+            except asyncio.TimeoutError:
+                degraded_reason = "deadline"
+                logger.warning(f"LLM missed its share of the {(deadline - started) * 1000:.0f} ms deadline; answering from the context")
+            except Exception as e:
+                degraded_reason = "llm_error"
+                logger.error(f"Error calling LLM API: {e}")
+            timings["llm"] = usage["timings_ms"]["llm"]
+        if degraded_reason:
+            stage_started = time.perf_counter()
+            response = degraded_answer(user_query, sources, context_type, intent, tenant)
+            timings["fallback"] = (time.perf_counter() - stage_started) * 1000
+            usage["degraded"] = degraded_reason
+        # Screen the answer while the response is assembled
+        answer_check = safety_screener.submit(response) if safety_screener else None
+        timings["total"] = (time.perf_counter() - started) * 1000
+        usage["timings_ms"] = {stage: round(ms, 1) for stage, ms in timings.items()}
+        usage_tracker.record(usage, context_type, intent, tenant)
+        logger.info(f"Usage: {json.dumps({'tenant': tenant, 'context_type': context_type, 'route': intent, **usage})}")
         
         # Generate unique IDs for tracking
-        conversation_id = f"conv_{generate_id()}"
         message_id = f"msg_{generate_id()}"
         
+        answer_verdict = await safety_screener.result(answer_check) if answer_check else None
+        is_biased = bool(answer_verdict and answer_verdict["flagged"])
+        if is_biased:
+            logger.warning(f"Answer flagged by safety screening ({answer_verdict['category']}, {answer_verdict['score']})")
+            response = safe_response(answer_verdict["category"])
+        
         return {
             "response": response,
             "conversation_id": conversation_id,
             "message_id": message_id,
-            "is_biased": False
+            "is_biased": is_biased,
+            "context_type": context_type,
+            "intent": intent,
+            "cached": False,
+            "degraded": degraded_reason is not None,
+            "degraded_reason": degraded_reason,
+            "safety": {"query": query_verdict, "answer": answer_verdict},
+            "usage": usage
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in API endpoint: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+def retrieve_batch(queries, k=RETRIEVAL_MAX_K, tenant=DEFAULT_TENANT):
+    """Embed all queries in batched calls and retrieve their candidates in one vectorized query per batch.
+
+    Each query then gets its own relevance-filtered, diversified selection of
+    at most k chunks. Returns one context string (or None) per query, in input order.
+    """
+    contexts = [None] * len(queries)
+    embeddings = get_embeddings()
+    reranker = get_reranker()
+
+    with use_index(tenant) as db:
+        for start in range(0, len(queries), EMBED_BATCH_SIZE):
+            chunk = queries[start:start + EMBED_BATCH_SIZE]
+            try:
+                query_vectors = embeddings.embed_documents(chunk)
+                all_candidates = fetch_candidates(db, query_vectors, RERANK_CANDIDATES)
+                for offset, candidates in enumerate(all_candidates):
+                    selected, _ = select_context(chunk[offset], query_vectors[offset], candidates, reranker, max_k=k)
+                    if selected:
+                        contexts[start + offset] = context_text(chunk[offset], selected)
+            except Exception as e:
+                logger.error(f"Error retrieving documents for batch starting at {start}: {e}")
+
+    return contexts
+
+async def run_batch(items, k=RETRIEVAL_MAX_K, max_concurrency=4, tenant=DEFAULT_TENANT):
+    """Answer a batch of queries, yielding one result dict per item as soon as it completes."""
+    routes = [route_query(item.query, item.context_type) if item.query.strip() else None for item in items]
+    contexts = [None] * len(items)
+    for i, route in enumerate(routes):
+        if route and route["intent"] == "lookup":
+            records = lookup_records(route["context_type"], items[i].query, data_dir=tenant_data_dir(tenant))
+            if records:
+                contexts[i] = "\n".join(json.dumps(record, ensure_ascii=False) for record in records)
+            else:
+                route["intent"] = "question"
+
+    retrievable = [i for i, route in enumerate(routes) if route and route["intent"] == "question"]
+    if retrievable:
+        retrieved = await asyncio.to_thread(retrieve_batch, [items[i].query for i in retrievable], k, tenant)
+        for i, context in zip(retrievable, retrieved):
+            contexts[i] = context
+    logger.info(f"Retrieved context for {sum(c is not None for c in contexts)} of {len(items)} batch queries")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def answer(index, item):
+        result = {
+            "index": index,
+            "id": item.id if item.id is not None else str(index),
+            "query": item.query,
+        }
+        route = routes[index]
+        if route is None:
+            result.update({"status": "error", "error": "Empty query"})
+            return result
+
+        result.update({"context_type": route["context_type"], "intent": route["intent"]})
+        messages = build_messages(item.query, contexts[index], None, route["context_type"], route["intent"])
+        started = time.time()
+        response = ""
+        async with semaphore:
+            llm_started = time.perf_counter()
+            try:
+                response = await get_llm().ainvoke(messages)
+                result.update({"status": "ok", "response": response})
+            except Exception as e:
+                logger.error(f"Error answering batch item {result['id']}: {e}")
+                result.update({"status": "error", "error": str(e)})
+            llm_ms = (time.perf_counter() - llm_started) * 1000
+        result["used_context"] = contexts[index] is not None
+        result["latency_ms"] = round((time.time() - started) * 1000, 1)
+        result["usage"] = build_usage(messages, contexts[index], response, {"llm": llm_ms})
+        usage_tracker.record(result["usage"], route["context_type"], route["intent"], tenant)
+        return result
+
+    tasks = [asyncio.create_task(answer(i, item)) for i, item in enumerate(items)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+@app.post("/batch")
+async def batch_endpoint(request: BatchRequest):
+    """Answer many queries at once, streaming results back as JSON lines"""
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="No queries provided")
+    if len(request.queries) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch too large: at most {MAX_BATCH_SIZE} queries allowed")
+
+    try:
+        tenant = resolve_tenant(request.tenant_id)
+    except UnknownTenant as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+    logger.info(f"Received batch of {len(request.queries)} queries")
+    max_concurrency = max(1, min(request.max_concurrency, MAX_BATCH_CONCURRENCY))
+
+    async def stream_results():
+        async for result in run_batch(request.queries, request.k, max_concurrency, tenant):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+def tenant_dir_or_404(tenant_id):
+    """Data directory of the tenant a listing request names"""
+    try:
+        return tenant_data_dir(resolve_tenant(tenant_id))
+    except UnknownTenant as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+def listing_response(context_type, request, filters, cursor, limit, fields, tenant_id=None):
+    """Serve one page of a listing, answering 304 when the client's ETag is still current"""
+    filters = {name: value for name, value in filters.items() if value is not None}
+    index = get_listing_index(context_type, tenant_dir_or_404(tenant_id))
+    etag = index.etag({**filters, "cursor": cursor, "limit": limit, "fields": fields})
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    matches = index.filter(**filters)
+    try:
+        items, next_cursor = index.page(matches, cursor, limit, field_list)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return JSONResponse(
+        {"items": items, "total": len(matches), "next_cursor": next_cursor},
+        headers={"ETag": etag, "Cache-Control": "no-cache"}
+    )
+
+@app.get("/jobs")
+async def list_jobs(
+    request: Request,
+    q: Optional[str] = None,
+    location: Optional[str] = None,
+    work_mode: Optional[str] = None,
+    job_type: Optional[str] = None,
+    posted_from: Optional[str] = None,
+    posted_to: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = None,
+    tenant_id: Optional[str] = None
+):
+    """List job openings, newest first"""
+    filters = {"q": q, "location": location, "work_mode": work_mode, "job_type": job_type,
+               "date_from": posted_from, "date_to": posted_to}
+    return listing_response("jobs", request, filters, cursor, limit, fields, tenant_id)
+
+@app.get("/events")
+async def list_events(
+    request: Request,
+    q: Optional[str] = None,
+    location: Optional[str] = None,
+    event_type: Optional[str] = None,
+    online: Optional[bool] = None,
+    is_free: Optional[bool] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = None,
+    tenant_id: Optional[str] = None
+):
+    """List community events, soonest first"""
+    filters = {"q": q, "location": location, "event_type": event_type, "online": online,
+               "is_free": is_free, "date_from": date_from, "date_to": date_to}
+    return listing_response("events", request, filters, cursor, limit, fields, tenant_id)
+
+@app.get("/mentorship")
+async def list_mentorship(
+    request: Request,
+    q: Optional[str] = None,
+    expertise: Optional[str] = None,
+    duration: Optional[str] = None,
+    deadline_from: Optional[str] = None,
+    deadline_to: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = None,
+    tenant_id: Optional[str] = None
+):
+    """List mentorship programs, earliest application deadline first"""
+    filters = {"q": q, "expertise": expertise, "duration": duration,
+               "date_from": deadline_from, "date_to": deadline_to}
+    return listing_response("mentorship", request, filters, cursor, limit, fields, tenant_id)
+
+@app.get("/schemes")
+async def list_schemes(
+    q: Optional[str] = None,
+    ministry: Optional[str] = None,
+    target_group: Optional[str] = None,
+    sector: Optional[str] = None,
+    benefit_type: Optional[str] = None,
+    question: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    tenant_id: Optional[str] = None
+):
+    """Filter government schemes by their extracted fields, or rank them for a free-text question"""
+    index = get_scheme_index(tenant_dir_or_404(tenant_id))
+    if question:
+        schemes = index.search(question, limit=limit)
+    else:
+        schemes = index.filter(ministry, target_group, sector, benefit_type, q)[:limit]
+    return {"items": schemes, "total": len(schemes)}
+
 @app.post("/feedback")
 async def feedback_endpoint(request: FeedbackRequest):
     """Endpoint to collect user feedback"""
@@ -483,11 +1447,154 @@ async def feedback_endpoint(request: FeedbackRequest):
         logger.error(f"Error recording feedback: {e}")
         raise HTTPException(status_code=500, detail=f"Error recording feedback: {str(e)}")
 
+@app.get("/usage")
+async def usage_report():
+    """Token, timing and cost totals by context type and by route"""
+    return usage_tracker.snapshot()
+
+@app.get("/safety")
+async def safety_report():
+    """Bias and safety screening counts, cache hits and budget misses"""
+    if safety_screener is None:
+        return {"enabled": False}
+    return {"enabled": True, **safety_screener.snapshot()}
+
+@app.get("/tenants")
+async def tenants_report():
+    """Tenants, which of their indexes are loaded, cache hits, loads, evictions and usage"""
+    report = tenant_indexes.snapshot()
+    usage = usage_tracker.snapshot()["by_tenant"]
+    for tenant in [DEFAULT_TENANT] + list_tenants():
+        entry = report["tenants"].setdefault(tenant, {"resident": False})
+        if tenant == DEFAULT_TENANT:
+            entry["resident"] = _vector_db is not None
+        if not entry.get("version"):
+            entry["version"] = index_store.current_version(tenant_index_root(tenant))
+        entry["usage"] = usage.get(tenant)
+    return report
+
+@app.post("/tenants/{tenant_id}/reload")
+async def tenant_reload(tenant_id: str):
+    """Unload a tenant's index so its next request loads it again, rebuilding it if its files changed"""
+    try:
+        tenant = resolve_tenant(tenant_id)
+    except UnknownTenant as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    if tenant == DEFAULT_TENANT:
+        raise HTTPException(status_code=400, detail="The default tenant is re-indexed by the corpus watcher")
+    return {"tenant_id": tenant, "unloaded": await asyncio.to_thread(tenant_indexes.evict, tenant)}
+
+@app.get("/index")
+async def index_versions():
+    """List the index versions and which one is live"""
+    live = index_store.current_version()
+    versions = []
+    for version in index_store.list_versions():
+        manifest = index_store.read_manifest(version) or {}
+        versions.append({
+            "version": version,
+            "live": version == live,
+            "complete": bool(manifest),
+            "chunk_count": manifest.get("chunk_count"),
+            "created_at": manifest.get("created_at"),
+        })
+    return {"live": live, "pinned": index_store.is_pinned(), "versions": versions}
+
+@app.post("/index/rollback")
+async def index_rollback(version: Optional[str] = None):
+    """Make the previous (or the given) index version live"""
+    try:
+        version = await asyncio.to_thread(rollback_index, version)
+    except index_store.InvalidIndex as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error rolling back index: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    return {"live": version}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": time.time()}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 200 once the warm-up has finished, 503 before, with per-component status"""
+    status = readiness.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+if PROFILING_ENABLED:
+    # Profiling hooks exist only when PROFILING_ENABLED=1; otherwise nothing is registered
+    _request_profiler_lock = threading.Lock()
+    memory_tracker = MemoryTracker()
+
+    def check_profiling_token(request):
+        if PROFILING_TOKEN and request.headers.get("x-profiling-token") != PROFILING_TOKEN:
+            raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        """Profile a single request sent with the header X-Profile: 1"""
+        if request.headers.get("x-profile") != "1":
+            return await call_next(request)
+        if PROFILING_TOKEN and request.headers.get("x-profiling-token") != PROFILING_TOKEN:
+            return JSONResponse(status_code=403, content={"detail": "Invalid profiling token"})
+        # One profiled request at a time keeps the overhead bounded
+        if not _request_profiler_lock.acquire(blocking=False):
+            response = await call_next(request)
+            response.headers["X-Profile"] = "busy"
+            return response
+        try:
+            # The handler runs on this (event loop) thread, so only it is sampled
+            profiler = SamplingProfiler(thread_ids=[threading.get_ident()]).start()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.stop()
+            path = profiler.save(f"request-{generate_id()}")
+            logger.info(f"Profiled {request.method} {request.url.path}: {profiler.samples} samples in {path}")
+            response.headers["X-Profile-File"] = path
+            return response
+        finally:
+            _request_profiler_lock.release()
+
+    @app.post("/admin/profile")
+    async def profile_window(request: Request, seconds: float = Query(10.0, gt=0, le=300),
+                             interval_ms: float = Query(PROFILE_INTERVAL_MS, ge=1, le=1000)):
+        """Sample every thread for a time window and return flamegraph-ready folded stacks"""
+        check_profiling_token(request)
+        profiler = SamplingProfiler(interval_ms=interval_ms).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+        path = profiler.save("window")
+        logger.info(f"Profiled all threads for {seconds}s: {profiler.samples} samples in {path}")
+        return Response(content=profiler.folded(), media_type="text/plain", headers={"X-Profile-File": path})
+
+    @app.post("/admin/memory/snapshot")
+    async def memory_snapshot(request: Request):
+        """Start tracemalloc if needed and take a new baseline snapshot"""
+        check_profiling_token(request)
+        return await asyncio.to_thread(memory_tracker.take_snapshot)
+
+    @app.get("/admin/memory/diff")
+    async def memory_diff(request: Request, top: int = Query(20, ge=1, le=200),
+                          group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$")):
+        """Allocation growth since the last snapshot"""
+        check_profiling_token(request)
+        try:
+            return await asyncio.to_thread(memory_tracker.diff, top, group_by)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @app.post("/admin/memory/stop")
+    async def memory_stop(request: Request):
+        """Stop tracemalloc so tracing overhead goes away"""
+        check_profiling_token(request)
+        memory_tracker.stop()
+        return {"status": "stopped"}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
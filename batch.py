@@ -0,0 +1,83 @@
+"""Command line tool for answering many queries with Asha at once.
+
+Input is a file with one query per line, either as plain text or as a JSON
+object with "query" and optional "id" and "context_type" fields. Results are
+written as JSON lines, one per query, with a per-item "status".
+
+    python batch.py questions.jsonl --output answers.jsonl
+    python batch.py questions.txt --url http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import requests
+
+from retrieval import RETRIEVAL_MAX_K
+
+
+def read_queries(path):
+    """Read queries from a text or JSON lines file"""
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                item = json.loads(line)
+                queries.append({
+                    "id": str(item.get("id", line_number)),
+                    "query": item.get("query", ""),
+                    "context_type": item.get("context_type", "auto")
+                })
+            else:
+                queries.append({"id": str(line_number), "query": line, "context_type": "auto"})
+    return queries
+
+
+def run_remote(url, queries, k, concurrency, out):
+    """Send the batch to a running Asha server and copy the streamed results"""
+    payload = {"queries": queries, "k": k, "max_concurrency": concurrency}
+    with requests.post(f"{url.rstrip('/')}/batch", json=payload, stream=True) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if line:
+                out.write(line + "\n")
+                out.flush()
+
+
+async def run_local(queries, k, concurrency, out):
+    """Answer the batch in this process without going through the HTTP API"""
+    from app import BatchQuery, run_batch
+
+    items = [BatchQuery(**query) for query in queries]
+    async for result in run_batch(items, k, concurrency):
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a batch of queries with Asha")
+    parser.add_argument("input", help="File with one query per line (plain text or JSON lines)")
+    parser.add_argument("--output", "-o", help="Where to write JSON line results (default: stdout)")
+    parser.add_argument("--url", help="Base URL of a running Asha server; runs in-process if omitted")
+    parser.add_argument("--k", type=int, default=RETRIEVAL_MAX_K, help="Maximum context chunks per query")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum concurrent LLM calls")
+    args = parser.parse_args()
+
+    queries = read_queries(args.input)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.url:
+            run_remote(args.url, queries, args.k, args.concurrency, out)
+        else:
+            asyncio.run(run_local(queries, args.k, args.concurrency, out))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
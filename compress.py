@@ -0,0 +1,259 @@
+"""Query-focused compression of retrieved context.
+
+Retrieved chunks are up to ~1,000 characters, most of which has nothing to
+do with the question. Before the prompt is built, every chunk is split into
+sentences and each sentence is scored against the query, lexically (IDF-
+weighted term overlap, no model) or with the embedding model. The first
+sentence of every text chunk is kept because it names the section the rest
+belongs to; the best-scoring other sentences are added until the token
+budget is used up. Kept sentences stay in their original order and a "..."
+marks each gap.
+
+JSON records (jobs, events, programs, schemes) are compressed field by field
+and stay valid JSON: short fields such as the title, dates and links are
+kept whole, and only the sentences of long text fields compete for the
+budget. A chunk holding part of a record that was split is kept whole.
+
+Run this module directly to measure it on the golden questions from
+evaluate.py: the latency added, the prompt tokens saved and how often the
+answer-bearing fields (an event's date, a program's application link, a
+scheme's description) survive compression, a proxy for answer quality:
+
+    python compress.py
+    python compress.py --budget 150 --scorer embedding
+"""
+import argparse
+import json
+import math
+import os
+import re
+import time
+
+import numpy as np
+
+from rerank import estimate_tokens, tokenize
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_SCORER = os.getenv("COMPRESSION_SCORER", "lexical")  # "lexical" or "embedding"
+COMPRESSION_TOKEN_BUDGET = int(os.getenv("COMPRESSION_TOKEN_BUDGET", "250"))
+# Chunks shorter than this are passed through whole
+COMPRESSION_MIN_TOKENS = int(os.getenv("COMPRESSION_MIN_TOKENS", "60"))
+# Record fields shorter than this are kept whole
+COMPRESSION_FIELD_TOKENS = int(os.getenv("COMPRESSION_FIELD_TOKENS", "40"))
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def parse_record(text):
+    """The JSON object a chunk holds, or None if it is plain text"""
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def is_record_fragment(text):
+    """Whether a chunk is part of a JSON record that was split across chunks"""
+    stripped = text.strip()
+    return (stripped.startswith("{") or stripped.endswith("}")) and '": ' in stripped
+
+
+def join_kept(sentences):
+    """Kept sentences in order, with "..." marking each gap"""
+    positions = sorted(sentences)
+    pieces = []
+    for previous, position in zip([-1] + positions, positions):
+        if position != previous + 1:
+            pieces.append("...")
+        pieces.append(sentences[position])
+    return " ".join(pieces)
+
+
+def lexical_scores(query, sentences):
+    """IDF-weighted share of the query's terms found in each sentence"""
+    query_terms = set(tokenize(query))
+    if not query_terms:
+        return [0.0 for _ in sentences]
+    sentence_terms = [set(tokenize(sentence)) for sentence in sentences]
+    count = len(sentences)
+    idf = {term: math.log(1 + count / (1 + sum(term in terms for terms in sentence_terms))) for term in query_terms}
+    total = sum(idf.values())
+    return [sum(idf[term] for term in query_terms & terms) / total for terms in sentence_terms]
+
+
+def embedding_scores(query_vector, sentences, embeddings):
+    """Cosine similarity between the query vector and each sentence's embedding"""
+    matrix = np.asarray(embeddings.embed_documents(sentences), dtype=np.float32)
+    vector = np.asarray(query_vector, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+    norms[norms == 0] = 1e-12
+    return (matrix @ vector / norms).tolist()
+
+
+def compress_context(query, texts, token_budget=COMPRESSION_TOKEN_BUDGET, scorer=COMPRESSION_SCORER,
+                     query_vector=None, embeddings=None):
+    """Keep the sentences of texts most relevant to the query within token_budget.
+
+    Returns the compressed context string and a dict of stats.
+    """
+    started = time.perf_counter()
+    original_tokens = sum(estimate_tokens(text) for text in texts)
+
+    # (chunk, field, position, sentence) for every sentence that competes for the budget;
+    # field is None for a text chunk and the field name for a record's long text field
+    kept = {}
+    records = {}
+    candidates = []
+    used = 0
+    for chunk, text in enumerate(texts):
+        record = parse_record(text)
+        if estimate_tokens(text) < COMPRESSION_MIN_TOKENS or (record is None and is_record_fragment(text)):
+            kept[chunk] = {None: {0: text}}
+            used += estimate_tokens(text)
+            continue
+        if record is not None:
+            records[chunk] = record
+            kept[chunk] = {}
+            for field, value in record.items():
+                if isinstance(value, str) and estimate_tokens(value) >= COMPRESSION_FIELD_TOKENS:
+                    kept[chunk][field] = {}
+                    candidates.extend((chunk, field, position, sentence)
+                                      for position, sentence in enumerate(split_sentences(value)))
+                else:
+                    used += estimate_tokens(json.dumps({field: value}))
+            continue
+        sentences = split_sentences(text)
+        kept[chunk] = {None: {0: sentences[0]} if sentences else {}}
+        used += estimate_tokens(sentences[0]) if sentences else 0
+        candidates.extend((chunk, None, position, sentence) for position, sentence in enumerate(sentences) if position)
+
+    if candidates:
+        sentences = [sentence for _, _, _, sentence in candidates]
+        if scorer == "embedding" and embeddings is not None:
+            if query_vector is None:
+                query_vector = embeddings.embed_query(query)
+            scores = embedding_scores(query_vector, sentences, embeddings)
+        else:
+            scores = lexical_scores(query, sentences)
+        for score, (chunk, field, position, sentence) in sorted(zip(scores, candidates), key=lambda pair: -pair[0]):
+            if score <= 0:
+                break
+            tokens = estimate_tokens(sentence)
+            if used + tokens > token_budget:
+                continue
+            kept[chunk][field][position] = sentence
+            used += tokens
+
+    parts = []
+    for chunk in range(len(texts)):
+        if chunk in records:
+            record = dict(records[chunk])
+            for field, sentences in kept[chunk].items():
+                record[field] = join_kept(sentences) if sentences else "..."
+            # Serialized like the stored chunks, so record values read the same before and after
+            parts.append(json.dumps(record))
+        else:
+            parts.append(join_kept(kept[chunk][None]))
+    context = "\n".join(parts)
+
+    compressed_tokens = estimate_tokens(context)
+    stats = {
+        "original_tokens": original_tokens,
+        "compressed_tokens": compressed_tokens,
+        "tokens_saved": max(0, original_tokens - compressed_tokens),
+        "compress_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    return context, stats
+
+
+# Record fields that answer the questions asked about a record by name
+ANSWER_FIELDS = {
+    "job-name": ("jobs", ["location", "apply_link"]),
+    "event-name": ("events", ["date", "time"]),
+    "mentorship-name": ("mentorship", ["application_deadline", "application_link"]),
+}
+
+
+def answer_facts(golden):
+    """For each golden question, the strings an answer to it needs from the context.
+
+    A question naming a record needs that record's answer-bearing fields, and
+    "What is <scheme>?" needs the start of the scheme's description, not the
+    title the question already contains. Questions that describe a record
+    need its title, and guide questions their listed answers.
+    """
+    from app import load_records
+    from evaluate import answer_key
+
+    by_title = {}
+    for kind, (record_type, fields) in ANSWER_FIELDS.items():
+        for record in load_records(record_type):
+            by_title[(kind, answer_key(record.get("title", "")))] = [
+                answer_key(record[field]) for field in fields if record.get(field)
+            ]
+    descriptions = {item["answers"][0]: item["answers"][1:] for item in golden if item["kind"] == "scheme-description"}
+
+    facts = []
+    for item in golden:
+        if item["kind"] in ANSWER_FIELDS:
+            facts.append(by_title.get((item["kind"], item["answers"][0]), []))
+        elif item["kind"] == "scheme-name":
+            facts.append(descriptions.get(item["answers"][0], []))
+        else:
+            facts.append(item["answers"])
+    return facts
+
+
+def report(budget, scorer, limit=None):
+    """Compress the retrieved context of the golden questions and print the trade-off"""
+    from app import get_embeddings, retrieve_context
+    from evaluate import build_golden_set
+
+    golden = build_golden_set()[:limit]
+    facts = answer_facts(golden)
+    embeddings = get_embeddings() if scorer == "embedding" else None
+    original_tokens = compressed_tokens = 0
+    kept_before = kept_after = 0
+    latencies = []
+    for item, needed in zip(golden, facts):
+        documents = retrieve_context(item["query"])
+        if not documents:
+            continue
+        texts = [doc.page_content for doc in documents]
+        context, stats = compress_context(item["query"], texts, budget, scorer, embeddings=embeddings)
+        original_tokens += stats["original_tokens"]
+        compressed_tokens += stats["compressed_tokens"]
+        latencies.append(stats["compress_ms"])
+        original = "\n".join(texts).lower()
+        if needed and all(fact in original for fact in needed):
+            kept_before += 1
+            if all(fact in context.lower() for fact in needed):
+                kept_after += 1
+
+    if not latencies:
+        print("No question retrieved any context")
+        return
+    latencies.sort()
+    print(f"{len(latencies)} of {len(golden)} golden questions retrieved context ({scorer} scorer, budget {budget} tokens)")
+    print(f"Prompt context tokens: {original_tokens} -> {compressed_tokens} "
+          f"({100 * (1 - compressed_tokens / original_tokens):.0f}% saved, "
+          f"{(original_tokens - compressed_tokens) / len(latencies):.0f} per question)")
+    print(f"Compression latency: p50 {latencies[len(latencies) // 2]:.2f} ms, "
+          f"p95 {latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]:.2f} ms")
+    if kept_before:
+        print(f"Answer kept: {kept_after} of {kept_before} questions whose retrieved context contained "
+              f"their answer-bearing fields ({100 * kept_after / kept_before:.1f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure query-focused context compression on the golden questions")
+    parser.add_argument("--budget", type=int, default=COMPRESSION_TOKEN_BUDGET)
+    parser.add_argument("--scorer", default=COMPRESSION_SCORER, choices=["lexical", "embedding"])
+    parser.add_argument("--limit", type=int, help="Only the first N golden questions")
+    args = parser.parse_args()
+    report(args.budget, args.scorer, args.limit)
@@ -0,0 +1,106 @@
+"""Rolling conversation summarization.
+
+The last few messages of a conversation are kept verbatim; everything older
+is folded into a compact running summary. Folding runs on a background
+thread, so a request never waits for it: it uses whatever summary is ready
+and the next request picks up the refreshed one. Per-turn prompt size stays
+bounded however long the conversation gets.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("asha_chatbot")
+
+VERBATIM_MESSAGES = int(os.getenv("VERBATIM_MESSAGES", "4"))
+SUMMARY_MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", "1200"))
+MAX_CONVERSATIONS = int(os.getenv("MAX_CONVERSATIONS", "10000"))
+
+
+def fallback_summary(summary, messages, max_chars=SUMMARY_MAX_CHARS):
+    """Cheap extractive summary: the first sentence of each message, newest kept"""
+    lines = [summary] if summary else []
+    for message in messages:
+        first_sentence = message["content"].strip().split("\n")[0].split(". ")[0][:200]
+        lines.append(f"{message['role']}: {first_sentence}")
+    text = "\n".join(lines)
+    return text[-max_chars:]
+
+
+class RollingSummaryMemory:
+    """Per-conversation rolling summary of messages older than the verbatim window"""
+
+    def __init__(self, summarize_fn=None, verbatim_messages=VERBATIM_MESSAGES, max_conversations=MAX_CONVERSATIONS):
+        # summarize_fn(previous_summary, new_messages) -> new summary text
+        self.summarize_fn = summarize_fn or fallback_summary
+        self.verbatim_messages = verbatim_messages
+        self.max_conversations = max_conversations
+        self.conversations = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="summarizer")
+
+    @staticmethod
+    def _clean(messages):
+        return [
+            {"role": message.get("role", "user"), "content": str(message.get("content", ""))}
+            for message in messages
+            if message.get("content")
+        ]
+
+    def _state(self, conversation_id):
+        state = self.conversations.get(conversation_id)
+        if state is None:
+            state = {"summary": "", "folded": 0, "pending": False, "generation": 0}
+            self.conversations[conversation_id] = state
+            while len(self.conversations) > self.max_conversations:
+                self.conversations.popitem(last=False)
+        self.conversations.move_to_end(conversation_id)
+        return state
+
+    def get_context(self, conversation_id, chat_history):
+        """Return (summary, recent_messages) to put in the prompt.
+
+        Schedules a background fold when messages older than the verbatim
+        window are not yet covered by the summary.
+        """
+        messages = self._clean(chat_history or [])
+        recent = messages[-self.verbatim_messages:] if self.verbatim_messages else []
+        older = messages[:max(0, len(messages) - self.verbatim_messages)]
+        if not conversation_id:
+            return None, recent
+
+        with self.lock:
+            state = self._state(conversation_id)
+            if len(older) < state["folded"]:
+                # The client started over (e.g. cleared the chat)
+                state.update({"summary": "", "folded": 0, "generation": state["generation"] + 1})
+            summary = state["summary"] or None
+            if len(older) > state["folded"] and not state["pending"]:
+                state["pending"] = True
+                self.executor.submit(
+                    self._fold, conversation_id, older[state["folded"]:], len(older), state["generation"]
+                )
+
+        return summary, recent
+
+    def _fold(self, conversation_id, new_messages, folded_upto, generation):
+        with self.lock:
+            previous = self.conversations.get(conversation_id, {}).get("summary", "")
+        try:
+            summary = self.summarize_fn(previous, new_messages)
+        except Exception as e:
+            logger.error(f"Error summarizing conversation {conversation_id}: {e}")
+            summary = fallback_summary(previous, new_messages)
+
+        with self.lock:
+            state = self.conversations.get(conversation_id)
+            if state is None:
+                return
+            state["pending"] = False
+            # Ignore the result if the conversation was reset while we worked
+            if state["generation"] == generation:
+                state["summary"] = summary[:SUMMARY_MAX_CHARS]
+                state["folded"] = folded_upto
+        logger.info(f"Folded {len(new_messages)} messages into summary for {conversation_id}")
@@ -0,0 +1,168 @@
+"""Near-duplicate chunk elimination for index builds.
+
+Two passes run before chunks are stored:
+
+1. Text: a 64-bit SimHash over word shingles finds candidate pairs through
+   banded lookups, and candidates whose shingle Jaccard similarity clears
+   DEDUP_JACCARD are merged.
+2. Embeddings: chunks whose embedding cosine similarity to an already kept
+   chunk clears DEDUP_COSINE are merged.
+
+A merged chunk keeps the first occurrence's text and records every source it
+stood for in its "sources" metadata, plus a "duplicates" count.
+
+Run this module directly to see how much the text pass shrinks the corpus:
+
+    python dedup.py
+"""
+import hashlib
+import os
+import re
+
+import numpy as np
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_JACCARD = float(os.getenv("DEDUP_JACCARD", "0.8"))
+DEDUP_COSINE = float(os.getenv("DEDUP_COSINE", "0.97"))
+SIMHASH_MAX_DISTANCE = 3
+SIMHASH_BANDS = 4  # 4 bands of 16 bits: pairs within 3 bits must share a band
+SHINGLE_SIZE = 3
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of word n-grams of a text"""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def simhash(features):
+    """64-bit SimHash of a set of string features"""
+    weights = np.zeros(64, dtype=np.int32)
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        bits = (value >> np.arange(64, dtype=np.uint64)) & 1
+        weights += np.where(bits == 1, 1, -1).astype(np.int32)
+    fingerprint = 0
+    for bit in np.nonzero(weights > 0)[0]:
+        fingerprint |= 1 << int(bit)
+    return fingerprint
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def merge_into(kept, duplicate):
+    """Record a duplicate's provenance on the chunk that replaces it"""
+    sources = kept.metadata.get("sources", kept.metadata.get("source", "")).split(",")
+    for source in duplicate.metadata.get("sources", duplicate.metadata.get("source", "")).split(","):
+        if source and source not in sources:
+            sources.append(source)
+    kept.metadata["sources"] = ",".join(source for source in sources if source)
+    kept.metadata["duplicates"] = kept.metadata.get("duplicates", 0) + 1 + duplicate.metadata.get("duplicates", 0)
+
+
+def dedupe_documents(documents):
+    """Collapse near-duplicate documents by SimHash candidates and shingle Jaccard.
+
+    Returns the kept documents, in their original order, and a stats dict.
+    """
+    band_bits = 64 // SIMHASH_BANDS
+    band_mask = (1 << band_bits) - 1
+    buckets = {}
+    kept = []
+    kept_features = []
+    kept_hashes = []
+
+    for doc in documents:
+        features = shingles(doc.page_content)
+        fingerprint = simhash(features)
+        bands = [(band, (fingerprint >> (band * band_bits)) & band_mask) for band in range(SIMHASH_BANDS)]
+
+        duplicate_of = None
+        candidates = set()
+        for band in bands:
+            candidates.update(buckets.get(band, ()))
+        for candidate in sorted(candidates):
+            if bin(fingerprint ^ kept_hashes[candidate]).count("1") > SIMHASH_MAX_DISTANCE:
+                continue
+            if jaccard(features, kept_features[candidate]) >= DEDUP_JACCARD:
+                duplicate_of = candidate
+                break
+
+        if duplicate_of is not None:
+            merge_into(kept[duplicate_of], doc)
+            continue
+
+        index = len(kept)
+        kept.append(doc)
+        kept_features.append(features)
+        kept_hashes.append(fingerprint)
+        for band in bands:
+            buckets.setdefault(band, []).append(index)
+
+    return kept, dedup_stats(documents, kept)
+
+
+def dedupe_embeddings(documents, vectors, threshold=DEDUP_COSINE, block_size=512):
+    """Collapse documents whose embeddings are nearly identical.
+
+    Returns the kept documents, their vectors and a stats dict.
+    """
+    if not documents:
+        return documents, vectors, dedup_stats(documents, documents)
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1e-12
+    unit = matrix / norms
+
+    kept_rows = []
+    for row in range(len(documents)):
+        duplicate_of = None
+        # Compare against kept chunks block by block to bound memory
+        for start in range(0, len(kept_rows), block_size):
+            block = kept_rows[start:start + block_size]
+            similarities = unit[block] @ unit[row]
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                duplicate_of = block[best]
+                break
+        if duplicate_of is None:
+            kept_rows.append(row)
+        else:
+            merge_into(documents[duplicate_of], documents[row])
+
+    kept = [documents[row] for row in kept_rows]
+    stats = dedup_stats(documents, kept)
+    stats["vector_bytes_saved"] = (len(documents) - len(kept)) * matrix.shape[1] * 4
+    return kept, [vectors[row] for row in kept_rows], stats
+
+
+def dedup_stats(before, after):
+    chars_before = sum(len(doc.page_content) for doc in before)
+    chars_after = sum(len(doc.page_content) for doc in after)
+    return {
+        "chunks_before": len(before),
+        "chunks_after": len(after),
+        "chunks_removed": len(before) - len(after),
+        "chars_saved": chars_before - chars_after,
+        "reduction_pct": round(100 * (1 - len(after) / len(before)), 2) if before else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from app import load_documents
+
+    chunks = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100).split_documents(load_documents())
+    kept, stats = dedupe_documents(chunks)
+    print(f"Text dedup: {stats['chunks_before']} -> {stats['chunks_after']} chunks "
+          f"({stats['reduction_pct']}% fewer, {stats['chars_saved']} characters saved)")
+    merged = [doc for doc in kept if doc.metadata.get("duplicates")]
+    for doc in merged[:10]:
+        print(f"  kept 1 of {doc.metadata['duplicates'] + 1} from {doc.metadata['sources']}: {doc.page_content[:70]!r}")
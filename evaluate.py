@@ -0,0 +1,369 @@
+"""Offline retrieval evaluation: answer quality versus cost.
+
+Builds a golden query set from the shipped corpus (a "by name" and a "by
+description" question for every scheme, job, event and mentorship program,
+plus hand-written questions about the business and career guides), then
+sweeps the index parameters and reports, for every combination:
+
+- recall@k: share of questions with at least one relevant chunk in the top k
+- MRR@k: mean reciprocal rank of the first relevant chunk
+- chunks and index size on disk (or in memory for the exact index)
+- build time (embedding the chunks plus writing the index)
+- query latency (embedding the question plus the search), p50 and p95
+
+A chunk is relevant when it contains one of the question's answer strings, so
+the labels stay valid whatever the chunking. Every chunking is embedded once
+per backend and reused for all index types and values of k.
+
+    python evaluate.py
+    python evaluate.py --chunking 500:50,1000:100,2000:200 --k 1,2,4,8 \\
+        --embeddings hub,hashing --indexes exact,hnsw,hnsw-fast --output eval.json
+    python evaluate.py --write-golden golden_queries.json   # export for hand curation
+    python evaluate.py --golden golden_queries.json         # evaluate a curated set
+
+Embedding backends: "hub" is the service's own (the Hugging Face endpoint, or
+EMBEDDINGS_URL), "local:<model>" runs a sentence-transformers model on the
+CPU, and "hashing" is a free hashed bag-of-words baseline. Index types:
+"exact" is brute-force search over the vectors, "hnsw" is Chroma with its
+default graph settings (what the service uses) and "hnsw-fast" a smaller,
+faster graph.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app import CHUNK_OVERLAP, CHUNK_SIZE, RECORD_FILES, corpus_files, get_embeddings, load_documents, load_records, split_into_chunks
+from dedup import DEDUP_ENABLED, dedupe_documents, dedupe_embeddings
+from schemes import extract_scheme_fields
+
+DEFAULT_CHUNKING = f"500:50,{CHUNK_SIZE}:{CHUNK_OVERLAP},2000:200"
+DEFAULT_K = "1,2,4,8"
+DEFAULT_EMBEDDINGS = "hub,hashing"
+DEFAULT_INDEXES = "exact,hnsw,hnsw-fast"
+RECALL_TOLERANCE = 0.02
+
+# Chroma collection settings per index type
+HNSW_SETTINGS = {
+    "hnsw": {},
+    "hnsw-fast": {"hnsw:M": 8, "hnsw:construction_ef": 32, "hnsw:search_ef": 16},
+}
+
+# Questions about the text guides, with phrases that only the relevant passages contain
+GUIDE_QUERIES = [
+    ("Which buffalo breeds are good for a dairy farm in India?", ["murrah", "mehsana"], "dairybusiness.txt"),
+    ("Is there a NABARD subsidy for dairy farming loans?", ["dairy entrepreneurship development scheme"], "dairybusiness.txt"),
+    ("Do I need an FSSAI licence to sell milk products?", ["fssai"], "dairybusiness.txt"),
+    ("What should I feed dairy cows?", ["fodder", "silage"], "dairybusiness.txt"),
+    ("What registration does a dairy farm need?", ["veterinary and dairy development department"], "dairybusiness.txt"),
+    ("Which machines do I need to start a tailoring business?", ["interlock machine", "overlock machine"], "tailoringbusiness.txt"),
+    ("How much can I earn from a sewing machine at home?", ["per month from a sewing machine", "3 to 6 thousand rupees"], "tailoringbusiness.txt"),
+    ("Do I need a licence to run a tailoring shop?", ["shop act license"], "tailoringbusiness.txt"),
+    ("Can I get a PMEGP loan for a tailoring business?", ["prime ministers employment generation program"], "tailoringbusiness.txt"),
+    ("How do I open a boutique?", ["boutique"], "tailoringbusiness.txt"),
+    ("What remote and flexible careers are there for women?", ["remote and flexible work"], "careers_for_women.txt"),
+    ("Which healthcare careers can women pursue?", ["healthcare careers"], "careers_for_women.txt"),
+    ("What is Beti Bachao Beti Padhao?", ["beti bachao"], "women_empowerment.txt"),
+    ("Which government initiatives empower women in India?", ["women empowerment initiatives"], "women_empowerment.txt"),
+]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def answer_key(value):
+    """A record field as it appears in an indexed chunk (JSON records are stored as json.dumps)"""
+    return json.dumps(value)[1:-1].lower()
+
+
+def leading_words(text, count=14):
+    words = re.sub(r"\([^)]*\)", "", text).split()
+    return " ".join(words[:count]).rstrip(".,;:")
+
+
+def build_golden_set():
+    """Golden questions from the corpus records and GUIDE_QUERIES.
+
+    Each entry is {"query", "answers", "source", "kind"}; a chunk answers the
+    question when it contains any of the (lowercase) answers.
+    """
+    golden = []
+
+    def add(query, answers, source, kind):
+        golden.append({"query": query, "answers": [a for a in answers if a], "source": source, "kind": kind})
+
+    for scheme in load_records("schemes"):
+        fields = extract_scheme_fields(scheme)
+        title = answer_key(fields["title"])
+        add(f"What is the {fields['title']}?", [title], RECORD_FILES["schemes"], "scheme-name")
+        summary = fields["summary"]
+        if fields["ministry"] and summary.startswith(fields["ministry"]):
+            summary = summary[len(fields["ministry"]):]
+        about = leading_words(summary)
+        if len(about.split()) >= 6:
+            add(f"Which scheme is this: {about}?", [title, answer_key(about[:40])], RECORD_FILES["schemes"], "scheme-description")
+
+    for job in load_records("jobs"):
+        add(f"Are there {job['title']} jobs at {job['company']}?", [answer_key(job["title"])], RECORD_FILES["jobs"], "job-name")
+        add(f"I am looking for a job: {leading_words(job['description'])}", [answer_key(job["title"])], RECORD_FILES["jobs"], "job-description")
+
+    for event in load_records("events"):
+        add(f"When is the {event['title']}?", [answer_key(event["title"])], RECORD_FILES["events"], "event-name")
+        add(f"Is there an event about {leading_words(event['description'])}?", [answer_key(event["title"])], RECORD_FILES["events"], "event-description")
+
+    for program in load_records("mentorship"):
+        add(f"How do I apply to the {program['title']} program?", [answer_key(program["title"])], RECORD_FILES["mentorship"], "mentorship-name")
+        add(f"Is there mentorship offering {leading_words(program['description'])}?", [answer_key(program["title"])], RECORD_FILES["mentorship"], "mentorship-description")
+
+    available = set(corpus_files())
+    for query, answers, source in GUIDE_QUERIES:
+        if source in available:
+            add(query, answers, source, "guide")
+    return golden
+
+
+def relevance_labels(golden, texts):
+    """For each question, the set of chunk positions that contain one of its answers"""
+    lowered = [text.lower() for text in texts]
+    return [{i for i, text in enumerate(lowered) if any(answer in text for answer in item["answers"])} for item in golden]
+
+
+class HashingEmbeddings:
+    """Hashed bag-of-words vectors: no model and no network, a lexical floor for the sweep"""
+
+    def embed_documents(self, texts):
+        from stub_llm import hashed_embedding
+        return [hashed_embedding(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def embedding_backend(name):
+    """Embedding object for a backend name, or None when it is not available here"""
+    if name == "hub":
+        return get_embeddings()
+    if name == "hashing":
+        return HashingEmbeddings()
+    if name.startswith("local:"):
+        try:
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+            return HuggingFaceEmbeddings(model_name=name.split(":", 1)[1], model_kwargs={"device": "cpu"})
+        except Exception as e:
+            print(f"Skipping embeddings {name}: {e}", file=sys.stderr)
+            return None
+    raise ValueError(f"Unknown embedding backend: {name}")
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+class ExactIndex:
+    """Brute-force L2 search over all vectors (the same ranking as Chroma's default space)"""
+
+    def __init__(self, vectors, texts):
+        self.matrix = np.asarray(vectors, dtype=np.float32)
+        self.squared_norms = (self.matrix ** 2).sum(axis=1)
+        self.size_bytes = self.matrix.nbytes + sum(len(text.encode("utf-8")) for text in texts)
+
+    def search(self, vector, k):
+        distances = self.squared_norms - 2 * self.matrix @ np.asarray(vector, dtype=np.float32)
+        k = min(k, len(distances))
+        top = np.argpartition(distances, k - 1)[:k]
+        return top[np.argsort(distances[top])].tolist()
+
+    def close(self):
+        pass
+
+
+class ChromaIndex:
+    """A throwaway on-disk Chroma collection with the given HNSW settings"""
+
+    def __init__(self, vectors, texts, settings, batch_size=1024):
+        import chromadb
+        self.path = tempfile.mkdtemp(prefix="asha-eval-")
+        self.client = chromadb.PersistentClient(path=self.path)
+        self.collection = self.client.create_collection("evaluation", metadata=settings or None)
+        ids = [str(position) for position in range(len(texts))]
+        for start in range(0, len(texts), batch_size):
+            self.collection.add(
+                ids=ids[start:start + batch_size],
+                embeddings=[[float(x) for x in vector] for vector in vectors[start:start + batch_size]],
+                documents=texts[start:start + batch_size],
+            )
+        self.size_bytes = directory_size(self.path)
+
+    def search(self, vector, k):
+        result = self.collection.query(query_embeddings=[[float(x) for x in vector]], n_results=k, include=[])
+        return [int(i) for i in result["ids"][0]]
+
+    def close(self):
+        self.client.clear_system_cache()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def build_search_index(kind, vectors, texts):
+    if kind == "exact":
+        return ExactIndex(vectors, texts)
+    if kind in HNSW_SETTINGS:
+        return ChromaIndex(vectors, texts, HNSW_SETTINGS[kind])
+    raise ValueError(f"Unknown index type: {kind}")
+
+
+def prepare(documents, chunk_size, chunk_overlap, embeddings):
+    """Split, deduplicate and embed like prepare_chunks(); returns (texts, vectors, embed_seconds)"""
+    chunks = split_into_chunks(documents, chunk_size, chunk_overlap)
+    if DEDUP_ENABLED:
+        chunks, _ = dedupe_documents(chunks)
+    started = time.perf_counter()
+    vectors = embeddings.embed_documents([chunk.page_content for chunk in chunks])
+    embed_seconds = time.perf_counter() - started
+    if DEDUP_ENABLED:
+        chunks, vectors, _ = dedupe_embeddings(chunks, vectors)
+    return [chunk.page_content for chunk in chunks], vectors, embed_seconds
+
+
+def score(rankings, labels, k):
+    """recall@k and MRR@k over the questions that have at least one relevant chunk"""
+    answerable = [(ranking, relevant) for ranking, relevant in zip(rankings, labels) if relevant]
+    if not answerable:
+        return 0.0, 0.0
+    hits, reciprocal = 0, 0.0
+    for ranking, relevant in answerable:
+        for rank, position in enumerate(ranking[:k], start=1):
+            if position in relevant:
+                hits += 1
+                reciprocal += 1 / rank
+                break
+    return hits / len(answerable), reciprocal / len(answerable)
+
+
+def evaluate(golden, chunkings, ks, backends, index_types):
+    documents = load_documents(corpus_files())
+    queries = [item["query"] for item in golden]
+    max_k = max(ks)
+    results = []
+
+    for backend in backends:
+        embeddings = embedding_backend(backend)
+        if embeddings is None:
+            continue
+        query_vectors, query_embed_ms = [], []
+        for query in queries:
+            started = time.perf_counter()
+            query_vectors.append(embeddings.embed_query(query))
+            query_embed_ms.append((time.perf_counter() - started) * 1000)
+
+        for chunk_size, chunk_overlap in chunkings:
+            print(f"Embedding {chunk_size}/{chunk_overlap} chunks with {backend}...", file=sys.stderr)
+            texts, vectors, embed_seconds = prepare(documents, chunk_size, chunk_overlap, embeddings)
+            labels = relevance_labels(golden, texts)
+            unanswerable = sum(1 for relevant in labels if not relevant)
+
+            for index_type in index_types:
+                started = time.perf_counter()
+                index = build_search_index(index_type, vectors, texts)
+                index_seconds = time.perf_counter() - started
+                rankings, latencies = [], []
+                for vector, embed_ms in zip(query_vectors, query_embed_ms):
+                    started = time.perf_counter()
+                    rankings.append(index.search(vector, max_k))
+                    latencies.append(embed_ms + (time.perf_counter() - started) * 1000)
+                index.close()
+
+                for k in ks:
+                    recall, mrr = score(rankings, labels, k)
+                    results.append({
+                        "chunk_size": chunk_size,
+                        "chunk_overlap": chunk_overlap,
+                        "embeddings": backend,
+                        "index": index_type,
+                        "k": k,
+                        "recall": round(recall, 4),
+                        "mrr": round(mrr, 4),
+                        "chunks": len(texts),
+                        "unanswerable": unanswerable,
+                        "index_bytes": index.size_bytes,
+                        "build_s": round(embed_seconds + index_seconds, 3),
+                        "query_p50_ms": round(percentile(latencies, 0.5), 2),
+                        "query_p95_ms": round(percentile(latencies, 0.95), 2),
+                        "context_chars": k * sum(len(text) for text in texts) // max(1, len(texts)),
+                    })
+    return results
+
+
+def most_efficient(results, tolerance=RECALL_TOLERANCE):
+    """The cheapest configuration whose recall is within tolerance of the best"""
+    if not results:
+        return None
+    best = max(result["recall"] for result in results)
+    good = [result for result in results if result["recall"] >= best - tolerance]
+    return min(good, key=lambda r: (r["context_chars"], r["query_p50_ms"], r["index_bytes"], r["build_s"]))
+
+
+def print_report(golden, results):
+    print(f"{len(golden)} golden questions\n")
+    header = (f"{'chunk':>10} {'embeddings':>12} {'index':>10} {'k':>3} {'recall':>7} {'mrr':>6} {'chunks':>6} "
+              f"{'size_kb':>8} {'build_s':>8} {'p50_ms':>7} {'p95_ms':>7} {'ctx_chr':>7}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['chunk_size']:>5}/{r['chunk_overlap']:<4} {r['embeddings'][:12]:>12} {r['index']:>10} {r['k']:>3} "
+              f"{r['recall']:>7.3f} {r['mrr']:>6.3f} {r['chunks']:>6} {r['index_bytes'] / 1024:>8.0f} "
+              f"{r['build_s']:>8.2f} {r['query_p50_ms']:>7.2f} {r['query_p95_ms']:>7.2f} {r['context_chars']:>7}")
+    unanswerable = max((r["unanswerable"] for r in results), default=0)
+    if unanswerable:
+        print(f"\n{unanswerable} questions have no relevant chunk in some chunkings and are left out of their scores")
+    choice = most_efficient(results)
+    if choice:
+        print(f"\nMost efficient within {RECALL_TOLERANCE} recall of the best: chunk {choice['chunk_size']}/"
+              f"{choice['chunk_overlap']}, {choice['embeddings']} embeddings, {choice['index']} index, k={choice['k']} "
+              f"(recall {choice['recall']:.3f}, MRR {choice['mrr']:.3f})")
+
+
+def parse_chunking(value):
+    return [tuple(int(part) for part in item.split(":")) for item in value.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep retrieval settings against a golden query set")
+    parser.add_argument("--chunking", default=DEFAULT_CHUNKING, help="Comma-separated size:overlap pairs")
+    parser.add_argument("--k", default=DEFAULT_K, help="Comma-separated values of k")
+    parser.add_argument("--embeddings", default=DEFAULT_EMBEDDINGS, help="hub, hashing and/or local:<model>")
+    parser.add_argument("--indexes", default=DEFAULT_INDEXES, help="exact, hnsw and/or hnsw-fast")
+    parser.add_argument("--golden", help="Load the golden set from a JSON file instead of building it")
+    parser.add_argument("--write-golden", help="Write the generated golden set to a JSON file and exit")
+    parser.add_argument("--output", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    if args.golden:
+        with open(args.golden, "r", encoding="utf-8") as f:
+            golden = json.load(f)
+    else:
+        golden = build_golden_set()
+    if args.write_golden:
+        with open(args.write_golden, "w", encoding="utf-8") as f:
+            json.dump(golden, f, indent=2, ensure_ascii=False)
+        print(f"Wrote {len(golden)} questions to {args.write_golden}")
+        sys.exit(0)
+
+    results = evaluate(
+        golden,
+        parse_chunking(args.chunking),
+        [int(k) for k in args.k.split(",")],
+        args.embeddings.split(","),
+        args.indexes.split(","),
+    )
+    print_report(golden, results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,125 @@
+"""Extractive answers for when the LLM misses its deadline or fails.
+
+Instead of waiting on a slow provider or showing an error, the chat endpoint
+answers from what it has already looked up for the question: the matching
+job, event, mentorship or scheme records are listed with their key details
+and links, and retrieved text chunks are cut down to the sentences that
+share the most terms with the question. No model is involved, so building
+the answer takes about a millisecond.
+
+    python fallback.py "Are there remote software jobs?"
+"""
+import json
+import os
+import sys
+
+from compress import lexical_scores, split_sentences
+from rerank import tokenize
+
+FALLBACK_MAX_RECORDS = int(os.getenv("FALLBACK_MAX_RECORDS", "3"))
+FALLBACK_MAX_SENTENCES = int(os.getenv("FALLBACK_MAX_SENTENCES", "4"))
+
+NAME_FIELDS = ("title", "name")
+DETAIL_FIELDS = ("company", "organizer", "organization", "ministry", "location", "date", "time",
+                 "duration", "format", "application_deadline")
+TEXT_FIELDS = ("summary", "description")
+LINK_FIELDS = ("apply_link", "registration_link", "application_link", "link", "links")
+
+DEGRADED_INTRO = "I can't put together a full answer right now, so here is what I found for your question:"
+DEGRADED_OUTRO = "Please ask again in a little while for a more detailed answer."
+NO_MATCH_ANSWER = (
+    "I can't answer that right now. Please try again in a little while. Meanwhile, you can browse "
+    "the Jobs, Events and Mentorship tabs for current opportunities."
+)
+SMALLTALK_ANSWER = (
+    "Hi, I'm Asha! I'm here to help with jobs, events, mentorship programs and government schemes. "
+    "What would you like to explore?"
+)
+
+
+def as_record(source):
+    """A source as a record dict, or None if it is plain text (retrieved JSON chunks are records too)"""
+    if isinstance(source, dict):
+        return source
+    try:
+        value = json.loads(source)
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def format_record(record):
+    """One bullet with a record's name, key details, a short description and its link"""
+    name = next((record[field] for field in NAME_FIELDS if record.get(field)), "Untitled")
+    details = [str(record[field]) for field in DETAIL_FIELDS if record.get(field)]
+    line = f"- **{name}**"
+    if details:
+        line += f" ({', '.join(details)})"
+    text = next((record[field] for field in TEXT_FIELDS if record.get(field)), "")
+    sentences = split_sentences(text)
+    if sentences:
+        line += f": {sentences[0][:200]}"
+    for field in LINK_FIELDS:
+        link = record.get(field)
+        if isinstance(link, list):
+            link = link[0] if link else None
+        if link:
+            line += f" {link}"
+            break
+    return line
+
+
+def best_records(query, records, limit=FALLBACK_MAX_RECORDS):
+    """The records most relevant to the query, keeping the given order when there are few enough.
+
+    The records were already matched to the query, so none is dropped for sharing no terms with it.
+    """
+    if len(records) <= limit:
+        return records
+    scores = lexical_scores(query, [json.dumps(record, ensure_ascii=False) for record in records])
+    ranked = sorted(range(len(records)), key=lambda i: -scores[i])
+    return [records[i] for i in ranked[:limit]]
+
+
+def best_sentences(query, texts, limit=FALLBACK_MAX_SENTENCES):
+    """The sentences of texts that share the most terms with the query, in their original order"""
+    sentences = []
+    for text in texts:
+        for sentence in split_sentences(text):
+            sentence = sentence.lstrip("#-* ").strip()
+            if len(tokenize(sentence)) >= 4 and sentence not in sentences:
+                sentences.append(sentence)
+    scores = lexical_scores(query, sentences)
+    ranked = sorted(range(len(sentences)), key=lambda i: -scores[i])
+    chosen = sorted(i for i in ranked[:limit] if scores[i] > 0)
+    return [sentences[i] for i in chosen]
+
+
+def extractive_answer(query, sources, intent="question"):
+    """Answer built only from the records and text chunks the context was made of"""
+    if intent == "smalltalk":
+        return SMALLTALK_ANSWER
+    records, texts = [], []
+    for source in sources or []:
+        record = as_record(source)
+        if record is not None:
+            records.append(record)
+        else:
+            texts.append(source)
+
+    lines = [format_record(record) for record in best_records(query, records)]
+    lines.extend(f"- {sentence}" for sentence in best_sentences(query, texts))
+    if not lines:
+        return NO_MATCH_ANSWER
+    return "\n\n".join([DEGRADED_INTRO, "\n".join(lines), DEGRADED_OUTRO])
+
+
+if __name__ == "__main__":
+    from app import degraded_answer, get_context
+    from router import route_query
+
+    question = " ".join(sys.argv[1:]) or "Are there remote software jobs?"
+    route = route_query(question, "auto")
+    sources = []
+    get_context(question, route["context_type"], route["intent"], sources=sources)
+    print(degraded_answer(question, sources, route["context_type"], route["intent"]))
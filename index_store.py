@@ -0,0 +1,244 @@
+"""Versioned vector index snapshots.
+
+Every index build is written to its own directory under chroma_db/versions/.
+A build counts as complete only once its manifest.json exists; the manifest
+is written last and records the chunk count and a checksum over the stored
+chunks. chroma_db/CURRENT names the live version and is replaced atomically
+on promotion. Older versions are kept for rollback; a rolled-back version is
+pinned (a second line in CURRENT) so that startup does not re-index the
+files that changed since it was built. The next build clears the pin.
+
+On startup the live version is validated against its manifest; if it is
+missing, incomplete or corrupt the newest valid older version is promoted
+instead, and only if none is valid is the index rebuilt.
+
+    python index_store.py                # list versions
+    python index_store.py rollback [v]   # promote the previous (or given) version
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+
+logger = logging.getLogger("asha_chatbot")
+
+INDEX_ROOT = os.getenv("INDEX_ROOT", "chroma_db")
+INDEX_KEEP_VERSIONS = int(os.getenv("INDEX_KEEP_VERSIONS", "3"))
+INDEX_COLLECTION = "asha_chunks"
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+PINNED = "pinned"
+VERSIONS_DIR = "versions"
+
+
+class InvalidIndex(ValueError):
+    pass
+
+
+def version_path(version, root=INDEX_ROOT):
+    return os.path.join(root, VERSIONS_DIR, version)
+
+
+def new_version(root=INDEX_ROOT):
+    """Create the directory for a new build and return its version id (sortable by time)"""
+    os.makedirs(os.path.join(root, VERSIONS_DIR), exist_ok=True)
+    while True:
+        now = time.time()
+        version = time.strftime("%Y%m%d-%H%M%S", time.gmtime(now)) + f"-{int(now * 1000) % 1000:03d}"
+        try:
+            os.makedirs(version_path(version, root))
+            return version
+        except FileExistsError:
+            time.sleep(0.001)
+
+
+def open_client(version, root=INDEX_ROOT):
+    """Chroma client for one version directory"""
+    import chromadb
+    return chromadb.PersistentClient(path=version_path(version, root))
+
+
+def close_client(client):
+    """Release a client; Chroma frees the index's memory once its last client is closed"""
+    close = getattr(client, "close", None)
+    if close is not None:
+        close()
+
+
+def content_checksum(ids, documents):
+    """Checksum over the stored chunks, independent of their storage order"""
+    digest = hashlib.sha256()
+    for chunk_id, document in sorted(zip(ids, documents)):
+        digest.update(chunk_id.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update((document or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def write_manifest(version, ids, documents, root=INDEX_ROOT, **details):
+    """Mark a build complete; written last and atomically so a crash never leaves a half manifest"""
+    manifest = {
+        "version": version,
+        "collection": INDEX_COLLECTION,
+        "created_at": time.time(),
+        "chunk_count": len(ids),
+        "checksum": content_checksum(ids, documents),
+        **details,
+    }
+    path = os.path.join(version_path(version, root), MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+    return manifest
+
+
+def read_manifest(version, root=INDEX_ROOT):
+    try:
+        with open(os.path.join(version_path(version, root), MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def list_versions(root=INDEX_ROOT):
+    """Version ids with a directory, newest first"""
+    versions_dir = os.path.join(root, VERSIONS_DIR)
+    if not os.path.isdir(versions_dir):
+        return []
+    return sorted((name for name in os.listdir(versions_dir) if os.path.isdir(version_path(name, root))), reverse=True)
+
+
+def read_current(root=INDEX_ROOT):
+    """The lines of CURRENT: the live version, then "pinned" if it was rolled back to"""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), "r", encoding="utf-8") as f:
+            return f.read().split()
+    except OSError:
+        return []
+
+
+def current_version(root=INDEX_ROOT):
+    lines = read_current(root)
+    return lines[0] if lines else None
+
+
+def is_pinned(root=INDEX_ROOT):
+    """Whether the live version was rolled back to and must not be replaced by an automatic re-index"""
+    return read_current(root)[1:2] == [PINNED]
+
+
+def validate(version, root=INDEX_ROOT):
+    """Check a version against its manifest; raises InvalidIndex with the reason"""
+    manifest = read_manifest(version, root)
+    if manifest is None:
+        raise InvalidIndex(f"index {version} has no manifest (incomplete build)")
+    client = None
+    try:
+        client = open_client(version, root)
+        stored = client.get_collection(manifest["collection"]).get(include=["documents"])
+    except Exception as e:
+        raise InvalidIndex(f"index {version} cannot be read: {e}")
+    finally:
+        if client is not None:
+            close_client(client)
+    if len(stored["ids"]) != manifest["chunk_count"]:
+        raise InvalidIndex(f"index {version} has {len(stored['ids'])} chunks, manifest says {manifest['chunk_count']}")
+    if content_checksum(stored["ids"], stored["documents"]) != manifest["checksum"]:
+        raise InvalidIndex(f"index {version} does not match its manifest checksum")
+    return manifest
+
+
+def promote(version, root=INDEX_ROOT, pinned=False):
+    """Atomically make a version the live one, pinned if it is a rollback"""
+    if read_manifest(version, root) is None:
+        raise InvalidIndex(f"index {version} has no manifest (incomplete build)")
+    current_file = os.path.join(root, CURRENT_FILE)
+    with open(current_file + ".tmp", "w", encoding="utf-8") as f:
+        f.write(f"{version}\n{PINNED}\n" if pinned else version)
+    os.replace(current_file + ".tmp", current_file)
+    logger.info(f"Promoted index {version}{' (pinned)' if pinned else ''}")
+
+
+def select_live_version(root=INDEX_ROOT):
+    """Return the validated live version, falling back to the newest valid older one.
+
+    Returns None when there is no valid version at all.
+    """
+    current = current_version(root)
+    candidates = ([current] if current else []) + [v for v in list_versions(root) if v != current]
+    for version in candidates:
+        try:
+            started = time.time()
+            validate(version, root)
+        except InvalidIndex as e:
+            logger.error(f"Skipping index: {e}")
+            continue
+        logger.info(f"Validated index {version} in {time.time() - started:.2f}s")
+        if version != current:
+            promote(version, root)
+        return version
+
+    if os.path.isdir(root) and set(os.listdir(root)) - {VERSIONS_DIR, CURRENT_FILE, "tenants"}:
+        logger.warning(f"Ignoring unversioned files in {root}/ (no manifest); a new index will be built")
+    return None
+
+
+def rollback(version=None, root=INDEX_ROOT):
+    """Promote the given version, or the newest valid one older than the live version"""
+    current = current_version(root)
+    if version is not None:
+        if version not in list_versions(root):
+            raise InvalidIndex(f"Unknown index version: {version}")
+        candidates = [version]
+    else:
+        candidates = [v for v in list_versions(root) if current is None or v < current]
+    for candidate in candidates:
+        try:
+            validate(candidate, root)
+        except InvalidIndex as e:
+            logger.error(f"Cannot roll back: {e}")
+            continue
+        promote(candidate, root, pinned=True)
+        return candidate
+    raise InvalidIndex("No valid index version to roll back to")
+
+
+def prune(keep=INDEX_KEEP_VERSIONS, protect=(), root=INDEX_ROOT):
+    """Delete incomplete builds and all but the newest `keep` complete versions.
+
+    A version without a manifest that is newer than the live one may be a
+    build still being written, so it is left alone.
+    """
+    current = current_version(root)
+    protect = set(protect) | {current}
+    complete = 0
+    for version in list_versions(root):
+        if version in protect:
+            complete += 1
+            continue
+        if read_manifest(version, root) is None:
+            if current is None or version > current:
+                continue
+        elif complete < keep:
+            complete += 1
+            continue
+        shutil.rmtree(version_path(version, root), ignore_errors=True)
+        logger.info(f"Removed index {version}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if sys.argv[1:2] == ["rollback"]:
+        print(f"Live index is now {rollback(sys.argv[2] if len(sys.argv) > 2 else None)}")
+    else:
+        live = current_version()
+        if is_pinned():
+            print(f"Live index {live} is pinned by a rollback")
+        for version in list_versions():
+            manifest = read_manifest(version)
+            status = f"{manifest['chunk_count']} chunks" if manifest else "incomplete"
+            print(f"{'*' if version == live else ' '} {version}  {status}")
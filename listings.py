@@ -0,0 +1,188 @@
+"""Indexed, paginated access to the job, event and mentorship listings.
+
+Each listing file is indexed once per file version: facet postings for the
+exact-match filters, lowercase text for free-text search and a sort order
+for date range filters and keyset (cursor) pagination.
+"""
+import base64
+import bisect
+import hashlib
+import json
+
+JOB_TYPE_KEYWORDS = {
+    "full-time": ["full-time", "full time"],
+    "part-time": ["part-time", "part time"],
+    "remote": ["remote", "work from home"],
+    "flexible": ["flexible", "hybrid"],
+    "internship": ["intern"],
+}
+
+EVENT_TYPE_KEYWORDS = {
+    "workshops": ["workshop"],
+    "conferences": ["conference", "summit"],
+    "networking": ["networking", "meetup"],
+    "career development": ["career", "resume", "interview"],
+    "skill building": ["skill", "training", "course", "bootcamp", "learn"],
+}
+
+# Date field used for range filters and ordering, and whether newest comes first
+LISTING_DATE_FIELDS = {
+    "jobs": ("posted_date", True),
+    "events": ("date", False),
+    "mentorship": ("application_deadline", False),
+}
+
+FACET_FILTERS = ["location", "work_mode", "job_type", "event_type", "online", "is_free", "expertise", "duration"]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def record_text(record):
+    """Flatten a record's values into one lowercase search string"""
+    values = []
+    for value in record.values():
+        if isinstance(value, list):
+            values.extend(str(item) for item in value)
+        else:
+            values.append(str(value))
+    return " ".join(values).lower()
+
+
+def duration_months(duration):
+    """Parse a duration such as "3 months", "6 weeks" or "1 year" into months"""
+    parts = str(duration).lower().split()
+    try:
+        amount = float(parts[0])
+    except (IndexError, ValueError):
+        return None
+    unit = parts[1] if len(parts) > 1 else "months"
+    if unit.startswith("week"):
+        return amount / 4
+    if unit.startswith("year"):
+        return amount * 12
+    return amount
+
+
+def record_facets(kind, record, text):
+    """(filter, value) pairs a record matches, with lowercase values"""
+    facets = set()
+    location = str(record.get("location", "")).lower()
+    facets.update(("location", part.strip()) for part in location.split(",") if part.strip())
+
+    if kind == "jobs":
+        if "remote" in location:
+            facets.add(("work_mode", "remote"))
+        if "hybrid" in location:
+            facets.add(("work_mode", "hybrid"))
+        if not {"remote", "hybrid"} & set(part.strip() for part in location.split(",")):
+            facets.add(("work_mode", "onsite"))
+        facets.update(("job_type", job_type) for job_type, words in JOB_TYPE_KEYWORDS.items() if any(w in text for w in words))
+    elif kind == "events":
+        facets.add(("online", str(bool(record.get("online", False))).lower()))
+        facets.add(("is_free", str(bool(record.get("is_free", False))).lower()))
+        facets.update(("event_type", event_type) for event_type, words in EVENT_TYPE_KEYWORDS.items() if any(w in text for w in words))
+    elif kind == "mentorship":
+        facets.update(("expertise", str(area).lower()) for area in record.get("mentor_expertise", []))
+        months = duration_months(record.get("duration", ""))
+        if months is not None:
+            bucket = "1-3 months" if months <= 3 else "3-6 months" if months <= 6 else "6+ months"
+            facets.add(("duration", bucket))
+    return facets
+
+
+def encode_cursor(sort_key):
+    return base64.urlsafe_b64encode(json.dumps(sort_key).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """The (date, id) sort key a cursor encodes; raises InvalidCursor for anything else"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+    if not (isinstance(key, list) and len(key) == 2 and all(isinstance(part, str) for part in key)):
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+    return tuple(key)
+
+
+class ListingIndex:
+    """Search, filter and keyset-pagination index over one listing file"""
+
+    def __init__(self, kind, records, version):
+        self.kind = kind
+        self.records = records
+        self.version = version
+        self.texts = [record_text(record) for record in records]
+        self.by_id = {str(record["id"]): i for i, record in enumerate(records) if "id" in record}
+
+        self.postings = {}
+        for i, (record, text) in enumerate(zip(records, self.texts)):
+            for facet in record_facets(kind, record, text):
+                self.postings.setdefault(facet, set()).add(i)
+
+        date_field, newest_first = LISTING_DATE_FIELDS.get(kind, ("date", False))
+        self.date_field = date_field
+        self.newest_first = newest_first
+        self.dates = [str(record.get(date_field, "")) for record in records]
+        # Records sorted by (date, id); pages walk this order backwards when newest comes first
+        self.sort_keys = [(self.dates[i], str(record.get("id", i))) for i, record in enumerate(records)]
+        self.order = sorted(range(len(records)), key=lambda i: self.sort_keys[i])
+        self.ordered_keys = [self.sort_keys[i] for i in self.order]
+
+    def get(self, record_id):
+        """The record with this id, or None"""
+        i = self.by_id.get(str(record_id))
+        return self.records[i] if i is not None else None
+
+    def filter(self, q=None, date_from=None, date_to=None, **facets):
+        """Return the set of record positions matching all filters"""
+        matches = None
+        for name in FACET_FILTERS:
+            value = facets.get(name)
+            if value is None:
+                continue
+            ids = self.postings.get((name, str(value).lower()), set())
+            matches = set(ids) if matches is None else matches & ids
+        if matches is None:
+            matches = set(range(len(self.records)))
+
+        if date_from or date_to:
+            low = bisect.bisect_left(self.ordered_keys, (date_from, "")) if date_from else 0
+            high = bisect.bisect_right(self.ordered_keys, (date_to, "\uffff")) if date_to else len(self.order)
+            matches &= set(self.order[low:high])
+        if q:
+            terms = q.lower().split()
+            matches = {i for i in matches if all(term in self.texts[i] for term in terms)}
+        return matches
+
+    def page(self, matches, cursor=None, limit=20, fields=None):
+        """Return one page of matching records in date order, plus the next cursor"""
+        if self.newest_first:
+            start = bisect.bisect_left(self.ordered_keys, decode_cursor(cursor)) - 1 if cursor else len(self.order) - 1
+            positions = range(start, -1, -1)
+        else:
+            start = bisect.bisect_right(self.ordered_keys, decode_cursor(cursor)) if cursor else 0
+            positions = range(start, len(self.order))
+
+        items = []
+        last = None
+        next_cursor = None
+        for position in positions:
+            i = self.order[position]
+            if i not in matches:
+                continue
+            if len(items) == limit:
+                next_cursor = encode_cursor(list(self.sort_keys[last]))
+                break
+            record = self.records[i]
+            items.append({field: record[field] for field in fields if field in record} if fields else record)
+            last = i
+        return items, next_cursor
+
+    def etag(self, params):
+        """Weak ETag for a query: changes with the file version or any query parameter"""
+        digest = hashlib.sha1(f"{self.version}|{json.dumps(params, sort_keys=True)}".encode("utf-8")).hexdigest()
+        return f'W/"{digest[:20]}"'
@@ -0,0 +1,251 @@
+"""Open-loop load test for the chat and feedback endpoints.
+
+Starts the Gemini stand-in from stub_llm.py and the app pointed at it (with a
+scratch index directory), then offers requests to `/` and `/feedback` at
+increasing arrival rates. Arrivals are scheduled on the clock, not on
+completions, so a saturated server shows up as growing latency and errors
+instead of a politely slowed-down client. For each rate it reports achieved
+throughput, latency percentiles, error rates and event-loop lag: the app's
+(from a /health probe running alongside the load) and the generator's own.
+
+    python loadtest.py --rates 2,5,10,20 --duration 20
+    python loadtest.py --url http://localhost:8000 --rates 1,2   # an already running app
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from warm_answers import load_suggested_questions
+
+FALLBACK_QUERIES = [
+    "Which government schemes support women starting a dairy business?",
+    "Show me remote software jobs",
+    "What mentorship programs are open for data science?",
+    "How do I prepare for a job interview after a career break?",
+    "Are there any free networking events this month?",
+]
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def ms(value):
+    return "-" if value is None else f"{value * 1000:.0f}"
+
+
+def wait_until_healthy(url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not become healthy within {timeout}s")
+
+
+def start_servers(args, workdir):
+    """Start the stub LLM and the app; returns (app_url, processes)"""
+    stub = subprocess.Popen(
+        [sys.executable, "stub_llm.py", "--port", str(args.stub_port), "--latency", args.latency,
+         "--latency-ms", str(args.latency_ms), "--spread", str(args.spread),
+         "--error-rate", str(args.error_rate), "--stream-chunks", str(args.stream_chunks)],
+    )
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    env = dict(
+        os.environ,
+        GEMINI_API_ENDPOINT=stub_url,
+        EMBEDDINGS_URL=f"{stub_url}/embed",
+        INDEX_ROOT=os.path.join(workdir, "chroma_db"),
+        WARM_ANSWERS_ENABLED="0",
+        WATCH_ENABLED="0",
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(args.app_port), "--log-level", "warning"],
+        env=env,
+    )
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    wait_until_healthy(f"{stub_url}/stats", args.startup_timeout)
+    wait_until_healthy(f"{app_url}/ready", args.startup_timeout)
+    return app_url, [app, stub]
+
+
+async def warm_up(client, url):
+    """One chat request so the index is built before anything is measured"""
+    response = await client.post(f"{url}/", json={"query": "hello, what can you help me with?", "chat_history": []}, timeout=600)
+    response.raise_for_status()
+
+
+async def send(client, url, kind, queries, results, timeout):
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        if kind == "chat":
+            response = await client.post(
+                f"{url}/",
+                json={"query": random.choice(queries), "chat_history": [], "context_type": "auto"},
+                timeout=timeout,
+            )
+            if response.status_code != 200:
+                outcome = f"http_{response.status_code}"
+            elif response.json().get("degraded"):
+                # Answered from the retrieved context because the LLM missed its deadline or failed
+                outcome = "degraded"
+        else:
+            response = await client.post(
+                f"{url}/feedback",
+                json={"conversation_id": "loadtest", "message_id": f"m{random.randint(0, 10**6)}", "feedback_type": "helpful"},
+                timeout=timeout,
+            )
+            if response.status_code != 200:
+                outcome = f"http_{response.status_code}"
+    except httpx.TimeoutException:
+        outcome = "timeout"
+    except httpx.HTTPError as e:
+        outcome = type(e).__name__
+    results.append((kind, outcome, time.perf_counter() - started))
+
+
+async def probe_health(client, url, stop, samples, interval=0.25):
+    """/health does no work, so its latency is how long the app's event loop is blocked"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await client.get(f"{url}/health", timeout=30)
+            samples.append(time.perf_counter() - started)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+
+
+async def run_level(client, url, rate, duration, feedback_ratio, queries, timeout, poisson):
+    results, health = [], []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_health(client, url, stop, health))
+    tasks = []
+    lags = []
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    next_at = start
+    while next_at < start + duration:
+        delay = next_at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # How late the generator fires a scheduled arrival is its own event-loop lag
+        lags.append(max(0.0, loop.time() - next_at))
+        kind = "feedback" if random.random() < feedback_ratio else "chat"
+        tasks.append(asyncio.create_task(send(client, url, kind, queries, results, timeout)))
+        next_at += random.expovariate(rate) if poisson else 1 / rate
+    offered_for = loop.time() - start
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+    stop.set()
+    await probe
+
+    report = {"rate": rate, "offered": len(tasks), "elapsed_s": round(elapsed, 2), "endpoints": {}}
+    for kind in ("chat", "feedback"):
+        # Degraded answers are still answers; they count towards latency but are reported separately
+        latencies = [latency for k, outcome, latency in results if k == kind and outcome in ("ok", "degraded")]
+        outcomes = {}
+        for k, outcome, _ in results:
+            if k == kind and outcome != "ok":
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        total = sum(1 for k, _, _ in results if k == kind)
+        degraded = outcomes.pop("degraded", 0)
+        report["endpoints"][kind] = {
+            "requests": total,
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "p50": percentile(latencies, 0.5),
+            "p90": percentile(latencies, 0.9),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies) if latencies else None,
+            "error_rate": round(1 - len(latencies) / total, 4) if total else 0.0,
+            "degraded_rate": round(degraded / total, 4) if total else 0.0,
+            "errors": outcomes,
+        }
+    report["offered_rps"] = round(len(tasks) / offered_for, 2) if offered_for else 0.0
+    report["app_loop_lag_p50"] = percentile(health, 0.5)
+    report["app_loop_lag_p99"] = percentile(health, 0.99)
+    report["generator_lag_max"] = max(lags) if lags else 0.0
+    return report
+
+
+def print_report(reports):
+    header = (f"{'rate':>6} {'endpoint':>9} {'reqs':>5} {'tput/s':>7} {'p50ms':>7} {'p90ms':>7} {'p99ms':>7} "
+              f"{'maxms':>7} {'err%':>6} {'degr%':>6} {'loop50':>7} {'loop99':>7} {'genlag':>7}")
+    print(header)
+    print("-" * len(header))
+    for report in reports:
+        for kind, stats in report["endpoints"].items():
+            print(f"{report['rate']:>6g} {kind:>9} {stats['requests']:>5} {stats['throughput_rps']:>7.2f} "
+                  f"{ms(stats['p50']):>7} {ms(stats['p90']):>7} {ms(stats['p99']):>7} {ms(stats['max']):>7} "
+                  f"{stats['error_rate'] * 100:>6.1f} {stats['degraded_rate'] * 100:>6.1f} {ms(report['app_loop_lag_p50']):>7} "
+                  f"{ms(report['app_loop_lag_p99']):>7} {ms(report['generator_lag_max']):>7}")
+            if stats["errors"]:
+                print(f"{'':>16} errors: {stats['errors']}")
+
+
+async def main(args):
+    queries = [question for question, _ in load_suggested_questions()] or FALLBACK_QUERIES
+    rates = [float(rate) for rate in args.rates.split(",")]
+    processes = []
+    workdir = tempfile.mkdtemp(prefix="asha-loadtest-")
+    try:
+        if args.url:
+            url = args.url.rstrip("/")
+        else:
+            url, processes = start_servers(args, workdir)
+
+        limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+        async with httpx.AsyncClient(limits=limits) as client:
+            await warm_up(client, url)
+            reports = []
+            for rate in rates:
+                print(f"Offering {rate:g} req/s for {args.duration:g}s...", file=sys.stderr)
+                reports.append(await run_level(client, url, rate, args.duration, args.feedback_ratio, queries,
+                                               args.timeout, args.poisson))
+                await asyncio.sleep(args.pause)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    print_report(reports)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Open-loop load test against a stub LLM")
+    parser.add_argument("--url", help="Test an already running app instead of starting one")
+    parser.add_argument("--rates", default="1,2,5,10,20", help="Comma-separated arrival rates (req/s)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per rate")
+    parser.add_argument("--pause", type=float, default=2.0, help="Seconds between rates")
+    parser.add_argument("--feedback-ratio", type=float, default=0.2, help="Fraction of requests sent to /feedback")
+    parser.add_argument("--poisson", action="store_true", help="Exponential inter-arrival times instead of fixed")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--output", help="Also write the report as JSON")
+    parser.add_argument("--app-port", type=int, default=8001)
+    parser.add_argument("--stub-port", type=int, default=8765)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--latency", default="lognormal", help="Stub LLM latency distribution")
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stream-chunks", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
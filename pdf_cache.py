@@ -0,0 +1,170 @@
+"""Content-addressed cache of text extracted from PDFs.
+
+Text extraction is the most expensive CPU step of ingestion, so each page's
+extracted, normalized text is stored on disk under a hash of the page
+itself: its content stream and the fonts it uses to map glyphs to text.
+Reading those from a PDF is cheap compared with extracting the text.
+
+- An unchanged file (same SHA-256) is served entirely from its manifest
+  without being parsed at all.
+- A modified file is parsed, and only pages whose hash is not in the cache
+  are extracted again. Pages that moved or were untouched keep their text.
+
+    python pdf_cache.py              # extract every PDF in the corpus and report cache hits
+    python pdf_cache.py --clear
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import unicodedata
+
+logger = logging.getLogger("asha_chatbot")
+
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", ".extraction_cache")
+# Bump when extraction or normalization changes so stale text is not reused
+EXTRACTOR_VERSION = "1"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def normalize_text(text):
+    """Unicode-normalize extracted text, re-join hyphenated line breaks and collapse whitespace"""
+    text = unicodedata.normalize("NFKC", text or "").replace("\x00", "")
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    text = re.sub(r" ?\n ?", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def page_hash(page):
+    """Hash of what a page's text depends on: its content stream and its fonts' text mappings"""
+    digest = hashlib.sha256(EXTRACTOR_VERSION.encode("utf-8"))
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    resources = page.get("/Resources")
+    fonts = resources.get_object().get("/Font") if resources is not None else None
+    if fonts is not None:
+        for name, font in sorted(fonts.get_object().items()):
+            font = font.get_object()
+            digest.update(f"{name}:{font.get('/BaseFont')}:{font.get('/Encoding')}".encode("utf-8"))
+            to_unicode = font.get("/ToUnicode")
+            if to_unicode is not None:
+                digest.update(to_unicode.get_object().get_data())
+    return digest.hexdigest()
+
+
+def write_atomic(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
+
+
+class ExtractionCache:
+    """Page texts under pages/<page hash>, file manifests under files/<file hash>.json"""
+
+    def __init__(self, directory=EXTRACTION_CACHE_DIR):
+        self.directory = directory
+        self.stats = {"files": 0, "files_cached": 0, "pages": 0, "pages_cached": 0, "pages_extracted": 0, "extract_s": 0.0}
+
+    def _page_path(self, key):
+        return os.path.join(self.directory, "pages", key[:2], key + ".page")
+
+    def _manifest_path(self, file_hash):
+        return os.path.join(self.directory, "files", f"{file_hash}-{EXTRACTOR_VERSION}.json")
+
+    def _read_page(self, key):
+        try:
+            with open(self._page_path(key), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _read_manifest(self, file_hash):
+        try:
+            with open(self._manifest_path(file_hash), "r", encoding="utf-8") as f:
+                return json.load(f)["pages"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def extract_pages(self, path):
+        """Normalized text of every page of a PDF, extracting only pages not in the cache"""
+        file_hash = file_sha256(path)
+        self.stats["files"] += 1
+
+        keys = self._read_manifest(file_hash)
+        if keys is not None:
+            texts = [self._read_page(key) for key in keys]
+            if all(text is not None for text in texts):
+                self.stats["files_cached"] += 1
+                self.stats["pages"] += len(texts)
+                self.stats["pages_cached"] += len(texts)
+                return texts
+
+        from pypdf import PdfReader
+
+        started = time.perf_counter()
+        reader = PdfReader(path)
+        keys, texts = [], []
+        extracted = 0
+        for page in reader.pages:
+            key = page_hash(page)
+            text = self._read_page(key)
+            if text is None:
+                text = normalize_text(page.extract_text())
+                write_atomic(self._page_path(key), text)
+                extracted += 1
+            keys.append(key)
+            texts.append(text)
+        write_atomic(self._manifest_path(file_hash), json.dumps({"path": path, "pages": keys}))
+
+        elapsed = time.perf_counter() - started
+        self.stats["pages"] += len(texts)
+        self.stats["pages_cached"] += len(texts) - extracted
+        self.stats["pages_extracted"] += extracted
+        self.stats["extract_s"] += elapsed
+        logger.info(f"Extracted {extracted} of {len(texts)} pages from {path} in {elapsed:.2f}s "
+                    f"({len(texts) - extracted} from the cache)")
+        return texts
+
+    def load(self, path):
+        """LangChain Documents for the non-empty pages of a PDF, with the metadata PyPDFLoader sets"""
+        from langchain_core.documents import Document
+        return [
+            Document(page_content=text, metadata={"source": path, "page": number})
+            for number, text in enumerate(self.extract_pages(path))
+            if text
+        ]
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract the corpus PDFs through the cache and report cache hits")
+    parser.add_argument("--clear", action="store_true", help="Delete the cache")
+    args = parser.parse_args()
+
+    cache = ExtractionCache()
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {EXTRACTION_CACHE_DIR}")
+    else:
+        from app import pdf_files
+
+        started = time.perf_counter()
+        for path in pdf_files():
+            cache.extract_pages(path)
+        print(f"{cache.stats} in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,134 @@
+"""Opt-in profiling for the live service.
+
+SamplingProfiler samples thread stacks from a background thread every few
+milliseconds and writes them in the folded format ("frame;frame;frame
+count" per line) read by flamegraph.pl, inferno and speedscope. Nothing is
+imported into the request path and no hooks are installed unless
+PROFILING_ENABLED=1, so a disabled service pays nothing.
+
+MemoryTracker wraps tracemalloc: the first snapshot starts tracing, later
+calls report the allocation growth since the previous snapshot.
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+MAX_STACK_DEPTH = 200
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame, thread_name):
+    """One folded stack line, root first"""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads, or only of thread_ids, until stopped"""
+
+    def __init__(self, interval_ms=PROFILE_INTERVAL_MS, thread_ids=None):
+        self.interval = interval_ms / 1000
+        self.thread_ids = set(thread_ids) if thread_ids else None
+        self.counts = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.stopped_at = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_ids and thread_id not in self.thread_ids):
+                    continue
+                self.counts[collapse(frame, names.get(thread_id, str(thread_id)))] += 1
+            self.samples += 1
+
+    def start(self):
+        self.started_at = time.time()
+        self.thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.stopped_at = time.time()
+        return self
+
+    def folded(self):
+        """Flamegraph-ready folded stacks"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.counts.most_common()) + "\n"
+
+    def save(self, name, directory=PROFILE_DIR):
+        """Write the folded stacks to a file and return its path"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+        return path
+
+
+class MemoryTracker:
+    """tracemalloc snapshots and diffs; tracing only runs between start and stop"""
+
+    def __init__(self, frames=10):
+        self.frames = frames
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.taken_at = None
+
+    def take_snapshot(self):
+        """Start tracing if needed and make the current allocations the new baseline"""
+        with self.lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            self.snapshot = tracemalloc.take_snapshot()
+            self.taken_at = time.time()
+            current, peak = tracemalloc.get_traced_memory()
+            return {"taken_at": self.taken_at, "traced_bytes": current, "peak_bytes": peak}
+
+    def diff(self, top=20, group_by="lineno"):
+        """Allocation growth since the baseline snapshot, largest first"""
+        with self.lock:
+            if self.snapshot is None or not tracemalloc.is_tracing():
+                raise ValueError("No baseline snapshot; take one first")
+            current = tracemalloc.take_snapshot()
+            stats = current.compare_to(self.snapshot, group_by)
+            return {
+                "since": self.taken_at,
+                "seconds": round(time.time() - self.taken_at, 1),
+                "size_diff_bytes": sum(stat.size_diff for stat in stats),
+                "top": [
+                    {
+                        "location": str(stat.traceback[0]) if stat.traceback else "?",
+                        "size_diff_bytes": stat.size_diff,
+                        "size_bytes": stat.size,
+                        "count_diff": stat.count_diff,
+                    }
+                    for stat in stats[:top]
+                ],
+            }
+
+    def stop(self):
+        with self.lock:
+            tracemalloc.stop()
+            self.snapshot = None
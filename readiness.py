@@ -0,0 +1,97 @@
+"""Startup warm-up and readiness tracking.
+
+The warm-up runs a list of named steps (open the index, embed a query, run a
+retrieval, optionally call the LLM) on a background thread right after
+startup and records each step's status and timing. The instance reports
+ready once every required step has succeeded; failed required steps are
+retried until they pass, so an instance whose dependencies were briefly
+unavailable becomes ready without a restart.
+"""
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("asha_chatbot")
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+WARMUP_LLM = os.getenv("WARMUP_LLM", "0") == "1"
+WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", "30"))
+
+
+class Readiness:
+    """Runs warm-up steps and reports per-component status"""
+
+    def __init__(self, steps, retry_interval=WARMUP_RETRY_INTERVAL):
+        # steps: [(name, fn, required)], run in order
+        self.steps = steps
+        self.retry_interval = retry_interval
+        self.lock = threading.Lock()
+        self.components = {name: {"status": "pending", "required": required} for name, _, required in steps}
+        self.started_at = None
+        self.ready_at = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _run_step(self, name, fn):
+        with self.lock:
+            self.components[name]["status"] = "running"
+        started = time.perf_counter()
+        try:
+            fn()
+            status, error = "ok", None
+        except Exception as e:
+            logger.error(f"Warm-up step '{name}' failed: {e}")
+            status, error = "error", str(e)
+        with self.lock:
+            self.components[name].update({
+                "status": status,
+                "ms": round((time.perf_counter() - started) * 1000, 1),
+                "error": error,
+            })
+        return status == "ok"
+
+    def _run(self):
+        self.started_at = time.time()
+        pending = list(self.steps)
+        while pending and not self.stop_event.is_set():
+            pending = [(name, fn, required) for name, fn, required in pending
+                       if not self._run_step(name, fn) and required]
+            if pending:
+                self.stop_event.wait(self.retry_interval)
+        if self.is_ready():
+            self.ready_at = time.time()
+            logger.info(f"Warm-up finished in {self.ready_at - self.started_at:.1f}s; ready for traffic")
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="warm-up", daemon=True)
+            self.thread.start()
+
+    def skip(self):
+        """Mark every component as skipped (warm-up disabled); the instance counts as ready"""
+        with self.lock:
+            for component in self.components.values():
+                component["status"] = "skipped"
+        self.started_at = self.ready_at = time.time()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def is_ready(self):
+        with self.lock:
+            return all(
+                component["status"] in ("ok", "skipped")
+                for component in self.components.values()
+                if component["required"]
+            )
+
+    def status(self):
+        with self.lock:
+            components = {name: dict(component) for name, component in self.components.items()}
+        ready = all(c["status"] in ("ok", "skipped") for c in components.values() if c["required"])
+        return {
+            "ready": ready,
+            "components": components,
+            "warmup_ms": round((self.ready_at - self.started_at) * 1000, 1) if self.ready_at and self.started_at else None,
+        }
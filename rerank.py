@@ -0,0 +1,208 @@
+"""Second-stage reranking of retrieved chunks.
+
+The vector store is asked for a wide candidate set, which is then scored
+against the query by a small local CPU cross-encoder (or a lexical scorer
+when sentence-transformers is not available). Only the best chunks that clear
+a relevance threshold are passed on to the LLM.
+
+Run this module directly to compare reranked retrieval against the plain
+top-k retriever on a few sample queries:
+
+    python rerank.py "Which schemes help women start a dairy farm?"
+"""
+import hashlib
+import logging
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("asha_chatbot")
+
+RERANKER = os.getenv("RERANKER", "cross-encoder")  # "cross-encoder" or "lexical"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "30"))
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "2"))
+RERANK_THRESHOLD = float(os.getenv("RERANK_THRESHOLD", "0.3"))
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "20000"))
+
+STOPWORDS = {
+    "the", "and", "for", "are", "any", "can", "how", "what", "which", "who", "with",
+    "about", "from", "into", "that", "this", "there", "their", "have", "has", "was",
+    "were", "will", "would", "should", "could", "tell", "more", "does", "you", "your",
+    "me", "my", "i", "a", "an", "of", "to", "in", "on", "is", "it", "be", "do", "or",
+}
+
+
+def estimate_tokens(text):
+    """Rough token count for prompt size reporting (about 4 characters per token)"""
+    if not text:
+        return 0
+    return max(1, math.ceil(len(text) / 4))
+
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords, truncated to a crude stem"""
+    return [word[:6] for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+class ScoreCache:
+    """Thread-safe LRU cache of (query, chunk) relevance scores"""
+
+    def __init__(self, max_size=RERANK_CACHE_SIZE):
+        self.max_size = max_size
+        self.scores = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query, text):
+        return hashlib.sha1(f"{query}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            score = self.scores.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self.scores.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put(self, key, score):
+        with self.lock:
+            self.scores[key] = score
+            self.scores.move_to_end(key)
+            while len(self.scores) > self.max_size:
+                self.scores.popitem(last=False)
+
+
+class Reranker:
+    """Scores (query, chunk) pairs on a 0-1 relevance scale"""
+
+    def __init__(self, kind=RERANKER, model_name=RERANK_MODEL):
+        self.kind = kind
+        self.model_name = model_name
+        self.model = None
+        self.cache = ScoreCache()
+        self.lock = threading.Lock()
+
+    def _load_model(self):
+        """Load the cross-encoder on first use, falling back to lexical scoring"""
+        with self.lock:
+            if self.kind != "cross-encoder" or self.model is not None:
+                return
+            try:
+                from sentence_transformers import CrossEncoder
+                self.model = CrossEncoder(self.model_name, device="cpu")
+                logger.info(f"Loaded reranking model {self.model_name}")
+            except Exception as e:
+                logger.warning(f"Cross-encoder unavailable ({e}); using lexical reranking")
+                self.kind = "lexical"
+
+    def _lexical_scores(self, query, texts):
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return [0.0 for _ in texts]
+        return [len(query_terms & set(tokenize(text))) / len(query_terms) for text in texts]
+
+    def _model_scores(self, query, texts):
+        logits = self.model.predict([(query, text) for text in texts], show_progress_bar=False)
+        return [1 / (1 + math.exp(-float(logit))) for logit in logits]
+
+    def score(self, query, texts):
+        """Return a relevance score for each text, using the cache where possible"""
+        self._load_model()
+        keys = [ScoreCache.key(query, text) for text in texts]
+        scores = [self.cache.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            if self.kind == "cross-encoder":
+                new_scores = self._model_scores(query, missing_texts)
+            else:
+                new_scores = self._lexical_scores(query, missing_texts)
+            for i, score in zip(missing, new_scores):
+                scores[i] = score
+                self.cache.put(keys[i], score)
+
+        return scores
+
+    def rerank(self, query, documents, top_n=RERANK_TOP_N, threshold=RERANK_THRESHOLD):
+        """Keep the top_n documents whose relevance clears the threshold.
+
+        Returns the kept documents, best first, and a dict of reranking stats.
+        """
+        started = time.perf_counter()
+        texts = [doc.page_content for doc in documents]
+        scores = self.score(query, texts) if texts else []
+        ranked = sorted(zip(scores, range(len(documents))), key=lambda pair: -pair[0])
+        kept = [documents[i] for score, i in ranked[:top_n] if score >= threshold]
+
+        stats = {
+            "reranker": self.kind,
+            "candidates": len(documents),
+            "kept": len(kept),
+            "top_score": round(ranked[0][0], 4) if ranked else None,
+            "rerank_ms": round((time.perf_counter() - started) * 1000, 2),
+            "context_tokens": estimate_tokens("\n".join(doc.page_content for doc in kept)),
+        }
+        return kept, stats
+
+
+_reranker = None
+
+
+def get_reranker():
+    """Get the shared reranker"""
+    global _reranker
+    if _reranker is None:
+        _reranker = Reranker()
+    return _reranker
+
+
+SAMPLE_QUERIES = [
+    "Which government schemes help women start a dairy farm?",
+    "Are there any remote software jobs?",
+    "How much does a sewing machine cost for a tailoring business?",
+    "What mentorship programs are available for women entrepreneurs?",
+    "When is the Women in Tech Conference?",
+]
+
+
+def report(queries, baseline_k=2):
+    """Print retrieval latency and context size for plain top-k versus rerank"""
+    from app import get_shared_vector_db
+
+    db = get_shared_vector_db()
+    reranker = get_reranker()
+    print(f"{'query':<60} {'base_tok':>8} {'rr_tok':>7} {'saved':>6} {'kept':>5} {'fetch_ms':>8} {'rr_ms':>7}")
+    total_saved = 0
+    total_rerank_ms = 0.0
+    for query in queries:
+        baseline = db.similarity_search(query, k=baseline_k)
+        baseline_tokens = estimate_tokens("\n".join(doc.page_content for doc in baseline))
+
+        started = time.perf_counter()
+        candidates = db.similarity_search(query, k=RERANK_CANDIDATES)
+        fetch_ms = (time.perf_counter() - started) * 1000
+        _, stats = reranker.rerank(query, candidates)
+
+        print(f"{query[:60]:<60} {baseline_tokens:>8} {stats['context_tokens']:>7} "
+              f"{baseline_tokens - stats['context_tokens']:>6} {stats['kept']:>5} "
+              f"{fetch_ms:>8.1f} {stats['rerank_ms']:>7.1f}")
+        total_saved += baseline_tokens - stats["context_tokens"]
+        total_rerank_ms += stats["rerank_ms"]
+
+    if queries:
+        print(f"\nAverage: {total_saved / len(queries):.0f} prompt tokens saved per query "
+              f"for {total_rerank_ms / len(queries):.1f} ms of reranking")
+
+
+if __name__ == "__main__":
+    report(sys.argv[1:] or SAMPLE_QUERIES)
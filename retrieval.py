@@ -0,0 +1,139 @@
+"""Relevance-aware context selection.
+
+Candidates come back from the vector store together with their embeddings.
+Anything below the similarity threshold is dropped (no context at all when
+nothing is relevant), the survivors are reranked, and maximal marginal
+relevance (MMR) picks a diverse set of chunks until the context token budget
+or the maximum k is reached.
+"""
+import logging
+import os
+import time
+
+import numpy as np
+
+from rerank import RERANK_THRESHOLD, estimate_tokens
+
+logger = logging.getLogger("asha_chatbot")
+
+RETRIEVAL_MIN_SIMILARITY = float(os.getenv("RETRIEVAL_MIN_SIMILARITY", "0.25"))
+RETRIEVAL_RELATIVE_CUTOFF = float(os.getenv("RETRIEVAL_RELATIVE_CUTOFF", "0.5"))
+RETRIEVAL_MAX_K = int(os.getenv("RETRIEVAL_MAX_K", "4"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "600"))
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+MMR_DUPLICATE_SIMILARITY = float(os.getenv("MMR_DUPLICATE_SIMILARITY", "0.95"))
+
+
+def fetch_candidates(db, query_vectors, n_results):
+    """Query the vector store once for all query vectors.
+
+    Returns, per query, a list of (Document, embedding) pairs.
+    """
+    from langchain_core.documents import Document
+
+    results = db._collection.query(
+        query_embeddings=query_vectors,
+        n_results=n_results,
+        include=["documents", "metadatas", "embeddings"]
+    )
+    candidates = []
+    for texts, metadatas, vectors in zip(results["documents"], results["metadatas"], results["embeddings"]):
+        candidates.append([
+            (Document(page_content=text, metadata=dict(metadata or {})), vector)
+            for text, metadata, vector in zip(texts, metadatas, vectors)
+        ])
+    return candidates
+
+
+def cosine_similarities(vector, matrix):
+    """Cosine similarity between one vector and each row of a matrix"""
+    vector = np.asarray(vector, dtype=np.float32)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+    norms[norms == 0] = 1e-12
+    return matrix @ vector / norms
+
+
+def mmr_select(relevance, matrix, token_counts, max_k=RETRIEVAL_MAX_K,
+               token_budget=CONTEXT_TOKEN_BUDGET, mmr_lambda=MMR_LAMBDA):
+    """Greedy maximal-marginal-relevance selection under a token budget.
+
+    Returns the selected row indices in selection order.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1e-12
+    unit = matrix / norms
+    pairwise = unit @ unit.T
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    remaining = list(range(len(relevance)))
+    selected = []
+    used_tokens = 0
+
+    while remaining and len(selected) < max_k:
+        if selected:
+            redundancy = pairwise[np.ix_(remaining, selected)].max(axis=1)
+        else:
+            redundancy = np.zeros(len(remaining), dtype=np.float32)
+        scores = mmr_lambda * relevance[remaining] - (1 - mmr_lambda) * redundancy
+        best = int(np.argmax(scores))
+        index = remaining.pop(best)
+
+        if redundancy[best] >= MMR_DUPLICATE_SIMILARITY:
+            continue
+        if used_tokens + token_counts[index] > token_budget:
+            # Always allow one chunk so a single large relevant chunk is not lost
+            if selected:
+                continue
+        selected.append(index)
+        used_tokens += token_counts[index]
+
+    return selected
+
+
+def select_context(query, query_vector, candidates, reranker, max_k=RETRIEVAL_MAX_K,
+                   token_budget=CONTEXT_TOKEN_BUDGET, min_similarity=RETRIEVAL_MIN_SIMILARITY):
+    """Pick the context chunks for one query from its (Document, embedding) candidates.
+
+    Selected documents carry "similarity" and "relevance" scores in their
+    metadata. Returns the documents and a dict of selection stats.
+    """
+    started = time.perf_counter()
+    stats = {"candidates": len(candidates), "above_threshold": 0, "selected": 0, "context_tokens": 0}
+    if not candidates:
+        return [], stats
+
+    documents = [doc for doc, _ in candidates]
+    matrix = np.asarray([vector for _, vector in candidates], dtype=np.float32)
+    similarity = cosine_similarities(query_vector, matrix)
+
+    keep = [i for i in range(len(documents)) if similarity[i] >= min_similarity]
+    stats["above_threshold"] = len(keep)
+    if not keep:
+        stats["select_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return [], stats
+
+    relevance = reranker.score(query, [documents[i].page_content for i in keep])
+    best = max(relevance)
+    cutoff = max(RERANK_THRESHOLD, best * RETRIEVAL_RELATIVE_CUTOFF)
+    relevant = [(i, score) for i, score in zip(keep, relevance) if score >= cutoff]
+    if not relevant:
+        stats["select_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return [], stats
+
+    rows = [i for i, _ in relevant]
+    token_counts = [estimate_tokens(documents[i].page_content) for i in rows]
+    chosen = mmr_select([score for _, score in relevant], matrix[rows], token_counts, max_k, token_budget)
+
+    selected = []
+    for position in chosen:
+        doc = documents[rows[position]]
+        doc.metadata["similarity"] = round(float(similarity[rows[position]]), 4)
+        doc.metadata["relevance"] = round(float(relevant[position][1]), 4)
+        selected.append(doc)
+
+    stats["selected"] = len(selected)
+    stats["context_tokens"] = sum(token_counts[position] for position in chosen)
+    stats["select_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return selected, stats
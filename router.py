@@ -0,0 +1,219 @@
+"""Fast local query-intent router.
+
+Decides, before any retrieval or LLM call, what kind of message a query is
+and which context_type it belongs to:
+
+- "smalltalk": greetings, thanks and goodbyes, answered with a short prompt
+  and no retrieval
+- "lookup": structured questions about listings (jobs, events, mentorship
+  programs, schemes), answered from the JSON records directly
+- "question": everything else, which goes through full retrieval
+
+Keyword rules are tried first. When they are inconclusive the query is
+classified by cosine similarity to per-category centroids of hashed
+bag-of-words vectors built from seed examples. Everything runs locally in
+well under a millisecond.
+
+Run this module directly for an accuracy and latency benchmark:
+
+    python router.py
+"""
+import re
+import statistics
+import time
+import zlib
+
+import numpy as np
+
+ROUTER_DIM = 1024
+ROUTER_MIN_CONFIDENCE = 0.12
+
+CONTEXT_TYPES = ["all", "jobs", "events", "mentorship", "schemes"]
+
+SMALLTALK_PATTERN = re.compile(
+    r"^\s*(hi+|hello+|hey+|hii+|namaste|good (morning|afternoon|evening|night)|"
+    r"thanks?( you)?( so much| a lot)?|thank you( so much| very much)?|thx|ok(ay)?|cool|great|nice|"
+    r"bye+|goodbye|see you|how are you( doing)?|who are you|what is your name)"
+    r"[\s!.,?]*(asha)?[\s!.,?]*$",
+    re.IGNORECASE,
+)
+
+LOOKUP_PATTERN = re.compile(
+    r"^\s*(list|show( me)?|find( me)?|give me( a list of)?|search( for)?)\b|"
+    r"\b(when|where) is\b|\bdeadline\b|\blast date\b|\bhow many\b|\bapply link\b|\bregistration link\b",
+    re.IGNORECASE,
+)
+
+KEYWORD_RULES = {
+    "jobs": re.compile(r"\b(jobs?|hiring|vacanc(y|ies)|openings?|positions?|salary|recruit\w*|employers?|work from home)\b", re.I),
+    "events": re.compile(r"\b(events?|workshops?|conferences?|webinars?|meetups?|sessions?|networking|summit)\b", re.I),
+    "mentorship": re.compile(r"\b(mentors?|mentorship|mentoring|coach(es|ing)?|guidance program)\b", re.I),
+    "schemes": re.compile(r"\b(schemes?|yojana|subsid(y|ies)|government|ministry|loans?|grants?|mudra|stand ?up india)\b", re.I),
+}
+
+SEED_EXAMPLES = {
+    "jobs": [
+        "What job opportunities are available for women returning to work?",
+        "Are there any remote job opportunities available?",
+        "How can I prepare for a job interview?",
+        "What women-friendly companies are hiring now?",
+        "What should I include in my resume to stand out?",
+        "software developer position in bangalore",
+        "part time content writer role with flexible hours",
+    ],
+    "events": [
+        "Are there any upcoming workshops for women in tech?",
+        "Tell me about upcoming career development sessions",
+        "What networking events are happening soon?",
+        "Is the conference free to attend online?",
+        "resume building workshop registration",
+    ],
+    "mentorship": [
+        "How can I find a mentor in my field?",
+        "How can I register for mentorship programs?",
+        "one on one mentorship for women entering technology",
+        "guidance for women entrepreneurs from experienced mentors",
+    ],
+    "schemes": [
+        "Which government schemes support women entrepreneurs?",
+        "How do I get a loan to start a dairy farm?",
+        "subsidy for starting a tailoring business",
+        "ministry programs for small business funding",
+        "financial assistance for self help groups",
+    ],
+    "all": [
+        "What career paths have good growth opportunities for women?",
+        "How can I build a career in technology with no prior experience?",
+        "What skills should I develop to advance in my career?",
+        "How can I balance my career with family responsibilities?",
+        "What certifications will help me in a digital marketing career?",
+    ],
+}
+
+
+def hashed_vector(text, dim=ROUTER_DIM):
+    """L2-normalized hashed bag of words and word bigrams"""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    features = words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+    vector = np.zeros(dim, dtype=np.float32)
+    if not features:
+        return vector
+    indices = [zlib.crc32(feature.encode("utf-8")) % dim for feature in features]
+    np.add.at(vector, indices, 1.0)
+    return vector / np.linalg.norm(vector)
+
+
+class IntentRouter:
+    """Routes a query to an intent and a context_type"""
+
+    def __init__(self, seed_examples=SEED_EXAMPLES):
+        self.labels = list(seed_examples)
+        centroids = []
+        for label in self.labels:
+            centroid = np.mean([hashed_vector(example) for example in seed_examples[label]], axis=0)
+            centroids.append(centroid / np.linalg.norm(centroid))
+        self.centroids = np.vstack(centroids)
+
+    def classify(self, query):
+        """Pick a context_type with keyword rules, then the nearest centroid"""
+        matched = [label for label, pattern in KEYWORD_RULES.items() if pattern.search(query)]
+        if len(matched) == 1:
+            return matched[0], 1.0, "keyword"
+
+        similarities = self.centroids @ hashed_vector(query)
+        if matched:
+            # Several keyword hits: let the centroids break the tie
+            allowed = [self.labels.index(label) for label in matched]
+            best = max(allowed, key=lambda i: similarities[i])
+        else:
+            best = int(np.argmax(similarities))
+        confidence = float(similarities[best])
+        if confidence < ROUTER_MIN_CONFIDENCE:
+            return "all", confidence, "centroid"
+        return self.labels[best], confidence, "centroid"
+
+    def route(self, query, context_type=None):
+        """Route a query.
+
+        An explicit context_type (anything other than None or "auto") is kept
+        as is; only the intent is decided for it.
+        """
+        if SMALLTALK_PATTERN.match(query):
+            return {"intent": "smalltalk", "context_type": context_type if context_type not in (None, "auto") else "all",
+                    "confidence": 1.0, "method": "keyword"}
+
+        if context_type in (None, "auto"):
+            context_type, confidence, method = self.classify(query)
+        else:
+            confidence, method = 1.0, "explicit"
+
+        intent = "lookup" if context_type != "all" and LOOKUP_PATTERN.search(query) else "question"
+        return {"intent": intent, "context_type": context_type, "confidence": round(confidence, 4), "method": method}
+
+
+_router = None
+
+
+def get_router():
+    """Get the shared intent router"""
+    global _router
+    if _router is None:
+        _router = IntentRouter()
+    return _router
+
+
+def route_query(query, context_type=None):
+    """Route a query with the shared router"""
+    return get_router().route(query, context_type)
+
+
+BENCHMARK_QUERIES = [
+    ("hi", "smalltalk", "all"),
+    ("Thanks so much!", "smalltalk", "all"),
+    ("hello asha", "smalltalk", "all"),
+    ("bye", "smalltalk", "all"),
+    ("good morning", "smalltalk", "all"),
+    ("List all remote jobs", "lookup", "jobs"),
+    ("Show me jobs in Delhi", "lookup", "jobs"),
+    ("When is the Women in Tech Conference?", "lookup", "events"),
+    ("What is the deadline for the Tech Career Mentorship?", "lookup", "mentorship"),
+    ("Find schemes for dairy farming", "lookup", "schemes"),
+    ("Are there openings for content writers?", "question", "jobs"),
+    ("How do I negotiate salary for my first role?", "question", "jobs"),
+    ("Is there a webinar on digital marketing this month?", "question", "events"),
+    ("I want someone experienced to guide me in product management", "question", "mentorship"),
+    ("Can I get a loan to buy sewing machines?", "question", "schemes"),
+    ("What subsidy does the ministry give for electronics units?", "question", "schemes"),
+    ("How can I restart my career after a break?", "question", "all"),
+    ("What skills are in demand for data science?", "question", "all"),
+    ("How should I balance work and family?", "question", "all"),
+    ("How do I start a tailoring business from home?", "question", "all"),
+]
+
+
+def benchmark(repeats=200):
+    """Print routing accuracy and per-query latency over the labeled queries"""
+    router = get_router()
+    correct_intent = correct_type = 0
+    timings = []
+    for query, intent, context_type in BENCHMARK_QUERIES:
+        result = router.route(query)
+        correct_intent += result["intent"] == intent
+        correct_type += result["context_type"] == context_type
+        if result["intent"] != intent or result["context_type"] != context_type:
+            print(f"MISS {query!r}: got {result['intent']}/{result['context_type']}, expected {intent}/{context_type}")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            router.route(query)
+            timings.append((time.perf_counter() - started) * 1e6)
+
+    timings.sort()
+    total = len(BENCHMARK_QUERIES)
+    print(f"Intent accuracy:       {correct_intent / total:.0%} ({correct_intent}/{total})")
+    print(f"Context type accuracy: {correct_type / total:.0%} ({correct_type}/{total})")
+    print(f"Latency: mean {statistics.mean(timings):.1f} us, "
+          f"p50 {timings[len(timings) // 2]:.1f} us, p99 {timings[int(len(timings) * 0.99)]:.1f} us")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,204 @@
+"""Local bias and safety screening for queries and answers.
+
+Screening runs on a small thread pool so it overlaps with work the request
+does anyway: the query is checked while it is routed and its context is
+retrieved, the answer while the response is assembled. Each check has a
+strict latency budget; a check that is not done in time is treated as clean
+and counted, so screening never holds a response back. Results are cached
+by text, so repeated questions and pre-generated answers are screened once.
+
+The default classifier is a set of weighted patterns for gender stereotypes,
+harassment and unsafe requests. SAFETY_CLASSIFIER=model uses a local
+transformers text-classification model (SAFETY_MODEL) instead, falling back
+to the patterns when it cannot be loaded.
+
+    python safety.py "Women are too emotional to be managers"
+"""
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rerank import ScoreCache
+
+logger = logging.getLogger("asha_chatbot")
+
+SAFETY_ENABLED = os.getenv("SAFETY_ENABLED", "1") == "1"
+SAFETY_CLASSIFIER = os.getenv("SAFETY_CLASSIFIER", "lexical")  # "lexical" or "model"
+SAFETY_MODEL = os.getenv("SAFETY_MODEL", "unitary/toxic-bert")
+SAFETY_THRESHOLD = float(os.getenv("SAFETY_THRESHOLD", "0.5"))
+SAFETY_BUDGET_MS = float(os.getenv("SAFETY_BUDGET_MS", "50"))
+SAFETY_WORKERS = int(os.getenv("SAFETY_WORKERS", "2"))
+SAFETY_CACHE_SIZE = int(os.getenv("SAFETY_CACHE_SIZE", "10000"))
+
+WOMEN = r"(women|woman|girls?|ladies|lady|females?|wives|wife|mothers?|moms?)"
+MEN = r"(men|man|boys?|males?)"
+
+# (category, weight, pattern); a text's score is the highest weight that matches
+PATTERNS = [
+    ("gender_stereotype", 0.9, rf"\b{WOMEN} (are|is) (too |naturally |just |so )?(emotional|weak|irrational|hysterical|bad at|not (good|smart|strong|capable)|less (capable|intelligent)|incapable|inferior)"),
+    ("gender_stereotype", 0.9, rf"\b{WOMEN} (should|must|ought to|belong) (stay|be|remain)? ?(at home|in the kitchen|housewives|home)"),
+    ("gender_stereotype", 0.8, rf"\b{WOMEN} (can'?t|cannot|shouldn'?t|should not|don'?t|do not) (lead|code|manage|do (math|maths|engineering|science)|handle|be (leaders|engineers|managers|bosses|ceos))"),
+    ("gender_stereotype", 0.8, rf"\b{MEN} are (better|smarter|stronger|more (capable|logical|rational)) than {WOMEN}"),
+    ("gender_stereotype", 0.8, rf"\b(not|isn'?t) a (job|career|field|role) for (a )?{WOMEN}"),
+    ("gender_stereotype", 0.7, rf"\b(only|real) {MEN} (can|should) (be|do|work)"),
+    ("gender_stereotype", 0.6, r"\b(because|since) (she'?s|she is|you'?re|you are) a (woman|girl|mother)\b"),
+    ("gender_stereotype", 0.6, rf"\bavoid hiring {WOMEN}|\bdon'?t hire {WOMEN}|\bnot hire (a )?(pregnant|married) {WOMEN}"),
+    ("harassment", 0.9, r"\b(bitch|slut|whore|randi|chutiya|bimbo)\b"),
+    ("harassment", 0.7, r"\b(stupid|dumb|useless|worthless) (woman|girl|women|girls|bot)\b"),
+    ("harassment", 0.6, r"\b(shut up|go to hell)\b"),
+    ("unsafe", 0.9, r"\b(kill|hurt|harm) (myself|yourself|her|him|them)\b|\bsuicid(e|al)\b"),
+    ("unsafe", 0.8, r"\b(stalk|spy on|track) (her|my (wife|girlfriend|ex))\b"),
+]
+COMPILED_PATTERNS = [(category, weight, re.compile(pattern, re.IGNORECASE)) for category, weight, pattern in PATTERNS]
+
+# Someone reporting or asking how to answer a biased remark is not being biased themselves
+REPORTED_SPEECH = re.compile(
+    r"\b(said|says|told me|tells me|keeps? saying|claims?|heard|people think|my (boss|manager|family|husband|colleague)|"
+    r"how (do|should|can) i (respond|reply|deal|handle|react|answer)|is it true|why do people)\b",
+    re.IGNORECASE,
+)
+REPORTED_SPEECH_DISCOUNT = 0.5
+
+# Nor is a text that names a stereotype in order to refute it, as good answers often do
+REFUTATION = re.compile(
+    r"\b(myths?|stereotypes?|misconceptions?|(belief|idea|notion|assumption|claim) that|not true|untrue|"
+    r"(it is|it'?s) wrong to|no (evidence|truth)|debunk\w*|contrary to)\b",
+    re.IGNORECASE,
+)
+NOT_A_MYTH = re.compile(r"\b(not|isn'?t|is no) (a |just a |only a )?(myth|stereotype|misconception)", re.IGNORECASE)
+REFUTATION_DISCOUNT = 0.4
+
+# What the user sees instead of an answer, by category
+SAFE_RESPONSES = {
+    "gender_stereotype": (
+        "I'd like to gently push back on that. Ability in any career isn't determined by gender, and women "
+        "succeed in every field, from engineering to leadership. I'm happy to help with career guidance, "
+        "jobs, events or mentorship."
+    ),
+    "harassment": (
+        "Let's keep our conversation respectful. I'm here to help with careers, jobs, events and mentorship "
+        "whenever you're ready."
+    ),
+    "unsafe": (
+        "I can't help with that. If you or someone else is in danger, please contact the Women Helpline "
+        "(181) or emergency services (112) right away."
+    ),
+}
+DEFAULT_SAFE_RESPONSE = SAFE_RESPONSES["gender_stereotype"]
+
+
+def lexical_screen(text):
+    """(score, category) from the weighted patterns"""
+    score, category = 0.0, None
+    for pattern_category, weight, pattern in COMPILED_PATTERNS:
+        if weight > score and pattern.search(text):
+            score, category = weight, pattern_category
+    if category in ("gender_stereotype", "harassment") and REPORTED_SPEECH.search(text):
+        score *= REPORTED_SPEECH_DISCOUNT
+    if category == "gender_stereotype" and REFUTATION.search(text) and not NOT_A_MYTH.search(text):
+        score *= REFUTATION_DISCOUNT
+    return score, category
+
+
+class SafetyScreener:
+    """Screens texts on a thread pool within a latency budget, caching verdicts by text"""
+
+    def __init__(self, kind=SAFETY_CLASSIFIER, model_name=SAFETY_MODEL, threshold=SAFETY_THRESHOLD,
+                 budget_ms=SAFETY_BUDGET_MS, workers=SAFETY_WORKERS):
+        self.kind = kind
+        self.model_name = model_name
+        self.model = None
+        self.threshold = threshold
+        self.budget = budget_ms / 1000
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="safety")
+        self.cache = ScoreCache(SAFETY_CACHE_SIZE)
+        self.lock = threading.Lock()
+        self.stats = {"screened": 0, "flagged": 0, "timeouts": 0}
+
+    def _load_model(self):
+        """Load the classifier on first use, falling back to the patterns"""
+        with self.lock:
+            if self.kind != "model" or self.model is not None:
+                return
+            try:
+                from transformers import pipeline
+                self.model = pipeline("text-classification", model=self.model_name, device=-1, top_k=None)
+                logger.info(f"Loaded safety model {self.model_name}")
+            except Exception as e:
+                logger.warning(f"Safety model unavailable ({e}); using pattern screening")
+                self.kind = "lexical"
+
+    def _model_screen(self, text):
+        labels = self.model(text[:2000], truncation=True)[0]
+        best = max(labels, key=lambda label: label["score"])
+        return float(best["score"]), best["label"].lower()
+
+    def check(self, text):
+        """Verdict for one text: {"flagged", "score", "category"}; blocking and cached"""
+        key = ScoreCache.key("safety", text)
+        verdict = self.cache.get(key)
+        if verdict is None:
+            self._load_model()
+            score, category = lexical_screen(text)
+            if self.kind == "model" and score < self.threshold:
+                score, category = self._model_screen(text)
+            verdict = {"flagged": score >= self.threshold, "score": round(score, 3), "category": category}
+            self.cache.put(key, verdict)
+        with self.lock:
+            self.stats["screened"] += 1
+            self.stats["flagged"] += verdict["flagged"]
+        return verdict
+
+    def submit(self, text):
+        """Start screening a text in the background; pass the future to result()"""
+        return self.executor.submit(self.check, text), time.perf_counter()
+
+    async def result(self, pending):
+        """The verdict of a submitted check, or a clean verdict once its budget is used up"""
+        future, started = pending
+        try:
+            if not future.done():
+                remaining = max(0.0, self.budget - (time.perf_counter() - started))
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=remaining)
+            verdict = future.result()
+        except asyncio.TimeoutError:
+            with self.lock:
+                self.stats["timeouts"] += 1
+            logger.warning(f"Safety check missed its {self.budget * 1000:.0f} ms budget; treated as clean")
+            return {"flagged": False, "score": None, "category": None, "timed_out": True}
+        except Exception as e:
+            logger.error(f"Safety check failed: {e}")
+            return {"flagged": False, "score": None, "category": None, "error": str(e)}
+        return dict(verdict)
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "classifier": self.kind,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "budget_ms": self.budget * 1000,
+        }
+
+    def stop(self):
+        self.executor.shutdown(wait=False)
+
+
+def safe_response(category):
+    return SAFE_RESPONSES.get(category, DEFAULT_SAFE_RESPONSE)
+
+
+if __name__ == "__main__":
+    screener = SafetyScreener()
+    for text in sys.argv[1:] or ["Women are too emotional to be managers", "Show me remote software jobs"]:
+        started = time.perf_counter()
+        verdict = screener.check(text)
+        print(f"{(time.perf_counter() - started) * 1000:7.2f} ms  {verdict}  {text}")
+    screener.stop()
@@ -0,0 +1,265 @@
+"""Structured eligibility index over the government schemes.
+
+Each record in governmentschemes.json is a title plus one long free-text
+description that starts with the issuing ministry or agency and ends with
+the scheme's links. Ingestion pulls structured fields out of that text:
+
+- ministry: the issuing ministry or agency
+- target_groups: who the scheme is meant for (women, SC/ST, startups, ...)
+- sectors: the industries it covers (dairy, textiles, food processing, ...)
+- benefit_types: what it offers (loan, grant, subsidy, equity, ...)
+- links: URLs from the description
+
+Questions such as "which schemes can a woman starting a dairy unit use" are
+mapped onto the same vocabulary and answered by filtering the index, so only
+the matching schemes reach the LLM. Rarer words of the question are also
+matched against scheme titles and descriptions, so a question naming a
+scheme ("MUDRA loans") finds it even when its facets point elsewhere.
+
+    python schemes.py "which schemes can a woman starting a dairy unit use"
+"""
+import json
+import re
+import sys
+
+from rerank import tokenize
+
+# Question words found in at most this share of schemes count as naming a scheme or topic
+SCHEME_RARE_TERM_SHARE = 0.1
+
+AGENCIES = [
+    "Ministry of Social Justice and Empowerment",
+    "Ministry of Science & Technology",
+    "Ministry of Development of North Eastern Region",
+    "Ministry of Tribal Affairs",
+    "Ministry of Textiles",
+    "Ministry of New and Renewable Energy",
+    "Ministry of Micro, Small and Medium Enterprises",
+    "Ministry of Housing and Urban Affairs",
+    "Ministry of Heavy Industries & Public Enterprises",
+    "Ministry of Food Processing Industries",
+    "Ministry of Finance",
+    "Ministry of Electronics and Information Technology",
+    "Ministry of Defence",
+    "Ministry of Communications",
+    "Ministry of Commerce and Industry",
+    "Ministry of Agriculture",
+    "Public Sector Enterprise",
+    "Niti Aayog",
+    "National Bank for Agriculture and Rural Development",
+    "Central Bank of India",
+    "Biotechnology Industry Research Assistance Council",
+    "AYUSH",
+]
+
+TARGET_GROUP_KEYWORDS = {
+    "women": ["women", "woman", "female", "mahila", "girl"],
+    "sc/st": ["scheduled caste", "scheduled tribe", "sc/st", "sc and st", "tribal", "dalit"],
+    "startups": ["start-up", "startup", "incubat"],
+    "msme": ["msme", "micro, small", "small and medium", "micro enterprise", "micro-enterprise", "small business"],
+    "farmers": ["farmer", "agriculturist", "rural"],
+    "researchers": ["research", "scientist", "academic", "institution"],
+    "students": ["student", "youth", "young"],
+    "exporters": ["export"],
+    "north-east": ["north east", "north-east", "north eastern"],
+    "artisans": ["artisan", "weaver", "handloom", "handicraft", "craft"],
+    "senior citizens": ["senior citizen", "elderly"],
+    "self-employed": ["self-employed", "self employed", "self-employment", "self help group", "shg"],
+}
+
+SECTOR_KEYWORDS = {
+    "dairy": ["dairy", "milk", "cattle", "cow", "buffalo", "livestock", "animal husbandry"],
+    "agriculture": ["agricultur", "farm", "crop", "horticultur", "plantation", "medicinal plant"],
+    "food processing": ["food processing", "food", "bakery", "pickle"],
+    "textiles": ["textile", "handloom", "apparel", "garment", "weav", "tailor", "silk", "stitch", "sewing"],
+    "electronics & it": ["electronic", "software", "information technology", "digital", "telecom", "computer"],
+    "biotech & health": ["biotech", "health", "medical", "pharma", "ayush", "medicin"],
+    "manufacturing": ["manufactur", "industr", "production"],
+    "energy": ["solar", "renewable", "energy", "battery"],
+    "defence": ["defence", "defense"],
+    "tea": ["tea "],
+    "housing": ["housing", "urban development"],
+}
+
+# A scheme for the broader sector also serves the narrower one
+SECTOR_PARENTS = {
+    "dairy": ["agriculture"],
+    "food processing": ["agriculture"],
+}
+
+BENEFIT_KEYWORDS = {
+    "loan": ["loan", "credit", "lending", "refinanc"],
+    "grant": ["grant", "funding support", "financial assistance", "financial support", "assistance of"],
+    "subsidy": ["subsid", "interest subvention", "reimburse"],
+    "equity": ["equity", "venture capital", "venture fund", "fund of funds", "invest"],
+    "training": ["training", "skill", "mentor", "capacity building", "workshop"],
+    "tax & certification": ["certificat", "tax", "exemption", "duty"],
+    "marketing": ["marketing", "market access", "exhibition", "buyer", "trade fair"],
+    "infrastructure": ["infrastructure", "facility", "centre of excellence", "centers of excellence", "park"],
+}
+
+
+def is_facet_term(term):
+    """Whether a question word is already covered by the facet vocabulary ("loans", "woman")"""
+    return any(
+        word.strip().startswith(term) or term.startswith(word.strip())
+        for keyword_map in (TARGET_GROUP_KEYWORDS, SECTOR_KEYWORDS, BENEFIT_KEYWORDS)
+        for words in keyword_map.values() for word in words
+    )
+
+
+def keyword_matches(text, keyword_map):
+    """Labels whose keywords occur in the (lowercase) text"""
+    return sorted(label for label, words in keyword_map.items() if any(word in text for word in words))
+
+
+def extract_ministry(description):
+    """The ministry or agency a scheme description starts with"""
+    for agency in AGENCIES:
+        if description.startswith(agency):
+            return agency
+    match = re.match(r"(Ministry of [A-Z][\w,&' ]+?)(?= \(| The | Department| Schemes|$)", description)
+    return match.group(1) if match else None
+
+
+def extract_scheme_fields(record):
+    """Structured fields for one scheme record"""
+    title = record.get("title", "")
+    description = record.get("description", "")
+    text = f" {title} {description} ".lower()
+    return {
+        "title": title,
+        "ministry": extract_ministry(description),
+        "target_groups": keyword_matches(text, TARGET_GROUP_KEYWORDS),
+        "sectors": keyword_matches(text, SECTOR_KEYWORDS),
+        "benefit_types": keyword_matches(text, BENEFIT_KEYWORDS),
+        "links": sorted(set(re.findall(r"https?://[^\s\"'<>]+", description))),
+        "summary": re.split(r"\.\.\.|Link to Application", description)[0].strip()[:300],
+    }
+
+
+def query_facets(query):
+    """Map a free-text question onto the index vocabulary"""
+    text = f" {query} ".lower()
+    return {
+        "target_groups": keyword_matches(text, TARGET_GROUP_KEYWORDS),
+        "sectors": keyword_matches(text, SECTOR_KEYWORDS),
+        "benefit_types": keyword_matches(text, BENEFIT_KEYWORDS),
+    }
+
+
+class SchemeIndex:
+    """Queryable index of extracted scheme fields"""
+
+    def __init__(self, records, version=None):
+        self.version = version
+        records = [record for record in records if isinstance(record, dict)]
+        self.schemes = [extract_scheme_fields(record) for record in records]
+        self.title_terms = [set(tokenize(record.get("title", ""))) for record in records]
+        self.text_terms = [set(tokenize(record.get("description", ""))) | title
+                           for record, title in zip(records, self.title_terms)]
+        self.term_counts = {}
+        for terms in self.text_terms:
+            for term in terms:
+                self.term_counts[term] = self.term_counts.get(term, 0) + 1
+        self.postings = {}
+        for i, scheme in enumerate(self.schemes):
+            for field in ("target_groups", "sectors", "benefit_types"):
+                for value in scheme[field]:
+                    self.postings.setdefault((field, value), set()).add(i)
+            if scheme["ministry"]:
+                self.postings.setdefault(("ministry", scheme["ministry"].lower()), set()).add(i)
+
+    def filter(self, ministry=None, target_group=None, sector=None, benefit_type=None, q=None):
+        """Schemes matching every given field exactly, in file order"""
+        matches = set(range(len(self.schemes)))
+        for field, value in (("ministry", ministry), ("target_groups", target_group),
+                             ("sectors", sector), ("benefit_types", benefit_type)):
+            if value:
+                matches &= self.postings.get((field, value.lower()), set())
+        if q:
+            terms = q.lower().split()
+            matches = {
+                i for i in matches
+                if all(term in f"{self.schemes[i]['title']} {self.schemes[i]['summary']}".lower() for term in terms)
+            }
+        return [self.schemes[i] for i in sorted(matches)]
+
+    def rare_terms(self, query):
+        """Question words outside the facet vocabulary that occur in only a few schemes, such as a scheme name"""
+        most = max(1, int(len(self.schemes) * SCHEME_RARE_TERM_SHARE))
+        return {
+            term for term in tokenize(query)
+            if len(term) > 3 and 0 < self.term_counts.get(term, 0) <= most and not is_facet_term(term)
+        }
+
+    def match(self, query, limit=5):
+        """Rank schemes for a free-text question; returns (schemes, strong).
+
+        Rare question words score 4 in a scheme's title and 2 in its
+        description; matched facets add 3 for the sector (2 for its parent
+        sector), 2 per target group and 1 per benefit type. When the question
+        names a sector, schemes for other sectors are left out unless their
+        text matches. strong is True when the best scheme's title matched the
+        question's words or it is for the exact sector asked about; matches on
+        the other facets alone are often too broad ("women") to answer from.
+        """
+        facets = query_facets(query)
+        terms = self.rare_terms(query)
+        if not terms and not any(facets.values()):
+            return [], False
+
+        wanted_sectors = set(facets["sectors"])
+        for sector in facets["sectors"]:
+            wanted_sectors.update(SECTOR_PARENTS.get(sector, []))
+
+        scored = []
+        for i, scheme in enumerate(self.schemes):
+            title_hits = terms & self.title_terms[i]
+            text_hits = (terms & self.text_terms[i]) - title_hits
+            score = 4 * len(title_hits) + 2 * len(text_hits)
+            specific = bool(title_hits)
+            if wanted_sectors and scheme["sectors"]:
+                sector_hits = set(scheme["sectors"]) & wanted_sectors
+                if not sector_hits and not score:
+                    continue
+                # Exact sector beats the parent sector
+                if sector_hits & set(facets["sectors"]):
+                    score += 3
+                    specific = True
+                elif sector_hits:
+                    score += 2
+            score += 2 * len(set(scheme["target_groups"]) & set(facets["target_groups"]))
+            score += len(set(scheme["benefit_types"]) & set(facets["benefit_types"]))
+            if score:
+                scored.append((score, specific, i))
+
+        scored.sort(key=lambda item: (-item[0], item[2]))
+        strong = bool(scored) and scored[0][1]
+        return [self.schemes[i] for _, _, i in scored[:limit]], strong
+
+    def search(self, query, limit=5):
+        """The best-ranked schemes for a free-text question (see match)"""
+        return self.match(query, limit)[0]
+
+
+def format_schemes(schemes):
+    """Compact text rendering of schemes for use as LLM context"""
+    lines = []
+    for scheme in schemes:
+        lines.append(
+            f"- {scheme['title']} ({scheme['ministry'] or 'Unknown agency'}). "
+            f"For: {', '.join(scheme['target_groups']) or 'all'}. "
+            f"Sectors: {', '.join(scheme['sectors']) or 'any'}. "
+            f"Benefits: {', '.join(scheme['benefit_types']) or 'see details'}. "
+            f"{scheme['summary']} Links: {', '.join(scheme['links']) or 'none'}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    with open("governmentschemes.json", "r", encoding="utf-8") as f:
+        index = SchemeIndex(json.load(f))
+    question = " ".join(sys.argv[1:]) or "which schemes can a woman starting a dairy unit use"
+    print(f"Facets: {query_facets(question)}\n")
+    print(format_schemes(index.search(question)) or "No matching schemes")
@@ -0,0 +1,117 @@
+"""Cold-start budget check for the API.
+
+Imports app.py in fresh interpreters and reports the import time, the peak
+RSS after import and where the time goes (from `python -X importtime`),
+grouped by top-level package. Exits non-zero when the best import time or the
+RSS exceeds its budget, or when one of the heavy dependencies that should only
+load on first use (LangChain, Chroma, the Gemini client, the PDF loader,
+sentence-transformers) is imported at startup.
+
+    python startup_check.py
+    python startup_check.py --runs 5 --budget-ms 600 --rss-budget-mb 80
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+STARTUP_IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "800"))
+STARTUP_RSS_BUDGET_MB = float(os.getenv("STARTUP_RSS_BUDGET_MB", "100"))
+
+# Packages that must stay out of the cold import path
+LAZY_PACKAGES = [
+    "langchain",
+    "langchain_community",
+    "langchain_core",
+    "langchain_google_genai",
+    "chromadb",
+    "pypdf",
+    "sentence_transformers",
+    "torch",
+    "huggingface_hub",
+]
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": sorted(sys.modules),
+}}))
+"""
+
+
+def probe(module, importtime=False):
+    """Import a module in a fresh interpreter; returns (stats, importtime stderr)"""
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", PROBE.format(module=module)]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(stderr):
+    """(module, self_us, cumulative_us) rows from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def report(module="app", runs=3, budget_ms=STARTUP_IMPORT_BUDGET_MS, rss_budget_mb=STARTUP_RSS_BUDGET_MB, top=15):
+    """Print the startup report; returns a list of budget violations"""
+    probe(module)  # populate the bytecode cache so every measured run is comparable
+    samples = [probe(module)[0] for _ in range(runs)]
+    best = min(sample["import_ms"] for sample in samples)
+    rss = max(sample["rss_mb"] for sample in samples)
+
+    _, stderr = probe(module, importtime=True)
+    rows = parse_importtime(stderr)
+    by_package = {}
+    for name, self_us, _ in rows:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+
+    print(f"Cold import of {module}: best {best:.0f} ms over {runs} runs "
+          f"(budget {budget_ms:.0f} ms), peak RSS {rss:.0f} MB (budget {rss_budget_mb:.0f} MB)\n")
+    print("Import time by top-level package:")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+    print("\nSlowest modules (cumulative):")
+    for name, _, cumulative_us in sorted(rows, key=lambda row: -row[2])[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    violations = []
+    if best > budget_ms:
+        violations.append(f"import time {best:.0f} ms exceeds the {budget_ms:.0f} ms budget")
+    if rss > rss_budget_mb:
+        violations.append(f"RSS {rss:.0f} MB exceeds the {rss_budget_mb:.0f} MB budget")
+    loaded = {name.split(".")[0] for name in samples[0]["modules"]}
+    for package in LAZY_PACKAGES:
+        if package in loaded:
+            violations.append(f"{package} is imported at startup; import it where it is first used")
+    return violations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the API's cold import time and memory against a budget")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_IMPORT_BUDGET_MS)
+    parser.add_argument("--rss-budget-mb", type=float, default=STARTUP_RSS_BUDGET_MB)
+    args = parser.parse_args()
+
+    problems = report(args.module, args.runs, args.budget_ms, args.rss_budget_mb)
+    if problems:
+        print("\nFAILED:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print("\nOK: within the startup budget")
@@ -0,0 +1,162 @@
+"""Local stand-in for the Gemini API and the embedding endpoint, for load tests.
+
+Serves the Gemini REST routes the app uses (generateContent and
+streamGenerateContent) with configurable latency distributions, streamed
+chunks and injected errors, plus a deterministic feature-extraction endpoint
+so retrieval works without calling Hugging Face. Point the app at it with:
+
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8765 EMBEDDINGS_URL=http://127.0.0.1:8765/embed
+
+    python stub_llm.py --latency lognormal --latency-ms 800 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import zlib
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_DISTRIBUTIONS = ["fixed", "uniform", "normal", "lognormal", "exponential"]
+EMBEDDING_DIM = 384
+
+CANNED_ANSWER = (
+    "Here are a few options that could help you. Many government schemes support women entrepreneurs "
+    "with low-interest loans, training and mentorship. You can also look at part-time and remote roles "
+    "that match your skills, and community events where you can meet mentors. Start with one small step "
+    "this week, such as updating your resume or registering on a scheme portal."
+)
+
+ERROR_STATUSES = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+
+def sample_latency(distribution, latency_ms, spread):
+    """Sample one latency in seconds; latency_ms is the median (mean for exponential)"""
+    if distribution == "fixed":
+        value = latency_ms
+    elif distribution == "uniform":
+        value = random.uniform(latency_ms * (1 - spread), latency_ms * (1 + spread))
+    elif distribution == "normal":
+        value = random.gauss(latency_ms, latency_ms * spread)
+    elif distribution == "lognormal":
+        value = latency_ms * random.lognormvariate(0, spread)
+    else:
+        value = random.expovariate(1 / latency_ms) if latency_ms else 0
+    return max(0.0, value) / 1000
+
+
+def hashed_embedding(text):
+    """Deterministic bag-of-words vector, so similar texts get similar embeddings"""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for word in re.findall(r"\w+", text.lower()):
+        vector[zlib.crc32(word.encode("utf-8")) % EMBEDDING_DIM] += 1.0
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
+
+
+def create_stub_app(latency="lognormal", latency_ms=800.0, spread=0.5, error_rate=0.0,
+                    error_codes=(429, 500), stream_chunks=5, answer=CANNED_ANSWER, embed_latency_ms=20.0):
+    app = FastAPI(title="Gemini stub")
+    stats = {"requests": 0, "errors": 0, "embeddings": 0}
+
+    def completion(text, prompt_tokens):
+        return {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": prompt_tokens + len(text) // 4,
+            },
+        }
+
+    def maybe_error():
+        if error_rate and random.random() < error_rate:
+            code = random.choice(list(error_codes))
+            stats["errors"] += 1
+            return JSONResponse(
+                status_code=code,
+                content={"error": {"code": code, "message": "Injected by stub_llm", "status": ERROR_STATUSES.get(code, "UNKNOWN")}},
+            )
+        return None
+
+    @app.post("/v1beta/models/{model_action}")
+    async def generate(model_action: str, request: Request):
+        stats["requests"] += 1
+        body = await request.json()
+        prompt_tokens = len(json.dumps(body.get("contents", []))) // 4
+        delay = sample_latency(latency, latency_ms, spread)
+
+        error = maybe_error()
+        if error is not None:
+            await asyncio.sleep(delay / 4)
+            return error
+
+        if model_action.endswith(":streamGenerateContent"):
+            words = answer.split(" ")
+            size = max(1, -(-len(words) // stream_chunks))
+            parts = [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+
+            async def chunks():
+                # Time to first chunk is a third of the sampled latency, the rest is spread over the chunks
+                await asyncio.sleep(delay / 3)
+                yield "["
+                for i, part in enumerate(parts):
+                    if i:
+                        await asyncio.sleep(delay * 2 / 3 / len(parts))
+                        yield ",\n"
+                    yield json.dumps(completion(part, prompt_tokens))
+                yield "]"
+
+            return StreamingResponse(chunks(), media_type="application/json")
+
+        await asyncio.sleep(delay)
+        return completion(answer, prompt_tokens)
+
+    @app.post("/embed")
+    async def embed(request: Request):
+        stats["embeddings"] += 1
+        body = await request.json()
+        inputs = body.get("inputs", [])
+        await asyncio.sleep(embed_latency_ms / 1000)
+        if isinstance(inputs, str):
+            return hashed_embedding(inputs)
+        return [hashed_embedding(text) for text in inputs]
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local Gemini and embedding stand-in for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median latency (mean for exponential)")
+    parser.add_argument("--spread", type=float, default=0.5, help="Relative spread (sigma for lognormal)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of LLM calls that fail")
+    parser.add_argument("--error-codes", default="429,500", help="Comma-separated HTTP statuses for failures")
+    parser.add_argument("--stream-chunks", type=int, default=5)
+    parser.add_argument("--embed-latency-ms", type=float, default=20.0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = parse_args()
+    stub = create_stub_app(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        spread=args.spread,
+        error_rate=args.error_rate,
+        error_codes=[int(code) for code in args.error_codes.split(",") if code],
+        stream_chunks=args.stream_chunks,
+        embed_latency_ms=args.embed_latency_ms,
+    )
+    uvicorn.run(stub, host=args.host, port=args.port, log_level="warning")
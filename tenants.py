@@ -0,0 +1,218 @@
+"""Tenant-namespaced corpora and indexes.
+
+Each partner organization (tenant) has its own data directory,
+tenants/<tenant id>/, laid out like the main corpus: the listing and scheme
+JSON files and any .txt files at the top level, PDFs anywhere below it. Its
+index versions live under chroma_db/tenants/<tenant id>/. Requests without a
+tenant id use the default tenant: the main corpus and index, as before.
+
+A tenant's index is opened on its first request, and built first if its
+files changed since the last build. Open indexes are kept in an LRU cache
+whose total size is held under TENANT_MEMORY_CAP_MB: loading a tenant evicts
+the least recently used tenants that no request is currently using. A
+tenant's size is the size of its index version on disk, which is what Chroma
+maps into memory when it opens the index.
+
+    python tenants.py    # list tenants and their index versions
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import index_store
+
+logger = logging.getLogger("asha_chatbot")
+
+TENANTS_DIR = os.getenv("TENANTS_DIR", "tenants")
+TENANT_MEMORY_CAP_MB = float(os.getenv("TENANT_MEMORY_CAP_MB", "512"))
+DEFAULT_TENANT = "default"
+
+MB = 1024 * 1024
+
+TENANT_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+
+class UnknownTenant(KeyError):
+    pass
+
+
+def tenant_data_dir(tenant_id):
+    """Directory holding a tenant's data files ("." for the default tenant)"""
+    return "." if tenant_id == DEFAULT_TENANT else os.path.join(TENANTS_DIR, tenant_id)
+
+
+def tenant_index_root(tenant_id):
+    """Directory holding a tenant's index versions"""
+    if tenant_id == DEFAULT_TENANT:
+        return index_store.INDEX_ROOT
+    return os.path.join(index_store.INDEX_ROOT, "tenants", tenant_id)
+
+
+def list_tenants():
+    """Ids of the tenants with a data directory, not including the default tenant"""
+    if not os.path.isdir(TENANTS_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(TENANTS_DIR)
+        if TENANT_ID.match(name) and os.path.isdir(os.path.join(TENANTS_DIR, name))
+    )
+
+
+def resolve_tenant(tenant_id):
+    """Normalize a request's tenant id; raises UnknownTenant if there is no such tenant"""
+    if not tenant_id or tenant_id == DEFAULT_TENANT:
+        return DEFAULT_TENANT
+    if not TENANT_ID.match(tenant_id) or not os.path.isdir(tenant_data_dir(tenant_id)):
+        raise UnknownTenant(f"Unknown tenant: {tenant_id}")
+    return tenant_id
+
+
+def directory_size(path):
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(directory, name))
+            except OSError:
+                pass
+    return total
+
+
+class TenantIndexCache:
+    """LRU cache of open tenant indexes, held under a memory cap.
+
+    load_fn(tenant_id) opens (building if needed) a tenant's index and returns
+    (index, version); close_fn(index) releases it on eviction.
+    """
+
+    def __init__(self, load_fn, close_fn, memory_cap_mb=TENANT_MEMORY_CAP_MB):
+        self.load_fn = load_fn
+        self.close_fn = close_fn
+        self.memory_cap = int(memory_cap_mb * MB)
+        self.entries = OrderedDict()  # tenant id -> {"index", "version", "size", "in_use"}, least recently used first
+        self.lock = threading.Lock()
+        self.load_locks = {}
+        self.metrics = {}
+
+    def _metrics(self, tenant_id):
+        return self.metrics.setdefault(tenant_id, {
+            "requests": 0, "hits": 0, "loads": 0, "evictions": 0, "load_ms": None, "last_used": None,
+        })
+
+    def _resident_bytes(self):
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def _evict(self, keep):
+        """Close least recently used indexes that are not in use until the total fits the cap"""
+        evicted = []
+        with self.lock:
+            for tenant_id in list(self.entries):
+                if self._resident_bytes() <= self.memory_cap:
+                    break
+                entry = self.entries[tenant_id]
+                if tenant_id == keep or entry["in_use"]:
+                    continue
+                del self.entries[tenant_id]
+                self._metrics(tenant_id)["evictions"] += 1
+                evicted.append((tenant_id, entry))
+            over_cap = self._resident_bytes() > self.memory_cap
+        for tenant_id, entry in evicted:
+            try:
+                self.close_fn(entry["index"])
+            except Exception as e:
+                logger.error(f"Error closing index of tenant {tenant_id}: {e}")
+            logger.info(f"Evicted tenant {tenant_id} ({entry['size'] / MB:.1f} MB)")
+        if over_cap:
+            logger.warning(f"Tenant indexes use {self._resident_bytes() / MB:.1f} MB, above the "
+                           f"{self.memory_cap / MB:.0f} MB cap; the rest are in use")
+
+    def _acquire(self, tenant_id):
+        with self.lock:
+            metrics = self._metrics(tenant_id)
+            metrics["requests"] += 1
+            metrics["last_used"] = time.time()
+            entry = self.entries.get(tenant_id)
+            if entry is not None:
+                metrics["hits"] += 1
+                entry["in_use"] += 1
+                self.entries.move_to_end(tenant_id)
+                return entry["index"]
+            load_lock = self.load_locks.setdefault(tenant_id, threading.Lock())
+
+        # Only one request loads a tenant; the others wait for it and then share the index
+        with load_lock:
+            with self.lock:
+                entry = self.entries.get(tenant_id)
+                if entry is not None:
+                    entry["in_use"] += 1
+                    self.entries.move_to_end(tenant_id)
+                    return entry["index"]
+            started = time.perf_counter()
+            index, version = self.load_fn(tenant_id)
+            size = directory_size(index_store.version_path(version, tenant_index_root(tenant_id)))
+            load_ms = (time.perf_counter() - started) * 1000
+            with self.lock:
+                self.entries[tenant_id] = {"index": index, "version": version, "size": size, "in_use": 1}
+                metrics = self._metrics(tenant_id)
+                metrics["loads"] += 1
+                metrics["load_ms"] = round(load_ms, 1)
+            logger.info(f"Loaded index {version} of tenant {tenant_id} ({size / MB:.1f} MB) in {load_ms:.0f} ms")
+        self._evict(keep=tenant_id)
+        return index
+
+    def _release(self, tenant_id):
+        with self.lock:
+            entry = self.entries.get(tenant_id)
+            if entry is not None:
+                entry["in_use"] -= 1
+
+    @contextmanager
+    def use(self, tenant_id):
+        """The tenant's index, loaded if needed; it is not evicted until the block exits"""
+        index = self._acquire(tenant_id)
+        try:
+            yield index
+        finally:
+            self._release(tenant_id)
+
+    def evict(self, tenant_id):
+        """Drop a tenant's index so its next request loads it again"""
+        with self.lock:
+            entry = self.entries.get(tenant_id)
+            if entry is None or entry["in_use"]:
+                return False
+            del self.entries[tenant_id]
+            self._metrics(tenant_id)["evictions"] += 1
+        self.close_fn(entry["index"])
+        return True
+
+    def snapshot(self):
+        with self.lock:
+            tenants = {}
+            for tenant_id, metrics in self.metrics.items():
+                entry = self.entries.get(tenant_id)
+                tenants[tenant_id] = {
+                    **metrics,
+                    "hit_rate": round(metrics["hits"] / metrics["requests"], 3) if metrics["requests"] else None,
+                    "resident": entry is not None,
+                    "version": entry["version"] if entry else None,
+                    "size_mb": round(entry["size"] / MB, 2) if entry else 0.0,
+                }
+            return {
+                "memory_cap_mb": round(self.memory_cap / MB, 1),
+                "resident_mb": round(self._resident_bytes() / MB, 2),
+                "resident": list(self.entries),
+                "tenants": tenants,
+            }
+
+
+if __name__ == "__main__":
+    for tenant_id in [DEFAULT_TENANT] + list_tenants():
+        root = tenant_index_root(tenant_id)
+        live = index_store.current_version(root)
+        size = directory_size(index_store.version_path(live, root)) / MB if live else 0.0
+        print(f"{tenant_id:20} {tenant_data_dir(tenant_id):30} index {live or '-'} ({size:.1f} MB)")
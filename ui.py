@@ -4,7 +4,6 @@ import json
 import os
 from datetime import datetime
 import pandas as pd
-import time
 
 # Page configuration
 st.set_page_config(
@@ -102,7 +101,7 @@ if "current_tab" not in st.session_state:
     st.session_state.current_tab = "chat"
     
 if "context_type" not in st.session_state:
-    st.session_state.context_type = "all"
+    st.session_state.context_type = "auto"
 
 # Helper functions - define these first to avoid undefined errors
 def send_feedback(conversation_id, message_id, feedback_type, details=None):
@@ -146,8 +145,11 @@ def process_query(query):
     payload = {
         "query": query,
         "chat_history": st.session_state.chat_history,
-        "context_type": st.session_state.context_type
+        "context_type": st.session_state.context_type,
+        "conversation_id": st.session_state.conversation_id
     }
+    # The job, event or program the user clicked "Ask Asha" on, if any
+    payload.update(st.session_state.pop("entity", None) or {})
     
     try:
         # Show a spinner while waiting for response
@@ -156,25 +158,23 @@ def process_query(query):
             response = requests.post("http://localhost:8000/", json=payload)
             response_data = response.json()
             
-            # Check for biased content warning
-            if response_data.get("is_biased", False):
-                st.warning(response_data["response"])
-            else:
-                # Update conversation state
-                st.session_state.conversation_id = response_data.get("conversation_id")
-                message_id = response_data.get("message_id")
-                
-                # Add bot response to chat history with message_id for feedback
-                bot_message = {
-                    "role": "assistant", 
-                    "content": response_data["response"],
-                    "message_id": message_id
-                }
-                st.session_state.chat_history.append(bot_message)
-                
-                # Store message_id for feedback
-                if message_id:
-                    st.session_state.message_ids[message_id] = len(st.session_state.chat_history) - 1
+            # Update conversation state
+            st.session_state.conversation_id = response_data.get("conversation_id")
+            message_id = response_data.get("message_id")
+            
+            # Add bot response to chat history with message_id for feedback;
+            # replies to biased or unsafe content are shown as a warning
+            bot_message = {
+                "role": "assistant", 
+                "content": response_data["response"],
+                "message_id": message_id,
+                "is_biased": response_data.get("is_biased", False)
+            }
+            st.session_state.chat_history.append(bot_message)
+            
+            # Store message_id for feedback
+            if message_id:
+                st.session_state.message_ids[message_id] = len(st.session_state.chat_history) - 1
         
         # Force the UI to refresh and show the new messages
         st.rerun()
@@ -191,167 +191,88 @@ def process_query(query):
 def set_job_query(job):
     """Set query about a specific job"""
     st.session_state.query = f"Tell me more about the {job['title']} position at {job['company']} and help me prepare to apply"
+    st.session_state.entity = {"job_id": job["id"]}
     st.session_state.current_tab = "chat"
     st.rerun()
 
 def set_event_query(event):
     """Set query about a specific event"""
     st.session_state.query = f"Tell me more about the '{event['title']}' event on {event['date']} and what I can gain from it"
+    st.session_state.entity = {"event_id": event["id"]}
     st.session_state.current_tab = "chat"
     st.rerun()
 
 def set_mentorship_query(program):
     """Set query about a specific mentorship program"""
     st.session_state.query = f"Tell me how to prepare for applying to the '{program['title']}' mentorship program by {program['organization']}"
+    st.session_state.entity = {"program_id": program["id"]}
     st.session_state.current_tab = "chat"
     st.rerun()
 
-def fetch_jobs_for_ui():
-    """Fetch job listings for UI display"""
+def load_suggested_questions():
+    """Load the suggested question sections shared with the backend"""
     try:
-        job_listings_file = "job_listings.json"
-        
-        if not os.path.exists(job_listings_file):
-            # Create sample data
-            sample_jobs = [
-                {
-                    "id": "job1",
-                    "title": "Software Developer",
-                    "company": "TechWomen Inc.",
-                    "location": "Bangalore, Remote",
-                    "description": "Entry-level software development position with flexible hours, ideal for women returning to work.",
-                    "requirements": "Basic programming skills, willingness to learn",
-                    "salary": "₹5,00,000 - ₹8,00,000 per annum",
-                    "apply_link": "https://example.com/apply/job1",
-                    "posted_date": "2025-04-10",
-                    "women_friendly_benefits": ["Remote work options", "Flexible hours", "Maternity benefits"]
-                },
-                {
-                    "id": "job2",
-                    "title": "Content Writer",
-                    "company": "CreativeMinds",
-                    "location": "Delhi, Hybrid",
-                    "description": "Content creation role with part-time options available.",
-                    "requirements": "Good writing skills, creativity",
-                    "salary": "₹4,00,000 - ₹6,00,000 per annum",
-                    "apply_link": "https://example.com/apply/job2",
-                    "posted_date": "2025-04-15",
-                    "women_friendly_benefits": ["Part-time options", "Work from home days"]
-                }
-            ]
-            
-            with open(job_listings_file, "w", encoding="utf-8") as f:
-                json.dump(sample_jobs, f, indent=2)
-            
-            return sample_jobs
-        
-        # Read job listings
-        with open(job_listings_file, "r", encoding="utf-8") as f:
-            all_jobs = json.load(f)
-        
-        return all_jobs
-        
+        with open("suggested_questions.json", "r", encoding="utf-8") as f:
+            return json.load(f)["sections"]
     except Exception as e:
-        st.error(f"Error fetching job listings: {e}")
+        st.error(f"Error loading suggested questions: {e}")
         return []
 
-def fetch_events_for_ui():
-    """Fetch events for UI display"""
-    try:
-        events_file = "community_events.json"
-        
-        if not os.path.exists(events_file):
-            # Create sample data
-            sample_events = [
-                {
-                    "id": "event1",
-                    "title": "Women in Tech Conference",
-                    "organizer": "TechWomen Association",
-                    "location": "Bangalore",
-                    "online": True,
-                    "date": "2025-05-15",
-                    "time": "10:00 AM - 4:00 PM",
-                    "description": "Conference focusing on career opportunities for women in technology",
-                    "registration_link": "https://example.com/register/event1",
-                    "is_free": True
-                },
-                {
-                    "id": "event2",
-                    "title": "Resume Building Workshop",
-                    "organizer": "Career Forward",
-                    "location": "Delhi",
-                    "online": False,
-                    "date": "2025-05-20",
-                    "time": "2:00 PM - 5:00 PM",
-                    "description": "Learn how to create an impactful resume that stands out to employers",
-                    "registration_link": "https://example.com/register/event2",
-                    "is_free": True
-                }
-            ]
-            
-            with open(events_file, "w", encoding="utf-8") as f:
-                json.dump(sample_events, f, indent=2)
-            
-            return sample_events
-        
-        # Read events
-        with open(events_file, "r", encoding="utf-8") as f:
-            all_events = json.load(f)
-        
-        return all_events
-        
-    except Exception as e:
-        st.error(f"Error fetching events: {e}")
-        return []
+API_URL = os.getenv("ASHA_API_URL", "http://localhost:8000")
+PAGE_SIZE = 10
+MAX_CACHED_PAGES = 256
 
-def fetch_mentorship_for_ui():
-    """Fetch mentorship programs for UI display"""
-    try:
-        mentorship_file = "mentorship_programs.json"
-        
-        if not os.path.exists(mentorship_file):
-            # Create sample data
-            sample_mentorships = [
-                {
-                    "id": "mentor1",
-                    "title": "Tech Career Mentorship",
-                    "organization": "Women in Tech India",
-                    "duration": "3 months",
-                    "format": "Online, 1 hour per week",
-                    "description": "One-on-one mentorship for women entering the technology field",
-                    "mentor_expertise": ["Software Development", "Product Management", "Data Science"],
-                    "application_deadline": "2025-05-30",
-                    "application_link": "https://example.com/apply/mentor1"
-                },
-                {
-                    "id": "mentor2",
-                    "title": "Women Entrepreneurs Mentorship",
-                    "organization": "StartUp India Women's Wing",
-                    "duration": "6 months",
-                    "format": "Hybrid (online and in-person), 2 hours per week",
-                    "description": "Guidance for women starting their own businesses",
-                    "mentor_expertise": ["Business Planning", "Marketing", "Finance", "Operations"],
-                    "application_deadline": "2025-06-15",
-                    "application_link": "https://example.com/apply/mentor2"
-                }
-            ]
-            
-            with open(mentorship_file, "w", encoding="utf-8") as f:
-                json.dump(sample_mentorships, f, indent=2)
-            
-            return sample_mentorships
-        
-        # Read mentorship programs
-        with open(mentorship_file, "r", encoding="utf-8") as f:
-            all_mentorships = json.load(f)
-        
-        return all_mentorships
-        
-    except Exception as e:
-        st.error(f"Error fetching mentorship programs: {e}")
-        return []
-    
-    
+@st.cache_resource
+def listing_page_cache():
+    """Listing pages and their ETags, shared across reruns"""
+    return {}
+
+def fetch_listing(endpoint, params):
+    """Fetch one page of a listing from the backend.
+
+    Sends the ETag of the cached copy so an unchanged page costs a 304 instead
+    of a full transfer.
+    """
+    params = {name: value for name, value in params.items() if value not in (None, "")}
+    key = (endpoint, tuple(sorted(params.items())))
+    cache = listing_page_cache()
+    cached = cache.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+
+    response = requests.get(f"{API_URL}/{endpoint}", params=params, headers=headers, timeout=10)
+    if response.status_code == 304 and cached:
+        return cached[1]
+    response.raise_for_status()
+    data = response.json()
+
+    cache[key] = (response.headers.get("ETag"), data)
+    while len(cache) > MAX_CACHED_PAGES:
+        cache.pop(next(iter(cache)))
+    return data
+
+def fetch_page(key, endpoint, filters):
+    """Fetch the current page of a listing tab, starting over when its filters change"""
+    pager = st.session_state.setdefault(f"{key}_pager", {"filters": None, "cursors": [None]})
+    if pager["filters"] != filters:
+        pager["filters"] = filters
+        pager["cursors"] = [None]
+    return fetch_listing(endpoint, {**filters, "cursor": pager["cursors"][-1], "limit": PAGE_SIZE})
+
+def page_controls(key, data):
+    """Render previous/next buttons for a cursor-paginated listing"""
+    pager = st.session_state[f"{key}_pager"]
+    page_number = len(pager["cursors"])
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if page_number > 1 and st.button("⬅ Previous", key=f"{key}_previous"):
+            pager["cursors"].pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Page {page_number} · {data['total']} matching")
+    with col3:
+        if data.get("next_cursor") and st.button("Next ➡", key=f"{key}_next"):
+            pager["cursors"].append(data["next_cursor"])
+            st.rerun()
 
 # Header
 st.markdown("<h1 class='main-header'>👩‍💼 Asha AI Chatbot</h1>", unsafe_allow_html=True)
@@ -371,6 +292,7 @@ with tabs[0]:
         
         st.subheader("Filter Responses By")
         context_options = {
+            "auto": "Automatic (detect from question)",
             "all": "All Information",
             "jobs": "Job Listings",
             "events": "Community Events",
@@ -393,50 +315,14 @@ with tabs[0]:
         # Suggested questions based on categories
         st.subheader("Suggested Questions")
         
-        # Career Development Questions
-        st.markdown("##### 🚀 Career Development")
-        career_questions = [
-            "What career paths have good growth opportunities for women?",
-            "How can I build a career in technology with no prior experience?",
-            "What skills should I develop to advance in my career?",
-            "How can I balance my career with family responsibilities?",
-            "What certifications will help me in a digital marketing career?"
-        ]
-        
-        for question in career_questions:
-            if st.button(question, key=f"career_{question}"):
-                st.session_state.query = question
-                st.rerun()
-        
-        # Job Search Questions
-        st.markdown("##### 💼 Job Opportunities")
-        job_questions = [
-            "What job opportunities are available for women returning to work?",
-            "Are there any remote job opportunities available?",
-            "How can I prepare for a job interview?",
-            "What women-friendly companies are hiring now?",
-            "What should I include in my resume to stand out?"
-        ]
-        
-        for question in job_questions:
-            if st.button(question, key=f"job_{question}"):
-                st.session_state.query = question
-                st.rerun()
-        
-        # Events & Programs Questions
-        st.markdown("##### 📣 Events & Mentorship")
-        event_questions = [
-            "Are there any upcoming workshops for women in tech?",
-            "How can I find a mentor in my field?",
-            "Tell me about upcoming career development sessions",
-            "What networking events are happening soon?",
-            "How can I register for mentorship programs?"
-        ]
-        
-        for question in event_questions:
-            if st.button(question, key=f"event_{question}"):
-                st.session_state.query = question
-                st.rerun()
+        # Same questions the backend pre-generates answers for
+        for section in load_suggested_questions():
+            st.markdown(f"##### {section['title']}")
+            for question in section["questions"]:
+                if st.button(question, key=f"{section['key']}_{question}"):
+                    st.session_state.query = question
+                    st.session_state.pop("entity", None)
+                    st.rerun()
     
      # Input field for user query
    
@@ -455,6 +341,8 @@ with tabs[0]:
         for message in st.session_state.chat_history:
             if message["role"] == "user":
                 st.markdown(f"<div class='user-message'><b>You:</b> {message['content']}</div>", unsafe_allow_html=True)
+            elif message.get("is_biased"):
+                st.markdown(f"<div class='biased-warning'><b>Asha:</b> {message['content']}</div>", unsafe_allow_html=True)
             else:
                 st.markdown(f"<div class='bot-message'><b>Asha:</b> {message['content']}</div>", unsafe_allow_html=True)
                 
@@ -507,6 +395,8 @@ with tabs[1]:
             "Location:",
             ["All Locations", "Remote", "Bangalore", "Delhi", "Mumbai", "Hyderabad", "Chennai", "Other"]
         )
+        if job_location == "Other":
+            other_location = st.text_input("City:", placeholder="e.g. Pune")
     
     with col3:
         job_type = st.selectbox(
@@ -516,18 +406,20 @@ with tabs[1]:
     
     # Fetch and display jobs
     try:
-        if job_search or job_location != "All Locations" or job_type != "All Types":
-            # This would be an API call in a real implementation
-            # For now, we'll use sample data
-            st.info("Filtering jobs based on your criteria...")
-            time.sleep(1)  # Simulate API call
-        
-        # Display job listings in card format
-        job_data = fetch_jobs_for_ui()
+        filters = {
+            "q": job_search,
+            "work_mode": "remote" if job_location == "Remote" else None,
+            "location": (other_location.strip().lower() or None) if job_location == "Other"
+                        else job_location.lower() if job_location not in ("All Locations", "Remote") else None,
+            "job_type": job_type.lower() if job_type != "All Types" else None
+        }
+        jobs_page = fetch_page("jobs", "jobs", filters)
+        job_data = jobs_page["items"]
         
         if not job_data:
             st.warning("No job listings found. Please try different search criteria.")
         else:
+            # Display job listings in card format
             for job in job_data:
                 with st.container():
                     st.markdown(f"""
@@ -548,6 +440,7 @@ with tabs[1]:
                     with col2:
                         if st.button("Ask Asha about this job", key=f"ask_{job['id']}"):
                             set_job_query(job)
+            page_controls("jobs", jobs_page)
     except Exception as e:
         st.error(f"Error loading job listings: {e}")
 
@@ -572,11 +465,17 @@ with tabs[2]:
     
     # Timeline view toggle
     show_timeline = st.toggle("Show Timeline View", value=False)
+    free_only = st.checkbox("Free events only", key="events_free_only")
     
     # Fetch and display events
     try:
-        # This would be an API call in a real implementation
-        event_data = fetch_events_for_ui()
+        filters = {
+            "q": event_search,
+            "event_type": event_type.lower() if event_type != "All Events" else None,
+            "is_free": "true" if free_only else None
+        }
+        events_page = fetch_page("events", "events", filters)
+        event_data = events_page["items"]
         
         if not event_data:
             st.warning("No upcoming events found.")
@@ -620,6 +519,7 @@ with tabs[2]:
                         with col2:
                             if st.button("Ask Asha about this event", key=f"ask_event_{event['id']}"):
                                 set_event_query(event)
+            page_controls("events", events_page)
     except Exception as e:
         st.error(f"Error loading events: {e}")
 
@@ -642,9 +542,17 @@ with tabs[3]:
             ["Any Duration", "1-3 months", "3-6 months", "6+ months"]
         )
     
+    open_only = st.checkbox("Only programs still accepting applications", key="mentorship_open_only")
+    
     # Fetch and display mentorship programs
     try:
-        mentorship_data = fetch_mentorship_for_ui()
+        filters = {
+            "q": mentorship_search,
+            "duration": duration_filter if duration_filter != "Any Duration" else None,
+            "deadline_from": datetime.now().strftime("%Y-%m-%d") if open_only else None
+        }
+        mentorship_page = fetch_page("mentorship", "mentorship", filters)
+        mentorship_data = mentorship_page["items"]
         
         if not mentorship_data:
             st.warning("No mentorship programs found.")
@@ -668,6 +576,7 @@ with tabs[3]:
                     with col2:
                         if st.button("Ask Asha about this program", key=f"ask_mentor_{program['id']}"):
                             set_mentorship_query(program)
+            page_controls("mentorship", mentorship_page)
     except Exception as e:
         st.error(f"Error loading mentorship programs: {e}")
 
@@ -725,13 +634,3 @@ st.markdown("---")
 footer_col1, footer_col2, footer_col3 = st.columns([2, 1, 2])
 with footer_col2:
     st.markdown("<p style='text-align: center;'>Powered by JobsForHer Foundation</p>", unsafe_allow_html=True)
-
-# Create needed files at startup
-if not os.path.exists("job_listings.json"):
-    fetch_jobs_for_ui()
-
-if not os.path.exists("community_events.json"):
-    fetch_events_for_ui()
-
-if not os.path.exists("mentorship_programs.json"):
-    fetch_mentorship_for_ui()
\ No newline at end of file
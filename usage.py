@@ -0,0 +1,117 @@
+"""Per-request token and cost accounting.
+
+Each LLM call is broken down into the tokens spent on the system prompt, the
+conversation history (including the rolling summary), the retrieved context,
+the user's question and the completion, plus the time spent in each stage
+and an estimated cost. Token counts use the same ~4 characters per token
+estimate as retrieval, since Gemini's tokenizer is not available locally.
+
+UsageTracker keeps running totals by context_type, by route (the router's
+intent) and by tenant so the largest share of the prompt is easy to spot. It
+also counts degraded responses: answers built without the LLM because it
+missed its deadline or failed.
+"""
+import os
+import threading
+
+from rerank import estimate_tokens
+
+# USD per million tokens (gemini-2.0-flash list prices by default)
+LLM_INPUT_PRICE_PER_1M = float(os.getenv("LLM_INPUT_PRICE_PER_1M", "0.10"))
+LLM_OUTPUT_PRICE_PER_1M = float(os.getenv("LLM_OUTPUT_PRICE_PER_1M", "0.40"))
+
+TOKEN_FIELDS = ["system", "history", "context", "query", "completion"]
+
+
+def prompt_tokens(messages, context=None):
+    """Split the prompt's tokens into system, history, context and query"""
+    tokens = {"system": 0, "history": 0, "context": 0, "query": 0}
+    if not messages:
+        return tokens
+    tokens["system"] = estimate_tokens(messages[0]["content"])
+    # Everything between the system prompt and the final user message is history (or its summary)
+    for message in messages[1:-1]:
+        tokens["history"] += estimate_tokens(message["content"])
+    final = messages[-1]["content"]
+    context_tokens = estimate_tokens(context) if context and context in final else 0
+    tokens["context"] = context_tokens
+    tokens["query"] = max(0, estimate_tokens(final) - context_tokens)
+    return tokens
+
+
+def estimate_cost(tokens):
+    """Estimated USD cost of one call"""
+    prompt = sum(tokens.get(field, 0) for field in TOKEN_FIELDS if field != "completion")
+    return (prompt * LLM_INPUT_PRICE_PER_1M + tokens.get("completion", 0) * LLM_OUTPUT_PRICE_PER_1M) / 1_000_000
+
+
+def build_usage(messages=None, context=None, completion="", timings=None):
+    """Usage record for one request: token breakdown, stage timings (ms) and cost"""
+    tokens = prompt_tokens(messages, context)
+    tokens["completion"] = estimate_tokens(completion) if messages else 0
+    tokens["prompt_total"] = sum(tokens[field] for field in TOKEN_FIELDS if field != "completion")
+    return {
+        "tokens": tokens,
+        "timings_ms": {stage: round(ms, 1) for stage, ms in (timings or {}).items()},
+        "cost_usd": round(estimate_cost(tokens), 8),
+    }
+
+
+class UsageTracker:
+    """Thread-safe running totals of usage records, grouped by context_type, by route and by tenant"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.groups = {"context_type": {}, "route": {}, "tenant": {}}
+        self.total = self._empty()
+
+    @staticmethod
+    def _empty():
+        return {"requests": 0, "degraded": 0, "tokens": {field: 0 for field in TOKEN_FIELDS}, "timings_ms": {}, "cost_usd": 0.0}
+
+    @staticmethod
+    def _add(bucket, usage):
+        bucket["requests"] += 1
+        bucket["degraded"] += bool(usage.get("degraded"))
+        for field in TOKEN_FIELDS:
+            bucket["tokens"][field] += usage["tokens"].get(field, 0)
+        for stage, ms in usage["timings_ms"].items():
+            bucket["timings_ms"][stage] = bucket["timings_ms"].get(stage, 0.0) + ms
+        bucket["cost_usd"] += usage["cost_usd"]
+
+    def record(self, usage, context_type, route, tenant="default"):
+        with self.lock:
+            self._add(self.total, usage)
+            self._add(self.groups["context_type"].setdefault(context_type or "unknown", self._empty()), usage)
+            self._add(self.groups["route"].setdefault(route or "unknown", self._empty()), usage)
+            self._add(self.groups["tenant"].setdefault(tenant, self._empty()), usage)
+
+    @staticmethod
+    def _summary(bucket):
+        requests = bucket["requests"] or 1
+        prompt = sum(bucket["tokens"][field] for field in TOKEN_FIELDS if field != "completion")
+        return {
+            "requests": bucket["requests"],
+            "degraded": bucket["degraded"],
+            "degraded_rate": round(bucket["degraded"] / requests, 4),
+            "tokens": dict(bucket["tokens"]),
+            "avg_tokens": {field: round(count / requests, 1) for field, count in bucket["tokens"].items()},
+            # Which part of the prompt to shrink first
+            "prompt_share": {
+                field: round(bucket["tokens"][field] / prompt, 3) if prompt else 0.0
+                for field in TOKEN_FIELDS if field != "completion"
+            },
+            "avg_timings_ms": {stage: round(ms / requests, 1) for stage, ms in bucket["timings_ms"].items()},
+            "cost_usd": round(bucket["cost_usd"], 6),
+            "avg_cost_usd": round(bucket["cost_usd"] / requests, 8),
+        }
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "total": self._summary(self.total),
+                "by_context_type": {name: self._summary(bucket) for name, bucket in sorted(self.groups["context_type"].items())},
+                "by_route": {name: self._summary(bucket) for name, bucket in sorted(self.groups["route"].items())},
+                "by_tenant": {name: self._summary(bucket) for name, bucket in sorted(self.groups["tenant"].items())},
+                "prices_per_1m_tokens": {"input": LLM_INPUT_PRICE_PER_1M, "output": LLM_OUTPUT_PRICE_PER_1M},
+            }
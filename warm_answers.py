@@ -0,0 +1,127 @@
+"""Pre-generated answers for the canonical suggested questions.
+
+The questions listed in suggested_questions.json (the ones the UI sidebar
+offers) are answered ahead of time on a background thread and served
+instantly. The store checks the corpus fingerprint on a schedule and
+regenerates every answer whenever the corpus changes; old answers keep being
+served until their replacements are ready.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger("asha_chatbot")
+
+SUGGESTED_QUESTIONS_FILE = os.getenv("SUGGESTED_QUESTIONS_FILE", "suggested_questions.json")
+WARM_ANSWERS_ENABLED = os.getenv("WARM_ANSWERS_ENABLED", "1") == "1"
+WARM_REFRESH_INTERVAL = int(os.getenv("WARM_REFRESH_INTERVAL", "300"))
+
+
+def normalize_question(question):
+    """Normalize a question so trivial differences in case, spacing and punctuation still match"""
+    return re.sub(r"[^a-z0-9]+", " ", question.lower()).strip()
+
+
+def load_suggested_questions(path=SUGGESTED_QUESTIONS_FILE):
+    """Load the configured (question, context_type) pairs"""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    return [
+        (question, section.get("context_type", "auto"))
+        for section in config.get("sections", [])
+        for question in section.get("questions", [])
+    ]
+
+
+class WarmAnswerStore:
+    """Thread-safe store of pre-generated answers keyed by normalized question"""
+
+    def __init__(self, answer_fn, fingerprint_fn, questions_fn=load_suggested_questions,
+                 refresh_interval=WARM_REFRESH_INTERVAL):
+        # answer_fn(question, context_type) -> (response, resolved_context_type, intent)
+        self.answer_fn = answer_fn
+        self.fingerprint_fn = fingerprint_fn
+        self.questions_fn = questions_fn
+        self.refresh_interval = refresh_interval
+        self.answers = {}
+        self.lock = threading.Lock()
+        self.fingerprint = None
+        self.refreshing = threading.Lock()
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        self.thread = None
+
+    def get(self, question, context_type=None):
+        """Return the warm answer for a question, or None.
+
+        An explicitly requested context_type must match the one the answer was
+        generated for.
+        """
+        with self.lock:
+            entry = self.answers.get(normalize_question(question))
+        if entry is None:
+            return None
+        if context_type not in (None, "auto") and context_type != entry["context_type"]:
+            return None
+        return entry
+
+    def refresh(self):
+        """Regenerate all answers for the current corpus; skipped if a refresh is already running"""
+        if not self.refreshing.acquire(blocking=False):
+            return
+        try:
+            fingerprint = self.fingerprint_fn()
+            questions = self.questions_fn()
+            started = time.time()
+            generated = 0
+            for question, context_type in questions:
+                if self.stop_event.is_set():
+                    return
+                try:
+                    response, resolved_context_type, intent = self.answer_fn(question, context_type)
+                except Exception as e:
+                    logger.error(f"Error pre-generating answer for '{question}': {e}")
+                    continue
+                with self.lock:
+                    self.answers[normalize_question(question)] = {
+                        "response": response,
+                        "context_type": resolved_context_type,
+                        "intent": intent,
+                        "generated_at": time.time(),
+                        "fingerprint": fingerprint,
+                    }
+                generated += 1
+            self.fingerprint = fingerprint
+            logger.info(f"Pre-generated {generated} of {len(questions)} warm answers in {time.time() - started:.1f}s")
+        finally:
+            self.refreshing.release()
+
+    def invalidate(self):
+        """Mark the answers stale and wake the background thread, which regenerates them once"""
+        self.fingerprint = None
+        self.wake_event.set()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.wake_event.clear()
+            try:
+                if self.fingerprint_fn() != self.fingerprint:
+                    self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing warm answers: {e}")
+            self.wake_event.wait(self.refresh_interval)
+
+    def start(self):
+        """Generate answers in the background now and whenever the corpus changes"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="warm-answers", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
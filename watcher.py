@@ -0,0 +1,119 @@
+"""Background watcher for the corpus data files.
+
+Filesystem events (inotify through the optional `watchdog` package) wake the
+watcher as soon as something in the data directory changes; without
+`watchdog` it polls every WATCH_POLL_INTERVAL seconds instead. Either way the
+watcher waits for writes to settle, compares file stats against the last
+snapshot and hands the set of added, modified or removed files to a callback
+on its own thread, never on the request path.
+"""
+import logging
+import os
+import threading
+
+logger = logging.getLogger("asha_chatbot")
+
+WATCH_ENABLED = os.getenv("WATCH_ENABLED", "1") == "1"
+WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", "5"))
+WATCH_DEBOUNCE = float(os.getenv("WATCH_DEBOUNCE", "1"))
+# Only events for these file types wake the watcher (not the log file, for one)
+WATCH_EXTENSIONS = {".pdf", ".json", ".txt"}
+
+
+def snapshot(paths):
+    """Map each existing path to its (mtime_ns, size)"""
+    stats = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stats[path] = (stat.st_mtime_ns, stat.st_size)
+    return stats
+
+
+def changed_files(before, after):
+    """Paths added, removed or modified between two snapshots"""
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+
+class CorpusWatcher:
+    """Calls on_change(changed_paths) whenever the files listed by files_fn change"""
+
+    def __init__(self, files_fn, on_change, directories=(".",), poll_interval=WATCH_POLL_INTERVAL, debounce=WATCH_DEBOUNCE):
+        self.files_fn = files_fn
+        self.on_change = on_change
+        self.directories = directories
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.state = snapshot(files_fn())
+        self.wakeup = threading.Event()
+        self.stop_event = threading.Event()
+        self.observer = None
+        self.thread = None
+
+    def _start_observer(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            logger.info(f"watchdog not installed; polling data files every {self.poll_interval}s")
+            return
+
+        wakeup = self.wakeup
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                paths = [event.src_path, getattr(event, "dest_path", "")]
+                if any(os.path.splitext(path)[1].lower() in WATCH_EXTENSIONS for path in paths if path):
+                    wakeup.set()
+
+        try:
+            self.observer = Observer()
+            for directory in self.directories:
+                if os.path.isdir(directory):
+                    # Subdirectories of the working directory hold the index, not data
+                    self.observer.schedule(Handler(), directory, recursive=directory != ".")
+            self.observer.daemon = True
+            self.observer.start()
+            logger.info(f"Watching {', '.join(os.path.abspath(d) for d in self.directories if os.path.isdir(d))} for data file changes")
+        except Exception as e:
+            logger.warning(f"File events unavailable ({e}); polling data files every {self.poll_interval}s")
+            self.observer = None
+
+    def check(self):
+        """Compare the data files against the last snapshot and report any changes"""
+        current = snapshot(self.files_fn())
+        changed = changed_files(self.state, current)
+        if not changed:
+            return set()
+        logger.info(f"Data files changed: {', '.join(sorted(changed))}")
+        try:
+            self.on_change(changed)
+            self.state = current
+        except Exception as e:
+            # Keep the old snapshot so the change is retried on the next check
+            logger.error(f"Error handling data file changes: {e}")
+        return changed
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.wakeup.wait(self.poll_interval)
+            # Let a burst of writes (an editor save, a copy in progress) settle first
+            while self.wakeup.is_set() and not self.stop_event.is_set():
+                self.wakeup.clear()
+                self.stop_event.wait(self.debounce)
+            if not self.stop_event.is_set():
+                self.check()
+
+    def start(self):
+        if self.thread is None:
+            self._start_observer()
+            self.thread = threading.Thread(target=self._run, name="corpus-watcher", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wakeup.set()
+        if self.observer is not None:
+            self.observer.stop()